@@ -3,6 +3,8 @@ from app.models.base import Base
 from app.models.user import User  # Import specific models
 from app.models.company import Company
 from app.models.request import Request
+from app.models.request_stats import RequestStats
+from app.models.refresh_token import RefreshToken
 
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config
@@ -25,6 +27,11 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip the requests_fts FTS5 tables (and their shadow tables) on SQLite; they are not in the metadata"""
+    return not (type_ == "table" and name.startswith("requests_fts"))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -33,6 +40,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -49,7 +57,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,32 @@
+"""request rules_version
+
+Rows scored before this column existed keep NULL and are rescored when read.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('requests', sa.Column('rules_version', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_requests_rules_version'), 'requests', ['rules_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_requests_rules_version'), table_name='requests')
+    op.drop_column('requests', 'rules_version')
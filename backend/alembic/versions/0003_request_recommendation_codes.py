@@ -0,0 +1,112 @@
+"""request recommendation codes
+
+Replaces the "; "-joined recommendation text of each request with an array of
+small integer codes (risk_engine.recommendation_code). Existing rows are
+converted with the catalog below, frozen as it was when the codes were
+introduced; fragments that match no code are logged and dropped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+BATCH_SIZE = 1000
+CODES_TYPE = sa.JSON().with_variant(postgresql.ARRAY(sa.SmallInteger()), "postgresql")
+
+CATALOG = {
+    10: "Excelente ratio préstamo/ingresos, procesamiento expedito posible",
+    11: "Ratio de préstamo aceptable para sus ingresos",
+    12: "La cantidad solicitada es alta en relación a sus ingresos",
+    13: "Alto riesgo: cantidad del préstamo muy alta para sus ingresos",
+    20: "Empresa muy pequeña, perfil de mayor riesgo",
+    21: "Empresa pequeña, considere mostrar planes de crecimiento",
+    22: "Empresa mediana muestra buena estabilidad",
+    23: "Empresa grande muestra excelente estabilidad",
+    30: "Empresa nueva, considere plan de negocio detallado",
+    31: "Empresa moderadamente establecida",
+    32: "Empresa establecida con buen historial",
+    33: "Empresa bien establecida con sólida trayectoria",
+    40: "Excelente salud financiera",
+    41: "Salud financiera moderada, verificar tendencias",
+    42: "Alto ratio de deuda, considere reducción de deudas",
+    50: "Puntuación crediticia regular, trabaje en mejorarla",
+    51: "Buena puntuación crediticia, tarifas competitivas disponibles",
+    52: "Excelente puntuación crediticia, tarifas competitivas disponibles",
+}
+CODES = {text: code for code, text in CATALOG.items()}
+
+
+def _requests_table() -> sa.Table:
+    return sa.table(
+        'requests',
+        sa.column('id', sa.Integer()),
+        sa.column('recommendations', sa.Text()),
+        sa.column('recommendation_codes', CODES_TYPE),
+    )
+
+
+def _convert(source: str, target: str, convert) -> None:
+    """Rewrite one column from another in id-ordered batches"""
+    requests = _requests_table()
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(requests.c.id, requests.c[source])
+            .where(requests.c.id > last_id, requests.c[source].is_not(None))
+            .order_by(requests.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            requests.update().where(requests.c.id == sa.bindparam('b_id')).values({target: sa.bindparam('b_value')}),
+            [{'b_id': row[0], 'b_value': convert(row[0], row[1])} for row in rows]
+        )
+        last_id = rows[-1][0]
+
+
+def _text_to_codes(request_id: int, text: str) -> list:
+    codes = []
+    for fragment in filter(None, (part.strip() for part in text.split(";"))):
+        if fragment in CODES:
+            codes.append(CODES[fragment])
+        else:
+            logger.warning("Request %s: dropping unknown recommendation %r", request_id, fragment)
+    return codes
+
+
+def _codes_to_text(request_id: int, codes: list) -> str:
+    return "; ".join(CATALOG[code] for code in codes if code in CATALOG)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('requests', sa.Column('recommendation_codes', CODES_TYPE, nullable=True))
+    _convert('recommendations', 'recommendation_codes', _text_to_codes)
+    with op.batch_alter_table('requests') as batch_op:
+        batch_op.drop_column('recommendations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('requests', sa.Column('recommendations', sa.Text(), nullable=True))
+    _convert('recommendation_codes', 'recommendations', _codes_to_text)
+    with op.batch_alter_table('requests') as batch_op:
+        batch_op.drop_column('recommendation_codes')
@@ -0,0 +1,77 @@
+"""request text search
+
+Indexes for the search parameter of GET /requests (app/services/request_search.py):
+GIN expression indexes on PostgreSQL, the requests_fts FTS5 table and its sync
+triggers on SQLite. Existing rows are copied into requests_fts.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia congelada de models/request.py:SQLITE_FTS_DDL
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS requests_fts USING fts5("
+    "purpose, company_name, tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS requests_fts_insert AFTER INSERT ON requests BEGIN
+        INSERT INTO requests_fts(rowid, purpose, company_name)
+        VALUES (new.id, new.purpose, (SELECT name FROM companies WHERE id = new.company_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS requests_fts_update AFTER UPDATE OF purpose, company_id ON requests BEGIN
+        UPDATE requests_fts
+        SET purpose = new.purpose, company_name = (SELECT name FROM companies WHERE id = new.company_id)
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS requests_fts_delete AFTER DELETE ON requests BEGIN
+        DELETE FROM requests_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS companies_fts_update AFTER UPDATE OF name ON companies BEGIN
+        UPDATE requests_fts SET company_name = new.name
+        WHERE rowid IN (SELECT id FROM requests WHERE company_id = new.id);
+    END""",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        op.create_index(
+            'ix_requests_purpose_tsv', 'requests', [sa.text("to_tsvector('simple', purpose)")],
+            postgresql_using='gin'
+        )
+        op.create_index(
+            'ix_companies_name_tsv', 'companies', [sa.text("to_tsvector('simple', name)")],
+            postgresql_using='gin'
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute(
+            "INSERT INTO requests_fts(rowid, purpose, company_name) "
+            "SELECT r.id, r.purpose, c.name FROM requests r LEFT JOIN companies c ON c.id = r.company_id"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_companies_name_tsv', table_name='companies')
+        op.drop_index('ix_requests_purpose_tsv', table_name='requests')
+    elif dialect == 'sqlite':
+        for name in ('companies_fts_update', 'requests_fts_delete', 'requests_fts_update', 'requests_fts_insert'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS requests_fts")
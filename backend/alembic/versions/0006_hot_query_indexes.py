@@ -0,0 +1,50 @@
+"""hot query indexes
+
+Composite indexes for the filters of GET /requests, /requests/stats/summary and
+the company ownership checks; ix_requests_user_id is dropped because
+ix_requests_user_created_id already starts with user_id.
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY outside the
+migration transaction, so writes are not blocked. If the migration is interrupted,
+an INVALID index can be left behind: drop it and run the upgrade again.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_requests_user_status_created', 'requests', ['user_id', 'status', 'created_at', 'id']),
+    ('ix_requests_user_risk_created', 'requests', ['user_id', 'risk_level', 'created_at', 'id']),
+    ('ix_requests_user_amount', 'requests', ['user_id', 'amount']),
+    ('ix_requests_user_summary', 'requests', ['user_id', 'status', 'risk_level', 'amount']),
+    ('ix_companies_user_id', 'companies', ['user_id', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_requests_user_id', table_name='requests', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_requests_user_id', 'requests', ['user_id'], unique=False, postgresql_concurrently=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
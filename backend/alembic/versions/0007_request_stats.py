@@ -0,0 +1,49 @@
+"""request stats
+
+Table request_stats with request counts and amount sums per
+(user_id, company_id, status, risk_level), filled from the existing requests.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'request_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('risk_level', sa.String(length=50), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False),
+        sa.Column('amount_sum', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'company_id', 'status', 'risk_level')
+    )
+    # requests.status guarda el nombre del enum (APPROVED); request_stats, el valor (approved)
+    op.execute(
+        "INSERT INTO request_stats (user_id, company_id, status, risk_level, request_count, amount_sum) "
+        "SELECT user_id, company_id, LOWER(CAST(status AS VARCHAR(20))), COALESCE(risk_level, ''), "
+        "COUNT(*), COALESCE(SUM(amount), 0) "
+        "FROM requests GROUP BY user_id, company_id, LOWER(CAST(status AS VARCHAR(20))), COALESCE(risk_level, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('request_stats')
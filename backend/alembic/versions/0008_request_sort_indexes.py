@@ -0,0 +1,48 @@
+"""request sort indexes
+
+Indexes for the sort orders of GET /requests (?sort=amount, ?sort=risk_score) and
+GET /requests/riskiest: (user_id, column, id), so a sorted page is an index range
+scan and id breaks ties for the keyset cursor. ix_requests_user_amount is replaced
+by ix_requests_user_amount_id, which also serves the amount range filters.
+
+Like 0006, the indexes are built with CREATE INDEX CONCURRENTLY on PostgreSQL.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_requests_user_amount_id', ['user_id', 'amount', 'id']),
+    ('ix_requests_user_risk_score_id', ['user_id', 'risk_score', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'requests', columns, unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_requests_user_amount', table_name='requests', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_requests_user_amount', 'requests', ['user_id', 'amount'], unique=False, postgresql_concurrently=True
+        )
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='requests', postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""refresh token ids
+
+Refresh tokens are identified by a random token_id instead of the sequential primary
+key, and each session keeps the digest of its previous secret (previous_hash) so that
+only a replayed, already rotated token revokes it. Existing sessions cannot be given
+a token_id their clients know, so they are deleted: those users log in again.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Los tokens emitidos llevan el id numérico: ya no se pueden validar
+    op.execute(sa.text("DELETE FROM refresh_tokens"))
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.add_column(sa.Column('token_id', sa.String(length=32), nullable=False))
+        batch_op.add_column(sa.Column('previous_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_token_id'), ['token_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.text("DELETE FROM refresh_tokens"))
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_token_id'))
+        batch_op.drop_column('previous_hash')
+        batch_op.drop_column('token_id')
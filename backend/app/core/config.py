@@ -14,6 +14,30 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "tu_clave_secreta_muy_segura_aqui_cambiala_en_produccion_2025"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14  # Vida de cada refresh token; cada renovación la extiende
+    BCRYPT_ROUNDS: int = 12  # Costo de bcrypt para hashes nuevos; 0 = calibrar al arrancar según BCRYPT_TARGET_MS
+    BCRYPT_TARGET_MS: float = 250.0  # Tiempo objetivo de un hash (python -m app.jobs.calibrate_bcrypt)
+    PASSWORD_HASH_WORKERS: int = 2  # Hilos dedicados a bcrypt (login, registro)
+    PASSWORD_HASH_MAX_PENDING: int = 8  # Hashes en curso o en espera; con más, 503 inmediato
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1  # Retry-After de ese 503
+    TOKEN_CACHE_SIZE: int = 10_000  # Tokens con firma ya verificada por proceso (hasta su exp); 0 la desactiva
+    PRINCIPAL_CACHE_SIZE: int = 10_000  # Usuarios autenticados cacheados por proceso (id y flags); 0 la desactiva
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0  # Lo que tarda otro worker en ver una desactivación
+    
+    # Risk assessment
+    RISK_BATCH_MAX_ITEMS: int = 1000  # Máximo de evaluaciones por llamada a /risk/assess/batch
+    RISK_STREAM_CHUNK_SIZE: int = 500  # Filas por INSERT/commit en /risk/assess/stream?persist=true
+    RISK_STREAM_MAX_LINE_BYTES: int = 64 * 1024  # Línea NDJSON más larga aceptada
+    RISK_RULES_PATH: str = ""  # Archivo de reglas JSON/YAML; vacío = app/services/risk_rules.json
+    RISK_RULES_RELOAD_SECONDS: float = 2.0  # Cada cuánto se revisa el archivo de reglas; 0 desactiva la recarga
+    RISK_SCORE_CACHE_SIZE: int = 10_000  # Entradas en la caché de calculate_risk_score; 0 la desactiva
+    RISK_SCORE_CACHE_TTL_SECONDS: float = 300.0
+    RISK_SENSITIVITY_MAX_STEPS: int = 200  # Pasos máximos por eje en /risk/sensitivity
+    RISK_RESCORE_FLUSH_BATCH: int = 500  # Filas por UPDATE al guardar los scores recalculados al leer
+    REQUESTS_COUNT_CACHE_SIZE: int = 10_000  # Conteos de GET /requests?count=cached por (usuario, filtros)
+    REQUESTS_COUNT_CACHE_TTL_SECONDS: float = 60.0
+    REQUESTS_COUNT_EXACT_BELOW: int = 1000  # count=estimate cuenta exacto si el planner estima menos filas
+    EXPORT_BATCH_SIZE: int = 1000  # Filas por lectura del cursor y por chunk en /requests/export y /companies/export
     
     # Database - Lee desde variable de entorno, fallback para desarrollo local
     @property
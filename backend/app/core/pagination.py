@@ -0,0 +1,137 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque urlsafe-base64 JSON token with the sort name, the sort key
+values of the row it points at and the direction to read in. Pages are fetched
+with a row-value comparison on the key instead of OFFSET, so with an index on
+the key every page costs the same no matter how deep it is.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, String, literal, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.types import TypeDecorator
+
+NEXT = "next"
+PREV = "prev"
+
+
+class CursorError(ValueError):
+    """The cursor is malformed or belongs to another sort order"""
+
+
+class KeysetDateTime(TypeDecorator):
+    """
+    Bind type for datetime cursor values.
+    SQLite keeps DateTime as text and CURRENT_TIMESTAMP defaults have no fractional
+    seconds, while SQLAlchemy always binds '.000000'; the comparison has to use the
+    stored format or rows sharing a timestamp are skipped or repeated.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime(timezone=True))
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "sqlite" and value is not None:
+            text = value.strftime("%Y-%m-%d %H:%M:%S")
+            return f"{text}.{value.microsecond:06d}" if value.microsecond else text
+        return value
+
+
+def datetime_literal(value: datetime):
+    """Bound datetime to compare with timestamp columns, e.g. created_at >= datetime_literal(start); naive is UTC"""
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return literal(value, KeysetDateTime())
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def encode_cursor(sort: str, values: Sequence[Any], direction: str) -> str:
+    payload = {
+        "s": sort,
+        "d": direction,
+        "v": [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence) -> Tuple[List[Any], str]:
+    """Sort key values and direction of a cursor created by encode_cursor for the same sort"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values, direction = payload["v"], payload["d"]
+        if payload["s"] != sort:
+            raise CursorError("The cursor belongs to another sort order")
+        if direction not in (NEXT, PREV) or len(values) != len(columns):
+            raise CursorError("Invalid cursor")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ], direction
+    except CursorError:
+        raise
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+
+
+def keyset_page(
+    query: Query,
+    columns: Sequence,
+    sort: str,
+    size: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> KeysetPage:
+    """
+    Fetch one page of query ordered by columns (the last one must be unique, e.g. id).
+    Reading backwards (prev cursor) flips the order in SQL and the page is reversed here,
+    so both directions use the same index.
+    """
+    direction = NEXT
+    if cursor:
+        values, direction = decode_cursor(cursor, sort, columns)
+        key = tuple_(*columns)
+        bound = tuple_(*(
+            literal(value, KeysetDateTime() if isinstance(column.type, DateTime) else column.type)
+            for column, value in zip(columns, values)
+        ))
+        # Avanzar en orden descendente = claves menores
+        query = query.filter(key < bound if (direction == NEXT) == descending else key > bound)
+
+    backwards = direction == PREV
+    query = query.order_by(*(
+        column.desc() if descending != backwards else column.asc() for column in columns
+    ))
+    rows = query.limit(size + 1).all()
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if backwards:
+        rows.reverse()
+
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else cursor is not None
+
+    def key_of(row) -> List[Any]:
+        return [getattr(row, column.key) for column in columns]
+
+    return KeysetPage(
+        items=rows,
+        next_cursor=encode_cursor(sort, key_of(rows[-1]), NEXT) if rows and has_next else None,
+        prev_cursor=encode_cursor(sort, key_of(rows[0]), PREV) if rows and has_prev else None
+    )
@@ -0,0 +1 @@
+# Maintenance jobs (python -m app.jobs.<name>)
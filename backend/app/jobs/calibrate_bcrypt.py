@@ -0,0 +1,36 @@
+"""
+Pick the bcrypt cost (BCRYPT_ROUNDS) for this machine.
+
+Prints the measured hash time per cost around the target and the highest cost
+whose hash takes at most --target-ms. Run it on the production hardware and set
+BCRYPT_ROUNDS to the result; existing hashes are migrated on each user's next login.
+
+Usage (from backend/):
+    python -m app.jobs.calibrate_bcrypt
+    python -m app.jobs.calibrate_bcrypt --target-ms 100
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.password_cost import MIN_ROUNDS, calibrate, measure_ms
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pick the bcrypt cost for a target hash time")
+    parser.add_argument("--target-ms", type=float, default=settings.BCRYPT_TARGET_MS,
+                        help="Maximum time of one hash (and one login verify), in ms")
+    args = parser.parse_args(argv)
+
+    rounds = calibrate(args.target_ms)
+    print(f"{'rounds':>6} {'ms':>10}")
+    for candidate in range(max(rounds - 2, MIN_ROUNDS), rounds + 2):
+        marker = "  <- target" if candidate == rounds else ""
+        print(f"{candidate:>6} {measure_ms(candidate, repeats=1):>10.1f}{marker}")
+    print(f"\nBCRYPT_ROUNDS={rounds}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
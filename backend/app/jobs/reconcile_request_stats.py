@@ -0,0 +1,93 @@
+"""
+Rebuild the request_stats table from requests and report drift.
+
+request_stats is maintained incrementally (app/services/request_stats.py); writes
+that bypass the application (manual SQL, restores) leave it out of date. This job
+recomputes every (user, company, status, risk_level) group with one aggregate query,
+compares it with the stored rows and, unless --dry-run, replaces the table in the
+same transaction. On PostgreSQL the table is locked first (EXCLUSIVE: reads go on,
+writers wait), so no delta is lost between the recount and the rewrite.
+
+Usage (from backend/):
+    python -m app.jobs.reconcile_request_stats --dry-run
+    python -m app.jobs.reconcile_request_stats
+"""
+import argparse
+import logging
+import math
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.services.request_stats import StatsKey, computed_stats, request_stats, stored_stats
+
+logger = logging.getLogger(__name__)
+
+# (key, stored (count, amount) or None, computed (count, amount) or None)
+Drift = Tuple[StatsKey, Optional[Tuple[int, float]], Optional[Tuple[int, float]]]
+
+
+@dataclass
+class ReconcileReport:
+    dry_run: bool
+    groups: int = 0
+    drift: List[Drift] = field(default_factory=list)
+
+
+def _same(stored: Optional[Tuple[int, float]], computed: Optional[Tuple[int, float]]) -> bool:
+    if stored is None or computed is None:
+        return stored == computed
+    # Las sumas incrementales de float acumulan error de redondeo
+    return stored[0] == computed[0] and math.isclose(stored[1], computed[1], rel_tol=1e-9, abs_tol=1e-6)
+
+
+def reconcile_request_stats(engine: Engine, dry_run: bool = False) -> ReconcileReport:
+    """Compare request_stats with a full recount and, unless dry_run, replace it with the recount"""
+    report = ReconcileReport(dry_run=dry_run)
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql" and not dry_run:
+            conn.execute(text("LOCK TABLE request_stats IN EXCLUSIVE MODE"))
+        computed = computed_stats(conn)
+        stored = stored_stats(conn)
+        report.groups = len(computed)
+        report.drift = [
+            (key, stored.get(key), computed.get(key))
+            for key in sorted(set(stored) | set(computed))
+            if not _same(stored.get(key), computed.get(key))
+        ]
+        if not dry_run:
+            conn.execute(request_stats.delete())
+            if computed:
+                conn.execute(request_stats.insert(), [
+                    {
+                        "user_id": key[0], "company_id": key[1], "status": key[2], "risk_level": key[3],
+                        "request_count": count, "amount_sum": amount
+                    }
+                    for key, (count, amount) in computed.items()
+                ])
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild request_stats from requests and report drift")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the drift")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    from app.core.database import engine
+
+    report = reconcile_request_stats(engine, dry_run=args.dry_run)
+    for key, stored, computed in report.drift:
+        logger.warning("Drift in %s: stored %s, computed %s", key, stored, computed)
+    logger.info(
+        "Done: %d groups, %d drifted%s",
+        report.groups, len(report.drift), " (dry run, nothing written)" if args.dry_run else ", table rebuilt"
+    )
+    return 1 if report.drift and args.dry_run else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Rescore every stored Request with the current scoring rules.
+
+Rows are streamed in id order with a server-side cursor (yield_per), scored in
+batches on a process pool with the vectorized engine, and changed rows are
+written back with one bulk UPDATE per batch in its own transaction. Every scored
+row is stamped with the rules version, so reads no longer rescore it lazily
+(see app/services/risk_rescore.py). After each
+committed batch the last processed id is saved to a checkpoint file, so an
+interrupted run can continue with --resume. The checkpoint also records the rules
+version; --resume refuses to continue when the active rules are different, since
+the rows before the checkpoint were scored with the old ones.
+
+Usage (from backend/):
+    python -m app.jobs.rescore_requests --dry-run
+    python -m app.jobs.rescore_requests --workers 4 --batch-size 2000
+    python -m app.jobs.rescore_requests --resume
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, List, Optional, Sequence, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.request import Request
+from app.services import risk_engine
+from app.services.request_stats import apply_deltas, level_change_deltas
+from app.services.risk_batch import calculate_risk_scores_for_requests
+from app.services.risk_calculator import risk_request_from_inputs
+from app.services.risk_rules import load_rules_file, rules_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = Path(".rescore_requests.checkpoint.json")
+
+# (id, amount, purpose, risk_inputs, company annual_revenue, company_size,
+#  risk_score, risk_level, rules_version, recommendation_codes)
+Row = Tuple[
+    int, float, str, Optional[dict], Optional[float], Optional[int],
+    Optional[float], Optional[str], Optional[str], Optional[List[int]]
+]
+# (id, old score, old level, new score, new level, new recommendation codes)
+Change = Tuple[int, Optional[float], Optional[str], float, str, List[int]]
+
+
+@dataclass
+class BatchResult:
+    last_id: int
+    scanned: int
+    changes: List[Change]
+    errors: List[Tuple[int, str]]
+    rules_version: str = ""
+    # Mismo score pero rules_version o códigos desactualizados: (id, códigos)
+    restamped: List[Tuple[int, List[int]]] = field(default_factory=list)
+
+
+@dataclass
+class RescoreReport:
+    rules_version: str
+    dry_run: bool
+    started_after_id: int
+    last_id: int = 0
+    scanned: int = 0
+    changed: int = 0
+    restamped: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def _init_worker(path: Optional[str]) -> None:
+    """Load the same rules file as the parent process"""
+    if path:
+        risk_engine.set_active_rules(load_rules_file(path))
+
+
+def score_rows(rows: Sequence[Row]) -> BatchResult:
+    """Score one batch; runs in a worker process"""
+    valid_rows, requests, errors = [], [], []
+    for row in rows:
+        request_id, amount, purpose, risk_inputs, revenue, size = row[:6]
+        try:
+            requests.append(risk_request_from_inputs(str(request_id), amount, purpose, risk_inputs, revenue, size))
+        except ValidationError as e:
+            errors.append((request_id, str(e.errors()[0]["msg"])))
+            continue
+        valid_rows.append(row)
+
+    result = calculate_risk_scores_for_requests(requests)
+    version = result.rules.version
+    changes, restamped = [], []
+    for i, row in enumerate(valid_rows):
+        request_id, old_score, old_level, old_version, old_codes = row[0], row[6], row[7], row[8], row[9]
+        new_score, new_level, new_codes = float(result.scores[i]), str(result.levels[i]), result.codes(i)
+        if old_score != new_score or old_level != new_level:
+            changes.append((request_id, old_score, old_level, new_score, new_level, new_codes))
+        elif old_version != version or old_codes != new_codes:
+            restamped.append((request_id, new_codes))
+
+    return BatchResult(
+        last_id=rows[-1][0],
+        scanned=len(rows),
+        changes=changes,
+        errors=errors,
+        rules_version=version,
+        restamped=restamped
+    )
+
+
+class CheckpointMismatch(ValueError):
+    """The checkpoint was written with other rules than the active ones"""
+
+
+def read_checkpoint(path: Path, rules_version: Optional[str] = None) -> int:
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return 0
+    # Reanudar con otras reglas dejaría las filas anteriores al checkpoint con la versión vieja
+    if rules_version is not None and data.get("rules_version") != rules_version:
+        raise CheckpointMismatch(
+            f"Checkpoint {path} was written with rules {data.get('rules_version')}, "
+            f"but the active rules are {rules_version}; run without --resume to rescore from the start"
+        )
+    return int(data["last_id"])
+
+
+def write_checkpoint(path: Path, last_id: int, rules_version: str) -> None:
+    # Escritura atómica: un corte a mitad no deja un checkpoint corrupto
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"last_id": last_id, "rules_version": rules_version}))
+    os.replace(tmp, path)
+
+
+def _row_query(after_id: int):
+    return (
+        select(
+            Request.id,
+            Request.amount,
+            Request.purpose,
+            Request.risk_inputs,
+            Company.annual_revenue,
+            Company.company_size,
+            Request.risk_score,
+            Request.risk_level,
+            Request.rules_version,
+            Request.recommendation_codes
+        )
+        .outerjoin(Company, Company.id == Request.company_id)
+        .where(Request.id > after_id)
+        .order_by(Request.id)
+    )
+
+
+def rescore_requests(
+    engine: Engine,
+    batch_size: int = 1000,
+    workers: int = 0,
+    after_id: int = 0,
+    dry_run: bool = False,
+    checkpoint: Optional[Path] = None,
+    rules_file: Optional[str] = None,
+    on_batch: Optional[Callable[[RescoreReport, BatchResult], None]] = None,
+) -> RescoreReport:
+    """
+    Rescore all requests with id > after_id.
+    workers=0 scores in this process; otherwise batches go to a pool of that many processes.
+    """
+    report = RescoreReport(
+        rules_version=risk_engine.active_rules.version,
+        dry_run=dry_run,
+        started_after_id=after_id,
+        last_id=after_id
+    )
+
+    def apply(batch: BatchResult) -> None:
+        if (batch.changes or batch.restamped) and not dry_run:
+            version = batch.rules_version
+            with Session(engine) as session, session.begin():
+                # Las filas de request_stats siguen al nuevo risk_level en la misma transacción
+                apply_deltas(session, level_change_deltas(
+                    session, {request_id: level for request_id, _, _, _, level, _ in batch.changes}
+                ))
+                session.execute(
+                    update(Request),
+                    [
+                        {
+                            "id": request_id,
+                            "risk_score": score,
+                            "risk_level": level,
+                            "recommendation_codes": codes,
+                            "rules_version": version
+                        }
+                        for request_id, _, _, score, level, codes in batch.changes
+                    ] + [
+                        {"id": request_id, "recommendation_codes": codes, "rules_version": version}
+                        for request_id, codes in batch.restamped
+                    ]
+                )
+        if checkpoint is not None and not dry_run:
+            write_checkpoint(checkpoint, batch.last_id, report.rules_version)
+
+        report.last_id = batch.last_id
+        report.scanned += batch.scanned
+        report.changed += len(batch.changes)
+        report.restamped += len(batch.restamped)
+        report.errors.extend(batch.errors)
+        if on_batch:
+            on_batch(report, batch)
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(rules_file,)) if workers else None
+    pending: Deque[Future] = deque()
+    try:
+        # Lectura en una conexión propia: los commits de las escrituras no cierran el cursor
+        with engine.connect() as conn:
+            result = conn.execution_options(yield_per=batch_size).execute(_row_query(after_id))
+            for partition in result.partitions():
+                rows = [tuple(row) for row in partition]
+                if pool is None:
+                    apply(score_rows(rows))
+                    continue
+
+                pending.append(pool.submit(score_rows, rows))
+                # Resultados en orden de id para que el checkpoint siempre avance
+                if len(pending) >= workers * 2:
+                    apply(pending.popleft().result())
+
+            while pending:
+                apply(pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return report
+
+
+def count_remaining(engine: Engine, after_id: int) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count(Request.id)).where(Request.id > after_id))
+
+
+def progress_printer(total: int, out: TextIO, show_diff: bool) -> Callable[[RescoreReport, BatchResult], None]:
+    started = time.monotonic()
+
+    def on_batch(report: RescoreReport, batch: BatchResult) -> None:
+        if show_diff:
+            for request_id, old_score, old_level, new_score, new_level, _ in batch.changes:
+                out.write(f"{request_id}\t{old_score} {old_level} -> {new_score:g} {new_level}\n")
+        elapsed = time.monotonic() - started
+        percent = 100 * report.scanned / total if total else 100
+        logger.info(
+            "%d/%d rows (%.1f%%), %d changed, %d errors, last id %d, %.0f rows/s",
+            report.scanned, total, percent, report.changed, len(report.errors),
+            report.last_id, report.scanned / elapsed if elapsed else 0
+        )
+
+    return on_batch
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rescore stored requests with the current scoring rules")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per batch and per UPDATE transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Scoring processes (0 = score in this process)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the score changes without writing them")
+    parser.add_argument("--resume", action="store_true", help="Continue after the id saved in the checkpoint")
+    parser.add_argument("--after-id", type=int, default=0, help="Only rescore requests with a greater id")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT, help="Checkpoint file")
+    parser.add_argument("--rules", default=None, help="Rules file (default: RISK_RULES_PATH or the shipped rules)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    from app.core.database import engine
+
+    rules_file = args.rules or str(rules_path())
+    risk_engine.set_active_rules(load_rules_file(rules_file))
+
+    try:
+        after_id = read_checkpoint(args.checkpoint, risk_engine.active_rules.version) if args.resume else args.after_id
+    except CheckpointMismatch as e:
+        logger.error("%s", e)
+        return 1
+    total = count_remaining(engine, after_id)
+    logger.info(
+        "Rescoring %d requests after id %d with rules %s%s",
+        total, after_id, risk_engine.active_rules.version, " (dry run)" if args.dry_run else ""
+    )
+
+    report = rescore_requests(
+        engine,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        after_id=after_id,
+        dry_run=args.dry_run,
+        checkpoint=args.checkpoint,
+        rules_file=rules_file,
+        on_batch=progress_printer(total, sys.stdout, show_diff=args.dry_run)
+    )
+
+    for request_id, message in report.errors:
+        logger.warning("Request %d skipped: %s", request_id, message)
+    logger.info(
+        "Done: %d scanned, %d %s, %d restamped, %d errors, last id %d",
+        report.scanned, report.changed, "would change" if args.dry_run else "updated",
+        report.restamped, len(report.errors), report.last_id
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
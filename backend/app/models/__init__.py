@@ -2,10 +2,14 @@ from .base import Base
 from .user import User
 from .company import Company, CompanySize, IndustryType
 from .request import Request, RequestStatus, RequestPurpose
+from .request_stats import RequestStats
+from .refresh_token import RefreshToken
 
 __all__ = [
     "Base",
     "User",
     "Company", "CompanySize", "IndustryType",
     "Request", "RequestStatus", "RequestPurpose",
+    "RequestStats",
+    "RefreshToken",
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Float, Integer, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Text, Float, Integer, Enum as SQLEnum, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from enum import Enum
 
@@ -31,6 +31,14 @@ class Company(Base, IDMixin, TimestampMixin):
     """Company model for risk assessment"""
     
     __tablename__ = "companies"
+    __table_args__ = (
+        # Propiedad: WHERE user_id = ? (listado) y WHERE id = ? AND user_id = ?
+        Index("ix_companies_user_id", "user_id", "id"),
+        # Búsqueda de texto en PostgreSQL (app/services/request_search.py)
+        Index("ix_companies_name_tsv", text("to_tsvector('simple', name)"), postgresql_using="gin").ddl_if(
+            dialect="postgresql"
+        ),
+    )
     
     # Company basic info
     name = Column(
@@ -0,0 +1,56 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.models.base import Base, IDMixin, TimestampMixin
+
+
+class RefreshToken(Base, IDMixin, TimestampMixin):
+    """
+    One login session that can be renewed without the password (app/services/refresh_tokens.py).
+    Only the digests of the current and the previous token are kept; rotation replaces them
+    in place, so each session is a single row whatever the number of renewals.
+    """
+    
+    __tablename__ = "refresh_tokens"
+    
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        doc="Owner of the session"
+    )
+    
+    token_id = Column(
+        String(32),
+        nullable=False,
+        unique=True,
+        index=True,
+        doc="Random public part of the refresh token that identifies the session"
+    )
+    
+    token_hash = Column(
+        String(64),
+        nullable=False,
+        doc="SHA-256 (hex) of the secret part of the current refresh token"
+    )
+    
+    previous_hash = Column(
+        String(64),
+        nullable=True,
+        doc="SHA-256 (hex) of the secret replaced by the last rotation; presenting it again revokes the session"
+    )
+    
+    expires_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        doc="The current token cannot be used after this instant"
+    )
+    
+    revoked_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        doc="Set on logout or when the previous (already rotated) token is presented again"
+    )
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, revoked={self.revoked_at is not None})>"
@@ -1,8 +1,13 @@
-from sqlalchemy import Column, String, Text, Integer, Float, JSON, ForeignKey, Enum as SQLEnum, Boolean
+from sqlalchemy import (
+    Column, String, Text, Integer, Float, JSON, ForeignKey, Enum as SQLEnum, Boolean, SmallInteger, Index,
+    DDL, event, text
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from enum import Enum
 
 from app.models.base import Base, IDMixin, TimestampMixin
+from app.services import risk_engine
 
 
 class RequestStatus(str, Enum):
@@ -28,6 +33,24 @@ class Request(Base, IDMixin, TimestampMixin):
     """Risk assessment request model"""
     
     __tablename__ = "requests"
+    __table_args__ = (
+        # Paginación por cursor del listado: WHERE user_id = ? ORDER BY created_at, id
+        # (también cubre las búsquedas solo por user_id, por eso user_id no tiene índice propio)
+        Index("ix_requests_user_created_id", "user_id", "created_at", "id"),
+        # Listado filtrado por status o risk_level, en el mismo orden que el cursor
+        Index("ix_requests_user_status_created", "user_id", "status", "created_at", "id"),
+        Index("ix_requests_user_risk_created", "user_id", "risk_level", "created_at", "id"),
+        # Rangos de amount y ?sort=amount (id desempata la clave del cursor)
+        Index("ix_requests_user_amount_id", "user_id", "amount", "id"),
+        # ?sort=risk_score y GET /requests/riskiest
+        Index("ix_requests_user_risk_score_id", "user_id", "risk_score", "id"),
+        # Resumen por status/risk_level: cubre COUNT y SUM(amount) sin leer la tabla
+        Index("ix_requests_user_summary", "user_id", "status", "risk_level", "amount"),
+        # Búsqueda de texto en PostgreSQL (app/services/request_search.py)
+        Index(
+            "ix_requests_purpose_tsv", text("to_tsvector('simple', purpose)"), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
     
     # Foreign key to company
     company_id = Column(
@@ -43,7 +66,6 @@ class Request(Base, IDMixin, TimestampMixin):
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
         doc="ID of the user who created this request"
     )
     
@@ -86,6 +108,13 @@ class Request(Base, IDMixin, TimestampMixin):
         doc="Risk level: LOW, MEDIUM, HIGH"
     )
     
+    rules_version = Column(
+        String(64),
+        nullable=True,
+        index=True,
+        doc="Version of the scoring rules that produced risk_score and risk_level"
+    )
+    
     approved = Column(
         Boolean,
         nullable=True,
@@ -93,10 +122,10 @@ class Request(Base, IDMixin, TimestampMixin):
         doc="Whether the request is approved based on risk assessment"
     )
     
-    recommendations = Column(
-        Text,
+    recommendation_codes = Column(
+        JSON().with_variant(ARRAY(SmallInteger), "postgresql"),
         nullable=True,
-        doc="Risk assessment recommendations"
+        doc="Recommendation codes (risk_engine.recommendation_code); text is resolved per locale when serialized"
     )
     
     # Status and workflow
@@ -136,71 +165,44 @@ class Request(Base, IDMixin, TimestampMixin):
         """
         if not self.company:
             return 50.0  # Default medium risk if no company data
-            
-        base_score = 0.0
-        
-        # Factor 1: Amount-based risk (0-30 points)
-        if self.amount >= 100_000:
-            base_score += 30
-        elif self.amount >= 50_000:
-            base_score += 20
-        elif self.amount >= 25_000:
-            base_score += 15
-        else:
-            base_score += 10
-            
-        # Factor 2: Company size risk (0-25 points)
-        size_risk = {
-            "startup": 25,
-            "small": 20,
-            "medium": 15,
-            "large": 10,
-            "enterprise": 5
-        }
-        base_score += size_risk.get(self.company.size, 15)
-        
-        # Factor 3: Industry risk (0-25 points)
-        industry_risk = {
-            "technology": 20,
-            "finance": 15,
-            "healthcare": 10,
-            "retail": 15,
-            "manufacturing": 10,
-            "real_estate": 25,
-            "education": 5,
-            "consulting": 15,
-            "other": 20
-        }
-        base_score += industry_risk.get(self.company.industry, 15)
-        
-        # Factor 4: Purpose risk (0-20 points)
-        purpose_risk = {
-            "loan": 15,
-            "investment": 20,
-            "partnership": 10,
-            "acquisition": 25,
-            "expansion": 15,
-            "other": 20
-        }
-        base_score += purpose_risk.get(self.purpose, 15)
-        
-        # Factor 5: Risk inputs adjustment (-20 to +20 points)
-        if self.risk_inputs:
-            # Good factors (reduce risk)
-            if self.risk_inputs.get("good_credit_history"):
-                base_score -= 10
-            if self.risk_inputs.get("stable_revenue"):
-                base_score -= 10
-            if self.risk_inputs.get("experienced_management"):
-                base_score -= 5
-                
-            # Bad factors (increase risk)
-            if self.risk_inputs.get("high_debt_ratio"):
-                base_score += 15
-            if self.risk_inputs.get("volatile_market"):
-                base_score += 10
-            if self.risk_inputs.get("regulatory_issues"):
-                base_score += 20
-        
-        # Ensure score is between 0-100
-        return max(0.0, min(100.0, base_score))
+
+        return risk_engine.score_request_profile(
+            self.amount,
+            self.company.size,
+            self.company.industry,
+            self.purpose,
+            self.risk_inputs
+        )
+
+
+# Búsqueda de texto en SQLite (app/services/request_search.py): tabla FTS5 con purpose y el nombre
+# de la empresa, sincronizada por triggers
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS requests_fts USING fts5("
+    "purpose, company_name, tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS requests_fts_insert AFTER INSERT ON requests BEGIN
+        INSERT INTO requests_fts(rowid, purpose, company_name)
+        VALUES (new.id, new.purpose, (SELECT name FROM companies WHERE id = new.company_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS requests_fts_update AFTER UPDATE OF purpose, company_id ON requests BEGIN
+        UPDATE requests_fts
+        SET purpose = new.purpose, company_name = (SELECT name FROM companies WHERE id = new.company_id)
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS requests_fts_delete AFTER DELETE ON requests BEGIN
+        DELETE FROM requests_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS companies_fts_update AFTER UPDATE OF name ON companies BEGIN
+        UPDATE requests_fts SET company_name = new.name
+        WHERE rowid IN (SELECT id FROM requests WHERE company_id = new.id);
+    END""",
+)
+SQLITE_FTS_DROP = (
+    "DROP TRIGGER IF EXISTS companies_fts_update",
+    "DROP TABLE IF EXISTS requests_fts",
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Request.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in SQLITE_FTS_DROP:
+    event.listen(Request.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+
+class RequestStats(Base):
+    """
+    Request count and amount sum per (user, company, status, risk_level).
+    Maintained in the same transaction as every write to requests
+    (app/services/request_stats.py); rebuilt by app/jobs/reconcile_request_stats.py.
+    """
+    
+    __tablename__ = "request_stats"
+    
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Owner of the requests"
+    )
+    
+    company_id = Column(
+        Integer,
+        ForeignKey("companies.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Company of the requests"
+    )
+    
+    status = Column(
+        String(20),
+        primary_key=True,
+        doc="RequestStatus value, e.g. 'approved'"
+    )
+    
+    risk_level = Column(
+        String(50),
+        primary_key=True,
+        doc="Risk level; empty string for requests without one"
+    )
+    
+    request_count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        doc="Number of requests"
+    )
+    
+    amount_sum = Column(
+        Float,
+        nullable=False,
+        default=0.0,
+        doc="Sum of the requested amounts"
+    )
+    
+    def __repr__(self) -> str:
+        return (f"<RequestStats(user_id={self.user_id}, company_id={self.company_id}, status='{self.status}', "
+                f"risk_level='{self.risk_level}', request_count={self.request_count})>")
@@ -4,13 +4,20 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.models.user import User
-from app.schemas.schemas import UserCreate, UserLogin, UserResponse, Token
+from app.schemas.schemas import UserCreate, UserLogin, UserResponse, Token, RefreshTokenRequest
 from app.services.auth import (
     hash_password,
     authenticate_user,
     create_access_token,
     get_current_user
 )
+from app.services.principals import Principal
+from app.services.refresh_tokens import (
+    RefreshTokenError,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token
+)
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -68,7 +75,9 @@ def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
             print(f"Authentication successful for user: {user.id}")
         
         access_token = create_access_token(data={"sub": str(user.id)})
-        return Token(access_token=access_token, token_type="bearer")
+        refresh_token = issue_refresh_token(db, user.id)
+        db.commit()
+        return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
     
     except HTTPException:
         raise
@@ -82,14 +91,41 @@ def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
         )
 
 
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(body: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and a new refresh token (the old one stops working)"""
+    # Sin bcrypt: una búsqueda por clave primaria y un UPDATE
+    try:
+        user_id, refresh_token = rotate_refresh_token(db, body.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = create_access_token(data={"sub": str(user_id)})
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+@router.post("/logout")
+def logout_user(body: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Revoke the session of a refresh token; access tokens already issued last until they expire"""
+    revoke_refresh_token(db, body.refresh_token)
+    return {"message": "Logged out"}
+
+
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get current user information"""
+    # El principal cacheado solo tiene id y flags: el perfil se lee aquí
+    user = db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
     return UserResponse(
-        id=str(current_user.id),
-        email=current_user.email,
-        full_name=current_user.full_name,
-        created_at=current_user.created_at
+        id=str(user.id),
+        email=user.email,
+        full_name=user.full_name,
+        created_at=user.created_at
     )
 
 
@@ -1,20 +1,27 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, status
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.models.user import User
 from app.models.company import Company
 from app.schemas.schemas import CompanyCreate, CompanyResponse, CompanyUpdate
 from app.services.auth import get_current_user
+from app.services.exports import accepts_gzip, export_response
+from app.services.principals import Principal
+from app.services.request_counts import invalidate_request_counts
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
+LIST_COLUMNS = (
+    Company.id, Company.name, Company.email, Company.phone, Company.industry,
+    Company.annual_revenue, Company.company_size, Company.created_at
+)
+
 
 @router.post("/", response_model=CompanyResponse)
 def create_company(
     company_data: CompanyCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new company for the current user"""
@@ -46,11 +53,12 @@ def create_company(
 
 @router.get("/", response_model=List[CompanyResponse])
 def list_companies(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get companies for the current user only"""
-    companies = db.query(Company).filter(Company.user_id == current_user.id).all()
+    # Tuplas con las columnas de la respuesta, sin entidades ni columnas de texto largas
+    companies = db.query(*LIST_COLUMNS).filter(Company.user_id == current_user.id).all()
     
     return [
         CompanyResponse(
@@ -87,10 +95,23 @@ def list_companies_no_auth(db: Session = Depends(get_db)):
     ]
 
 
+@router.get("/export")
+def export_companies(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    accept_encoding: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Stream the current user's companies as CSV or NDJSON (gzip when accepted)"""
+    statement = db.query(*LIST_COLUMNS).filter(Company.user_id == current_user.id).order_by(Company.id).statement
+    fields = [column.key for column in LIST_COLUMNS]
+    return export_response(db.get_bind(), statement, fields, format, "companies", accepts_gzip(accept_encoding))
+
+
 @router.get("/{company_id}", response_model=CompanyResponse)
 def get_company(
     company_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific company (only if owned by current user)"""
@@ -117,7 +138,7 @@ def get_company(
 def update_company(
     company_id: int,
     company_data: CompanyUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a company (only if owned by current user)"""
@@ -135,6 +156,8 @@ def update_company(
     
     db.commit()
     db.refresh(company)
+    # El nombre de la empresa entra en la búsqueda de solicitudes: los totales guardados ya no valen
+    invalidate_request_counts(current_user.id)
     
     return CompanyResponse(
         id=str(company.id),
@@ -151,7 +174,7 @@ def update_company(
 @router.delete("/{company_id}")
 def delete_company(
     company_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a company (only if owned by current user)"""
@@ -164,5 +187,7 @@ def delete_company(
     
     db.delete(company)
     db.commit()
+    # Las solicitudes de la empresa se borran en cascada
+    invalidate_request_counts(current_user.id)
     
     return {"message": "Company deleted successfully"}
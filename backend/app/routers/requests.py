@@ -1,112 +1,291 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Header, Query
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_
+from typing import List, Optional, Sequence, Tuple
 from datetime import datetime, timezone
 import math
 
 from app.core.database import get_db
-from app.models.user import User
+from app.core.pagination import CursorError, datetime_literal, keyset_page
 from app.models.company import Company
-from app.models.request import Request
+from app.models.request import Request, RequestStatus
 from app.schemas.schemas import (
     RequestCreate, 
     RequestUpdate, 
     RequestResponse, 
     RequestListResponse,
     PaginatedRequestsResponse,
-    RiskRequest
+    FacetCount
 )
+from app.services import risk_engine
 from app.services.auth import get_current_user
-from app.services.risk_calculator import calculate_risk_score
+from app.services.exports import accepts_gzip, export_response
+from app.services.principals import Principal
+from app.services.recommendations import get_locale, joined_recommendations
+from app.services.request_counts import count_requests, invalidate_request_counts
+from app.services.request_facets import (
+    FACET_COLUMNS, FACETS, facet_counts, facet_filters, total_from_facets
+)
+from app.services.request_search import apply_search
+from app.services.request_stats import stats_groups
+from app.services.request_summary import fold_summary, summary_groups
+from app.services.risk_calculator import calculate_risk_score, risk_request_from_inputs
+from app.services.risk_rescore import pending_rescores, rescore_stale
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
+# Campos de RequestListResponse que se pueden pedir con ?fields= (todos son columnas de Request)
+LIST_FIELDS = tuple(RequestListResponse.model_fields)
+# Siempre cargadas: la clave del cursor y lo que rescore_stale necesita para detectar filas viejas
+LIST_KEY_COLUMNS = ("id", "created_at", "company_id", "rules_version")
+# Claves de ?sort= ("-" = descendente); cada una termina en id y tiene su índice (user_id, columna, id)
+SORT_KEYS = {
+    "created_at": (Request.created_at, Request.id),
+    "amount": (Request.amount, Request.id),
+    "risk_score": (Request.risk_score, Request.id),
+}
+SORT_PATTERN = "^-?(" + "|".join(SORT_KEYS) + ")$"
+DEFAULT_SORT = "-created_at"
+# Solicitudes que todavía esperan una decisión
+OPEN_STATUSES = (RequestStatus.PENDING, RequestStatus.UNDER_REVIEW)
+
+
+def parse_names(value: Optional[str], allowed: Sequence[str], what: str) -> Tuple[str, ...]:
+    """Names of a comma-separated parameter, in the order of allowed; 400 on unknown names"""
+    requested = {name.strip() for name in (value or "").split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {what}: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in requested)
+
+
+def parse_list_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Fields requested with ?fields=a,b (id is always included); every field when fields is empty"""
+    if not fields:
+        return LIST_FIELDS
+    requested = parse_names(fields, LIST_FIELDS, "fields")
+    return tuple(name for name in LIST_FIELDS if name in requested or name == "id")
+
+
+def list_item(request: Request, fields: Sequence[str]) -> RequestListResponse:
+    values = {name: getattr(request, name) for name in fields}
+    for name in ("id", "company_id"):
+        if name in values:
+            values[name] = str(values[name])
+    return RequestListResponse(**values)
+
+
+def sort_key(sort: str) -> Tuple[tuple, bool]:
+    """Key columns of a ?sort= value and whether it is descending"""
+    return SORT_KEYS[sort.lstrip("-")], sort.startswith("-")
+
+
+class RequestListFilters:
+    """Filters shared by GET /requests and GET /requests/export"""
+
+    def __init__(
+        self,
+        search: Optional[str] = Query(None, description="Search in purpose or company name"),
+        company_id: Optional[str] = Query(None, description="Filter by company ID"),
+        status: Optional[str] = Query(None, description="Filter by status"),
+        risk_level: Optional[str] = Query(None, description="Filter by risk level"),
+        min_amount: Optional[float] = Query(None, description="Minimum amount"),
+        max_amount: Optional[float] = Query(None, description="Maximum amount"),
+        created_from: Optional[datetime] = Query(None, description="Created at or after (ISO 8601, UTC if naive)"),
+        created_to: Optional[datetime] = Query(None, description="Created before (ISO 8601, UTC if naive)"),
+    ):
+        self.search = search
+        self.company_id = company_id
+        self.status = status
+        self.risk_level = risk_level
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def key(self) -> tuple:
+        """Hashable form, for the count cache"""
+        return (
+            self.company_id, self.status, self.risk_level, self.min_amount, self.max_amount, self.search,
+            self.created_from, self.created_to
+        )
+
+    def by_facet(self) -> dict:
+        """Filters on facet dimensions (request_facets.FACETS) that were given"""
+        values = {"company_id": self.company_id, "status": self.status, "risk_level": self.risk_level}
+        return {name: value for name, value in values.items() if value}
+
+    def apply(self, db: Session, query):
+        """Apply the filters that are not facets; returns the query and the search rank order (or None)"""
+        if self.min_amount is not None:
+            query = query.filter(Request.amount >= self.min_amount)
+        
+        if self.max_amount is not None:
+            query = query.filter(Request.amount <= self.max_amount)
+
+        # Mismo criterio que el resumen: desde inclusive, hasta exclusive
+        if self.created_from is not None:
+            query = query.filter(Request.created_at >= datetime_literal(self.created_from))
+        
+        if self.created_to is not None:
+            query = query.filter(Request.created_at < datetime_literal(self.created_to))
+        
+        # Search in purpose or company name
+        rank_order = None
+        if self.search:
+            # Índices de texto (GIN en PostgreSQL, FTS5 en SQLite) en vez de ILIKE '%term%'
+            query, rank_order = apply_search(query, db.get_bind().dialect.name, self.search)
+        return query, rank_order
+
 
-@router.get("/", response_model=PaginatedRequestsResponse)
+@router.get("/", response_model=PaginatedRequestsResponse, response_model_exclude_unset=True)
 def get_requests(
+    background_tasks: BackgroundTasks,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
-    search: Optional[str] = Query(None, description="Search in purpose or company name"),
-    company_id: Optional[str] = Query(None, description="Filter by company ID"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    risk_level: Optional[str] = Query(None, description="Filter by risk level"),
-    min_amount: Optional[float] = Query(None, description="Minimum amount"),
-    max_amount: Optional[float] = Query(None, description="Maximum amount"),
-    current_user: User = Depends(get_current_user),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page) or cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous page"),
+    count: str = Query("exact", pattern="^(exact|cached|estimate|none)$", description="How to compute total"),
+    sort: Optional[str] = Query(
+        None, pattern=SORT_PATTERN, description="created_at, amount or risk_score, - for descending (-created_at)"
+    ),
+    filters: RequestListFilters = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,amount,status"),
+    facets: Optional[str] = Query(None, description="Comma-separated facets to count: status,risk_level,company_id"),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get paginated requests for current user with filters"""
-    
-    # Base query - only user's requests
-    query = db.query(Request).filter(Request.user_id == current_user.id)
-    
-    # Apply filters
-    if company_id:
-        query = query.filter(Request.company_id == company_id)
-    
-    if status:
-        query = query.filter(Request.status == status)
-    
-    if risk_level:
-        query = query.filter(Request.risk_level == risk_level)
-    
-    if min_amount is not None:
-        query = query.filter(Request.amount >= min_amount)
-    
-    if max_amount is not None:
-        query = query.filter(Request.amount <= max_amount)
-    
-    # Search in purpose or company name
-    if search:
-        # Join with companies table for search
-        query = query.join(Company, Request.company_id == Company.id)
-        query = query.filter(
-            or_(
-                Request.purpose.ilike(f"%{search}%"),
-                Company.name.ilike(f"%{search}%")
-            )
-        )
+    item_fields = parse_list_fields(fields)
+    facet_names = parse_names(facets, FACETS, "facets")
+    sort_name = sort or DEFAULT_SORT
+    sort_columns, descending = sort_key(sort_name)
+    
+    # Base query - only user's requests; los filtros de facetas se aplican después, las facetas los necesitan aparte
+    filters_by_facet = filters.by_facet()
+    facet_base, rank_order = filters.apply(db, db.query(Request).filter(Request.user_id == current_user.id))
+    count_key = filters.key()
+    if sort_name.lstrip("-") == "risk_score":
+        # La comparación por clave no admite NULL: ordenar por score lista solo las solicitudes puntuadas
+        facet_base = facet_base.filter(Request.risk_score.is_not(None))
+        count_key += ("scored",)
+    query = facet_base.filter(*facet_filters(FACET_COLUMNS, filters_by_facet))
+    
+    # Conteos por faceta en una sola consulta; si alguna faceta no está filtrada, su suma es el total
+    counts = total = None
+    if facet_names:
+        counts = facet_counts(db, facet_base, facet_names, filters_by_facet)
+        if count == "exact":
+            total = total_from_facets(counts, filters_by_facet)
     
     # Get total count for pagination
-    total = query.count()
-    
-    # Calculate pagination
-    offset = (page - 1) * size
-    pages = math.ceil(total / size)
-    
-    # Get paginated results
-    requests = query.offset(offset).limit(size).all()
+    total_is_estimate = False
+    if total is None:
+        total, total_is_estimate = count_requests(db, query, count, current_user.id, count_key)
+    pages = math.ceil(total / size) if total is not None else None
+    
+    # Solo las columnas de la respuesta: sin notes, description ni risk_inputs si no se piden
+    query = query.options(load_only(*(
+        getattr(Request, name) for name in dict.fromkeys(LIST_KEY_COLUMNS + item_fields)
+    )))
+    
+    next_cursor = prev_cursor = None
+    if cursor or pagination == "cursor":
+        # Keyset por (columna de sort, id), servida por su índice (user_id, columna, id): cada página cuesta lo mismo
+        try:
+            result = keyset_page(query, sort_columns, sort_name, size, cursor, descending)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        requests, next_cursor, prev_cursor = result.items, result.next_cursor, result.prev_cursor
+        has_more = next_cursor is not None
+        page = None
+    else:
+        # Con búsqueda y sin sort, lo más relevante primero; el cursor siempre usa el orden de sort
+        order = [column.desc() if descending else column.asc() for column in sort_columns]
+        if rank_order is not None and sort is None:
+            order.insert(0, rank_order)
+        query = query.order_by(*order)
+        # Una fila de más indica si hay otra página, aun sin total
+        requests = query.offset((page - 1) * size).limit(size + 1).all()
+        has_more = len(requests) > size
+        requests = requests[:size]
+
+    # Solo se recalculan las filas de esta página que tengan reglas viejas
+    if rescore_stale(db, requests):
+        background_tasks.add_task(pending_rescores.flush, db.get_bind())
     
     # Convert to response format
-    items = [
-        RequestListResponse(
-            id=str(req.id),
-            company_id=str(req.company_id),
-            amount=req.amount,
-            purpose=req.purpose,
-            risk_inputs=req.risk_inputs,
-            status=req.status,
-            risk_level=req.risk_level,
-            risk_score=req.risk_score,
-            created_at=req.created_at
-        )
-        for req in requests
-    ]
+    items = [list_item(req, item_fields) for req in requests]
     
-    return PaginatedRequestsResponse(
+    response = PaginatedRequestsResponse(
         items=items,
         page=page,
         size=size,
         total=total,
-        pages=pages
+        pages=pages,
+        total_is_estimate=total_is_estimate,
+        has_more=has_more,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor
     )
+    if counts is not None:
+        # Asignado aparte: sin ?facets= la clave no aparece en la respuesta
+        response.facets = {
+            name: [FacetCount(value=value, count=n) for value, n in values] for name, values in counts.items()
+        }
+    return response
+
+
+@router.get("/export")
+def export_requests(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    filters: RequestListFilters = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to export, e.g. id,amount,status"),
+    accept_encoding: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream every request matching the list filters as CSV or NDJSON (gzip when accepted).
+    Scores are exported as stored, with their rules_version.
+    """
+    item_fields = parse_list_fields(fields)
+    query, _ = filters.apply(db, db.query(Request).filter(Request.user_id == current_user.id))
+    query = query.filter(*facet_filters(FACET_COLUMNS, filters.by_facet()))
+    # Orden de ix_requests_user_created_id: el cursor del servidor avanza por el índice, sin ordenar
+    statement = query.with_entities(*(getattr(Request, name) for name in item_fields)).order_by(
+        Request.created_at, Request.id
+    ).statement
+    return export_response(db.get_bind(), statement, item_fields, format, "requests", accepts_gzip(accept_encoding))
+
+
+@router.get("/riskiest", response_model=List[RequestListResponse])
+def get_riskiest_requests(
+    background_tasks: BackgroundTasks,
+    limit: int = Query(10, ge=1, le=100, description="How many requests to return"),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Open (pending or under review) requests with the lowest risk score, i.e. the riskiest, first"""
+    # Recorre ix_requests_user_risk_score_id en orden y se detiene en limit filas abiertas, sin ordenar
+    requests = db.query(Request).options(load_only(*(
+        getattr(Request, name) for name in dict.fromkeys(LIST_KEY_COLUMNS + LIST_FIELDS)
+    ))).filter(
+        Request.user_id == current_user.id,
+        Request.risk_score.is_not(None),
+        Request.status.in_(OPEN_STATUSES)
+    ).order_by(Request.risk_score, Request.id).limit(limit).all()
+
+    if rescore_stale(db, requests):
+        background_tasks.add_task(pending_rescores.flush, db.get_bind())
+    return [list_item(request, LIST_FIELDS) for request in requests]
 
 
 @router.post("/", response_model=RequestResponse)
 def create_request(
     request_data: RequestCreate,
-    current_user: User = Depends(get_current_user),
+    locale: str = Depends(get_locale),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new request"""
@@ -126,18 +305,17 @@ def create_request(
         raise HTTPException(status_code=404, detail="Company not found")
     
     # Create risk assessment data for calculation
-    risk_data = RiskRequest(
-        company_id=request_data.company_id,
-        amount=request_data.amount,
-        purpose=request_data.purpose,
-        annual_revenue=request_data.risk_inputs.get('annual_revenue', company.annual_revenue),
-        employee_count=request_data.risk_inputs.get('employee_count', company.company_size),
-        years_in_business=request_data.risk_inputs.get('years_in_business'),
-        debt_to_equity_ratio=request_data.risk_inputs.get('debt_to_equity_ratio'),
-        credit_score=request_data.risk_inputs.get('credit_score')
+    risk_data = risk_request_from_inputs(
+        request_data.company_id,
+        request_data.amount,
+        request_data.purpose,
+        request_data.risk_inputs,
+        company.annual_revenue,
+        company.company_size
     )
     
-    # Calculate risk score
+    # Calculate risk score (la versión se lee antes: si cambia en medio, la fila queda vieja y se recalcula al leerla)
+    rules_version = risk_engine.active_rules.version
     risk_result = calculate_risk_score(risk_data)
 
     # Create request
@@ -149,6 +327,8 @@ def create_request(
         risk_inputs=request_data.risk_inputs,
         risk_score=risk_result.risk_score,
         risk_level=risk_result.risk_level,
+        rules_version=rules_version,
+        recommendation_codes=risk_result.recommendation_codes,
         status="pending",  # Start as pending, can be updated later
         approved=False     # Will be determined when status is updated
     )
@@ -156,6 +336,7 @@ def create_request(
     db.add(new_request)
     db.commit()
     db.refresh(new_request)
+    invalidate_request_counts(current_user.id)
     
     return RequestResponse(
         id=str(new_request.id),
@@ -166,7 +347,9 @@ def create_request(
         risk_score=new_request.risk_score,
         status=new_request.status,
         risk_level=new_request.risk_level,
-        recommendations=new_request.recommendations,
+        rules_version=new_request.rules_version,
+        recommendations=joined_recommendations(new_request.recommendation_codes, locale, new_request.rules_version),
+        recommendation_codes=new_request.recommendation_codes,
         approved=new_request.approved,
         created_at=new_request.created_at,
         updated_at=new_request.updated_at
@@ -176,7 +359,9 @@ def create_request(
 @router.get("/{request_id}", response_model=RequestResponse)
 def get_request(
     request_id: str,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    locale: str = Depends(get_locale),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific request by ID"""
@@ -193,6 +378,9 @@ def get_request(
     
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
+
+    if rescore_stale(db, [request]):
+        background_tasks.add_task(pending_rescores.flush, db.get_bind())
     
     return RequestResponse(
         id=str(request.id),
@@ -203,7 +391,9 @@ def get_request(
         risk_score=request.risk_score,
         status=request.status,
         risk_level=request.risk_level,
-        recommendations=request.recommendations,
+        rules_version=request.rules_version,
+        recommendations=joined_recommendations(request.recommendation_codes, locale, request.rules_version),
+        recommendation_codes=request.recommendation_codes,
         approved=request.approved,
         created_at=request.created_at,
         updated_at=request.updated_at
@@ -214,7 +404,8 @@ def get_request(
 def update_request(
     request_id: str,
     request_data: RequestUpdate,
-    current_user: User = Depends(get_current_user),
+    locale: str = Depends(get_locale),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a specific request"""
@@ -265,20 +456,20 @@ def update_request(
     
     # Recalculate risk score only if relevant fields were updated
     if any(field in update_data for field in ["amount", "purpose", "risk_inputs"]):
-        risk_data = RiskRequest(
-            company_id=str(request.company_id),
-            amount=request.amount,
-            purpose=request.purpose,
-            annual_revenue=request.risk_inputs.get('annual_revenue', company.annual_revenue if company else None),
-            employee_count=request.risk_inputs.get('employee_count', company.company_size if company else None),
-            years_in_business=request.risk_inputs.get('years_in_business'),
-            debt_to_equity_ratio=request.risk_inputs.get('debt_to_equity_ratio'),
-            credit_score=request.risk_inputs.get('credit_score')
+        risk_data = risk_request_from_inputs(
+            str(request.company_id),
+            request.amount,
+            request.purpose,
+            request.risk_inputs,
+            company.annual_revenue if company else None,
+            company.company_size if company else None
         )
         
+        request.rules_version = risk_engine.active_rules.version
         risk_result = calculate_risk_score(risk_data)
         request.risk_score = risk_result.risk_score
         request.risk_level = risk_result.risk_level
+        request.recommendation_codes = risk_result.recommendation_codes
         # Only update status if not manually specified
         if "status" not in update_data:
             request.status = "approved" if risk_result.approved else "rejected"
@@ -287,6 +478,7 @@ def update_request(
     request.updated_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(request)
+    invalidate_request_counts(current_user.id)
     
     return RequestResponse(
         id=str(request.id),
@@ -297,7 +489,9 @@ def update_request(
         risk_score=request.risk_score,
         status=request.status,
         risk_level=request.risk_level,
-        recommendations=request.recommendations,
+        rules_version=request.rules_version,
+        recommendations=joined_recommendations(request.recommendation_codes, locale, request.rules_version),
+        recommendation_codes=request.recommendation_codes,
         approved=request.approved,
         created_at=request.created_at,
         updated_at=request.updated_at
@@ -307,7 +501,7 @@ def update_request(
 @router.delete("/{request_id}")
 def delete_request(
     request_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a specific request"""
@@ -327,46 +521,23 @@ def delete_request(
     
     db.delete(request)
     db.commit()
+    invalidate_request_counts(current_user.id)
     
     return {"message": "Request deleted successfully"}
 
 
 @router.get("/stats/summary")
 def get_requests_summary(
-    current_user: User = Depends(get_current_user),
+    company_id: Optional[int] = Query(None, description="Only requests of this company"),
+    created_from: Optional[datetime] = Query(None, description="Created at or after (ISO 8601, UTC if naive)"),
+    created_to: Optional[datetime] = Query(None, description="Created before (ISO 8601, UTC if naive)"),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get summary statistics for user's requests"""
-    
-    total_requests = db.query(Request).filter(Request.user_id == current_user.id).count()
-    
-    approved_requests = db.query(Request).filter(
-        Request.user_id == current_user.id,
-        Request.status == "approved"
-    ).count()
-    
-    rejected_requests = db.query(Request).filter(
-        Request.user_id == current_user.id,
-        Request.status == "rejected"
-    ).count()
-    
-    pending_requests = db.query(Request).filter(
-        Request.user_id == current_user.id,
-        Request.status == "pending"
-    ).count()
-    
-    # Calculate total amount requested
-    total_amount = db.query(Request).filter(
-        Request.user_id == current_user.id
-    ).with_entities(Request.amount).all()
-    
-    total_amount_sum = sum([req.amount for req in total_amount]) if total_amount else 0
-    
-    return {
-        "total_requests": total_requests,
-        "approved_requests": approved_requests,
-        "rejected_requests": rejected_requests,
-        "pending_requests": pending_requests,
-        "total_amount_requested": total_amount_sum,
-        "approval_rate": round((approved_requests / total_requests * 100), 2) if total_requests > 0 else 0
-    }
+    """Get summary statistics for user's requests, with per-status and per-risk-level breakdowns"""
+    if created_from is None and created_to is None:
+        # Sin rango de fechas: unas pocas filas de request_stats, sin leer requests
+        return fold_summary(stats_groups(db, current_user.id, company_id))
+    # Una sola consulta agrupada por (status, risk_level) en vez de un COUNT por estado
+    groups = summary_groups(db, current_user.id, company_id, created_from, created_to)
+    return fold_summary(groups)
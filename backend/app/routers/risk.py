@@ -1,21 +1,62 @@
-from fastapi import APIRouter, HTTPException, Depends
+import json
+from typing import AsyncIterator, List, Tuple
+
+import numpy as np
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request as HTTPRequest
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.user import User
 from app.models.company import Company
 from app.models.request import Request
-from app.schemas.schemas import RiskRequest, RiskResponse
+from app.schemas.schemas import (
+    RiskRequest,
+    RiskResponse,
+    RiskBatchRequest,
+    RiskBatchResponse,
+    RiskBatchItemResult,
+    SensitivityRequest,
+    SensitivityResponse
+)
+from app.services import risk_engine
 from app.services.auth import get_current_user
+from app.services.principals import Principal
+from app.services.recommendations import get_locale
+from app.services.request_counts import invalidate_request_counts
+from app.services.request_stats import apply_deltas, insert_deltas
+from app.services.risk_batch import calculate_risk_score_grid, calculate_risk_scores_for_requests
 from app.services.risk_calculator import calculate_risk_score
 
 router = APIRouter(prefix="/risk", tags=["risk assessment"])
 
 
+def build_risk_inputs(risk_data: RiskRequest, company) -> dict:
+    """Snapshot of the inputs used for an assessment, stored in Request.risk_inputs"""
+    return {
+        'amount': risk_data.amount,
+        'purpose': risk_data.purpose,
+        'company_size': company.company_size,
+        'industry': company.industry,
+        'annual_revenue': risk_data.annual_revenue or company.annual_revenue,
+        'employee_count': risk_data.employee_count,
+        'years_in_business': risk_data.years_in_business,
+        'debt_to_equity_ratio': risk_data.debt_to_equity_ratio,
+        'credit_score': risk_data.credit_score
+    }
+
+
 @router.post("/assess", response_model=RiskResponse)
 def assess_risk(
     risk_data: RiskRequest,
-    current_user: User = Depends(get_current_user),
+    locale: str = Depends(get_locale),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new risk assessment"""
@@ -33,7 +74,8 @@ def assess_risk(
         raise HTTPException(status_code=404, detail="Company not found")
     
     # Use the new calculation method
-    result = calculate_risk_score(risk_data)
+    rules_version = risk_engine.active_rules.version
+    result = calculate_risk_score(risk_data, locale)
     
     # Create risk assessment request in database
     risk_request = Request(
@@ -43,29 +85,268 @@ def assess_risk(
         purpose=risk_data.purpose,
         risk_level=result.risk_level,
         risk_score=result.risk_score,
+        rules_version=rules_version,
         status="approved" if result.approved else "rejected",
-        risk_inputs={
-            'amount': risk_data.amount,
-            'purpose': risk_data.purpose,
-            'company_size': company.company_size,
-            'industry': company.industry,
-            'annual_revenue': risk_data.annual_revenue or company.annual_revenue,
-            'employee_count': risk_data.employee_count,
-            'years_in_business': risk_data.years_in_business,
-            'debt_to_equity_ratio': risk_data.debt_to_equity_ratio,
-            'credit_score': risk_data.credit_score
-        },
-        recommendations="; ".join(result.recommendations),
+        risk_inputs=build_risk_inputs(risk_data, company),
+        recommendation_codes=result.recommendation_codes,
         approved=result.approved
     )
     
     db.add(risk_request)
     db.commit()
-    db.refresh(risk_request)
+    invalidate_request_counts(current_user.id)
     
-    return RiskResponse(
-        risk_level=result.risk_level,
-        risk_score=result.risk_score,
-        recommendations=result.recommendations,
-        approved=result.approved
+    return result
+
+
+def assess_and_store(
+    db: Session, user_id: int, items: List[RiskRequest], locale: str = risk_engine.DEFAULT_LOCALE
+) -> List[RiskBatchItemResult]:
+    """Verify ownership, score and insert a list of assessments with one query, one INSERT and one commit"""
+    results = [RiskBatchItemResult(index=i) for i in range(len(items))]
+
+    company_ids = {}
+    for i, item in enumerate(items):
+        try:
+            company_ids[i] = int(item.company_id)
+        except ValueError:
+            results[i].error = "Invalid company ID format"
+
+    # Verify ownership of every referenced company with a single IN query
+    companies = {}
+    if company_ids:
+        rows = db.query(
+            Company.id,
+            Company.company_size,
+            Company.industry,
+            Company.annual_revenue
+        ).filter(
+            Company.id.in_(set(company_ids.values())),
+            Company.user_id == user_id
+        ).all()
+        companies = {row.id: row for row in rows}
+
+    valid = []
+    for i, company_id_int in company_ids.items():
+        if company_id_int in companies:
+            valid.append(i)
+        else:
+            results[i].error = "Company not found"
+
+    if not valid:
+        return results
+
+    valid_items = [items[i] for i in valid]
+    scored = calculate_risk_scores_for_requests(valid_items)
+
+    rows = []
+    for pos, (i, item) in enumerate(zip(valid, valid_items)):
+        response = scored.to_response(pos, locale)
+        results[i].result = response
+        rows.append({
+            "user_id": user_id,
+            "company_id": company_ids[i],
+            "amount": item.amount,
+            "purpose": item.purpose,
+            "risk_level": response.risk_level,
+            "risk_score": response.risk_score,
+            "rules_version": scored.rules.version,
+            "status": "approved" if response.approved else "rejected",
+            "risk_inputs": build_risk_inputs(item, companies[company_ids[i]]),
+            "recommendation_codes": response.recommendation_codes,
+            "approved": response.approved
+        })
+
+    # Single multi-row INSERT and a single commit for the whole batch
+    request_ids = db.scalars(
+        insert(Request).returning(Request.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    # El INSERT de Core no pasa por el flush: las estadísticas se suman aparte, en la misma transacción
+    apply_deltas(db, insert_deltas(rows))
+    db.commit()
+    invalidate_request_counts(user_id)
+
+    for i, request_id in zip(valid, request_ids):
+        results[i].request_id = str(request_id)
+
+    return results
+
+
+@router.post("/assess/batch", response_model=RiskBatchResponse)
+def assess_risk_batch(
+    batch: RiskBatchRequest,
+    locale: str = Depends(get_locale),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create many risk assessments in one call; failures are reported per item"""
+    results = assess_and_store(db, current_user.id, batch.items, locale)
+
+    failed = sum(1 for result in results if result.error)
+    return RiskBatchResponse(
+        results=results,
+        processed=len(results) - failed,
+        failed=failed
     )
+
+
+@router.post("/sensitivity", response_model=SensitivityResponse)
+def risk_sensitivity(
+    params: SensitivityRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """What-if grid of score and approval over amount x debt_to_equity_ratio; nothing is stored"""
+    try:
+        company_id_int = int(params.company_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid company ID format")
+
+    company = db.query(Company.annual_revenue, Company.company_size).filter(
+        Company.id == company_id_int,
+        Company.user_id == current_user.id
+    ).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    amounts = np.linspace(params.amount.start, params.amount.stop, params.amount.steps)
+    debt_ratios = np.linspace(
+        params.debt_to_equity_ratio.start,
+        params.debt_to_equity_ratio.stop,
+        params.debt_to_equity_ratio.steps
+    )
+
+    # Igual que /requests: las métricas no indicadas se toman de la empresa
+    result = calculate_risk_score_grid(
+        amounts,
+        debt_ratios,
+        params.annual_revenue if params.annual_revenue is not None else company.annual_revenue,
+        params.employee_count if params.employee_count is not None else company.company_size,
+        params.years_in_business,
+        params.credit_score
+    )
+    shape = (len(amounts), len(debt_ratios))
+
+    return SensitivityResponse(
+        company_id=params.company_id,
+        rules_version=result.rules.version,
+        amounts=amounts.tolist(),
+        debt_to_equity_ratios=debt_ratios.tolist(),
+        scores=result.scores.reshape(shape).tolist(),
+        risk_levels=result.levels.reshape(shape).tolist(),
+        approved=result.approved.reshape(shape).tolist()
+    )
+
+
+class LineTooLongError(Exception):
+    """Raised when an NDJSON line exceeds RISK_STREAM_MAX_LINE_BYTES"""
+
+    def __init__(self, line_number: int):
+        super().__init__(f"Line exceeds {settings.RISK_STREAM_MAX_LINE_BYTES} bytes")
+        self.line_number = line_number
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for generators that are still reading the request body.
+    Starlette's default listen_for_disconnect (ASGI spec < 2.4) would consume the
+    http.request messages the generator is waiting for; a disconnect surfaces
+    instead as ClientDisconnect from Request.stream() or OSError on send.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+        if self.background is not None:
+            await self.background()
+
+
+def _error_line(line_number: int, error) -> bytes:
+    return (json.dumps({"line": line_number, "error": error}) + "\n").encode("utf-8")
+
+
+async def _ndjson_lines(http_request: HTTPRequest) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield (line_number, raw_line) from the request body without buffering it whole"""
+    buffer = b""
+    line_number = 0
+    async for chunk in http_request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if len(line) > settings.RISK_STREAM_MAX_LINE_BYTES:
+                raise LineTooLongError(line_number)
+            if line.strip():
+                yield line_number, line
+        if len(buffer) > settings.RISK_STREAM_MAX_LINE_BYTES:
+            raise LineTooLongError(line_number + 1)
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+@router.post("/assess/stream")
+async def assess_risk_stream(
+    http_request: HTTPRequest,
+    persist: bool = Query(False, description="Store each assessment as a Request"),
+    locale: str = Depends(get_locale),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Score a newline-delimited JSON stream of RiskRequest records.
+    Responds with one RiskResponse (or {"line", "error"}) per non-empty input line, in order.
+    """
+    user_id = current_user.id
+    bind = db.get_bind()
+
+    async def score_stream() -> AsyncIterator[bytes]:
+        # Sesión propia: la del dependency se cierra antes de terminar el streaming
+        session = Session(bind=bind) if persist else None
+        pending: List[Tuple[int, RiskRequest]] = []
+
+        async def flush() -> AsyncIterator[bytes]:
+            results = await run_in_threadpool(
+                assess_and_store, session, user_id, [item for _, item in pending], locale
+            )
+            for (line_number, _), result in zip(pending, results):
+                if result.error:
+                    yield _error_line(line_number, result.error)
+                else:
+                    yield (result.result.model_dump_json() + "\n").encode("utf-8")
+            pending.clear()
+
+        try:
+            async for line_number, line in _ndjson_lines(http_request):
+                try:
+                    risk_data = RiskRequest.model_validate_json(line)
+                except ValidationError as e:
+                    yield _error_line(line_number, json.loads(e.json(include_url=False)))
+                    continue
+
+                if not persist:
+                    yield (calculate_risk_score(risk_data, locale).model_dump_json() + "\n").encode("utf-8")
+                    continue
+
+                pending.append((line_number, risk_data))
+                if len(pending) >= settings.RISK_STREAM_CHUNK_SIZE:
+                    async for out in flush():
+                        yield out
+
+            if pending:
+                async for out in flush():
+                    yield out
+        except LineTooLongError as e:
+            # Las líneas ya validadas del chunk en curso se guardan antes de cortar el stream
+            if pending:
+                async for out in flush():
+                    yield out
+            yield _error_line(e.line_number, str(e))
+        finally:
+            if session is not None:
+                await run_in_threadpool(session.close)
+
+    return RequestBodyStreamingResponse(score_stream(), media_type="application/x-ndjson")
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Dict, Optional, List
 from datetime import datetime
 
+from app.core.config import settings
+
 # User schemas
 class UserBase(BaseModel):
     email: EmailStr
@@ -32,6 +34,10 @@ class UserCompany(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -79,8 +85,49 @@ class RiskResponse(BaseModel):
     risk_level: str
     risk_score: float
     recommendations: List[str]
+    recommendation_codes: List[int] = []
     approved: bool
 
+    class Config:
+        frozen = True  # calculate_risk_score puede devolver la misma instancia desde la caché
+
+class RiskBatchRequest(BaseModel):
+    items: List[RiskRequest] = Field(..., min_length=1, max_length=settings.RISK_BATCH_MAX_ITEMS)
+
+class RiskBatchItemResult(BaseModel):
+    index: int
+    request_id: Optional[str] = None
+    result: Optional[RiskResponse] = None
+    error: Optional[str] = None
+
+class RiskBatchResponse(BaseModel):
+    results: List[RiskBatchItemResult]
+    processed: int
+    failed: int
+
+class SensitivityRange(BaseModel):
+    start: float
+    stop: float
+    steps: int = Field(..., ge=1, le=settings.RISK_SENSITIVITY_MAX_STEPS)
+
+class SensitivityRequest(BaseModel):
+    company_id: str
+    amount: SensitivityRange
+    debt_to_equity_ratio: SensitivityRange
+    annual_revenue: Optional[float] = None  # Por defecto, el de la empresa
+    employee_count: Optional[int] = None  # Por defecto, company_size
+    years_in_business: Optional[int] = None
+    credit_score: Optional[int] = None
+
+class SensitivityResponse(BaseModel):
+    company_id: str
+    rules_version: str
+    amounts: List[float]
+    debt_to_equity_ratios: List[float]
+    scores: List[List[float]]  # scores[i][j] para amounts[i] y debt_to_equity_ratios[j]
+    risk_levels: List[List[str]]
+    approved: List[List[bool]]
+
 # Request schemas
 class RequestBase(BaseModel):
     company_id: str
@@ -103,7 +150,9 @@ class RequestResponse(RequestBase):
     risk_score: float
     status: str
     risk_level: Optional[str] = None
-    recommendations: Optional[str] = None
+    rules_version: Optional[str] = None
+    recommendations: Optional[str] = None  # Textos unidos con "; " en el idioma pedido
+    recommendation_codes: Optional[List[int]] = None
     approved: Optional[bool] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -112,15 +161,17 @@ class RequestResponse(RequestBase):
         from_attributes = True
 
 class RequestListResponse(BaseModel):
+    # Todo salvo id es opcional: GET /requests?fields=... omite los campos no pedidos
     id: str
-    company_id: str
-    amount: float
-    purpose: str
-    risk_inputs: dict
-    status: str
+    company_id: Optional[str] = None
+    amount: Optional[float] = None
+    purpose: Optional[str] = None
+    risk_inputs: Optional[dict] = None
+    status: Optional[str] = None
     risk_level: Optional[str] = None
-    risk_score: float
-    created_at: datetime
+    risk_score: Optional[float] = None
+    rules_version: Optional[str] = None
+    created_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -133,9 +184,18 @@ class PaginatedResponse(BaseModel):
     total: int
     pages: int
 
+class FacetCount(BaseModel):
+    value: Optional[str] = None  # None: sin valor (p. ej. risk_level sin calcular)
+    count: int
+
 class PaginatedRequestsResponse(BaseModel):
     items: List[RequestListResponse]
-    page: int
+    page: Optional[int] = None  # None con paginación por cursor
     size: int
-    total: int
-    pages: int
+    total: Optional[int] = None  # None con count=none
+    pages: Optional[int] = None
+    total_is_estimate: bool = False
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    facets: Optional[Dict[str, List[FacetCount]]] = None  # solo con ?facets=
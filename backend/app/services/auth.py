@@ -1,6 +1,8 @@
 from typing import Optional
 from datetime import datetime, timedelta, timezone
+import hashlib
 import os
+import time
 
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -8,22 +10,42 @@ from sqlalchemy.orm import Session
 import jwt
 import bcrypt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
+from app.services.password_cost import needs_rehash, target_rounds
+from app.services.password_pool import HashingPoolFull, hashing_pool
+from app.services.principals import Principal, load_principal
 
 security = HTTPBearer()
 
+# Claims ya verificados por digest del token: la firma se comprueba una vez por token y proceso.
+# Cada entrada vence con el exp del token; sin TTL propio, el tamaño la acota (LRU).
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE)
+
+
+def _on_hashing_pool(fn, *args):
+    # Pool saturado: 503 con Retry-After en vez de encolar más hilos de requests
+    try:
+        return hashing_pool.run(fn, *args)
+    except HashingPoolFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent sign-ins, retry shortly",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)}
+        )
+
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    """Hash a password using bcrypt (on the bounded hashing pool; 503 when it is full)"""
+    salt = bcrypt.gensalt(rounds=target_rounds())
+    return _on_hashing_pool(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    """Verify a password against its hash (on the bounded hashing pool; 503 when it is full)"""
+    return _on_hashing_pool(bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
 def create_access_token(data: dict) -> str:
@@ -34,13 +56,31 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verified claims of a bearer token, from token_cache when it was already verified.
+    Raises jwt.PyJWTError like jwt.decode; the returned dict is shared, do not modify it.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = token_cache.get(key)
+    # El exp se vuelve a mirar con el reloj de pared: nunca se sirve un token vencido
+    if claims is not None and claims["exp"] > time.time():
+        return claims
+
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    # Sin exp no se cachea: la entrada no vencería nunca
+    if isinstance(claims.get("exp"), (int, float)):
+        token_cache.set(key, claims, ttl=claims["exp"] - time.time())
+    return claims
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
+) -> Principal:
+    """Get the current authenticated user (id and flags, cached per process; see services/principals.py)"""
     try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_access_token(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
@@ -54,10 +94,12 @@ def get_current_user(
     
     # Improved database query with error handling
     try:
-        user = db.query(User).filter(User.id == user_id_int).first()
-        if user is None:
+        principal = load_principal(db, user_id_int)
+        if principal is None:
             raise HTTPException(status_code=401, detail="User not found")
-        return user
+        if not principal.is_active:
+            raise HTTPException(status_code=401, detail="Inactive user")
+        return principal
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
@@ -79,6 +121,18 @@ def get_current_user(
             raise HTTPException(status_code=401, detail="Authentication failed")
 
 
+def _rehash(db: Session, user: User, password: str) -> None:
+    # Costo distinto del objetivo: se reemplaza con la contraseña recién verificada.
+    # Si falla (pool lleno, error de DB) el login sigue y se reintenta en el próximo.
+    try:
+        user.hashed_password = hash_password(password)
+        db.commit()
+    except Exception:
+        db.rollback()
+        import logging
+        logging.warning("Could not rehash the password of user %s", user.id)
+
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password"""
     try:
@@ -105,9 +159,15 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         
         if not password_valid:
             return None
+
+        if needs_rehash(user.hashed_password):
+            _rehash(db, user, password)
             
         return user
         
+    except HTTPException:
+        # Pool de hashing lleno (503): no es un login fallido
+        raise
     except Exception as e:
         # Log only critical errors, not connection issues, and only in development
         error_msg = str(e).lower()
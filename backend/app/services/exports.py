@@ -0,0 +1,112 @@
+"""
+Streaming CSV / NDJSON exports (GET /requests/export, GET /companies/export).
+
+Rows are read with a server-side cursor (stream_results + yield_per) on a connection
+of their own, encoded one batch at a time and optionally gzip-compressed on the fly,
+so memory stays at one batch no matter how many rows are exported. The generators
+are synchronous: StreamingResponse runs them in the threadpool.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Iterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+# Los ids se exportan como texto, igual que en las respuestas de la API
+ID_FIELDS = frozenset({"id", "company_id"})
+
+
+def _json_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    value = _json_value(value)
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+
+def stream_rows(bind: Engine, statement: Select, batch_size: Optional[int] = None) -> Iterator[Sequence]:
+    """Batches of rows of statement, read with a server-side cursor on a connection of its own"""
+    with bind.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=batch_size or settings.EXPORT_BATCH_SIZE
+        ).execute(statement)
+        yield from result.partitions()
+
+
+def encode_rows(batches: Iterable[Sequence], fields: Sequence[str], fmt: str) -> Iterator[bytes]:
+    """One chunk of CSV (header first) or NDJSON per batch of rows with the columns in fields"""
+    ids = [i for i, name in enumerate(fields) if name in ID_FIELDS]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(fields)
+
+    for batch in batches:
+        for row in batch:
+            values = list(row)
+            for i in ids:
+                values[i] = str(values[i]) if values[i] is not None else None
+            if fmt == "csv":
+                writer.writerow([_csv_value(value) for value in values])
+            else:
+                record = {name: _json_value(value) for name, value in zip(fields, values)}
+                buffer.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """gzip stream of chunks, compressed as they are produced"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (gzip;q=0 does not)"""
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip() in ("gzip", "*"):
+            params = params.strip()
+            try:
+                return float(params[2:]) > 0 if params.startswith("q=") else True
+            except ValueError:
+                return True
+    return False
+
+
+def export_response(
+    bind: Engine, statement: Select, fields: Sequence[str], fmt: str, filename: str, compress: bool
+) -> StreamingResponse:
+    """StreamingResponse with the rows of statement as CSV or NDJSON, gzip-compressed when compress"""
+    chunks = encode_rows(stream_rows(bind, statement), fields, fmt)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{fmt}"', "Vary": "Accept-Encoding"}
+    if compress:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[fmt], headers=headers)
@@ -0,0 +1,77 @@
+"""
+bcrypt work factor: calibration for this hardware and detection of outdated hashes.
+
+Each extra round doubles the cost of hashing and of verifying. BCRYPT_ROUNDS fixes
+the target cost; with BCRYPT_ROUNDS=0 the target is calibrated once per process at
+startup as the highest cost whose hash takes at most BCRYPT_TARGET_MS (never below
+MIN_ROUNDS). Running app/jobs/calibrate_bcrypt.py and setting the result is better
+with several workers or hosts: each calibration can land on a different cost.
+
+authenticate_user rehashes a stored hash on a successful login when its cost differs
+from the target, so changing the cost needs no password reset.
+"""
+import re
+import threading
+import time
+from typing import Optional
+
+import bcrypt
+
+from app.core.config import settings
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 31  # Límite del formato de bcrypt
+# Costo de la medición base; el resto se extrapola (cada ronda duplica el tiempo)
+_PROBE_ROUNDS = 8
+_PASSWORD = b"calibration-password"
+
+_HASH_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+_lock = threading.Lock()
+_calibrated: Optional[int] = None
+
+
+def measure_ms(rounds: int, repeats: int = 3) -> float:
+    """Best time of hashing a password with rounds, in ms"""
+    salt = bcrypt.gensalt(rounds=rounds)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        bcrypt.hashpw(_PASSWORD, salt)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def calibrate(target_ms: float) -> int:
+    """Highest cost whose hash takes at most target_ms here (MIN_ROUNDS at least)"""
+    probe = measure_ms(_PROBE_ROUNDS)
+    rounds = _PROBE_ROUNDS
+    while rounds < MAX_ROUNDS and probe * 2 ** (rounds + 1 - _PROBE_ROUNDS) <= target_ms:
+        rounds += 1
+    rounds = max(rounds, MIN_ROUNDS)
+    # La extrapolación puede pasarse: se confirma midiendo el costo elegido
+    while rounds > MIN_ROUNDS and measure_ms(rounds, repeats=1) > target_ms:
+        rounds -= 1
+    return rounds
+
+
+def target_rounds() -> int:
+    """Cost for new hashes: BCRYPT_ROUNDS, or the calibrated cost when it is 0"""
+    global _calibrated
+    if settings.BCRYPT_ROUNDS:
+        return settings.BCRYPT_ROUNDS
+    with _lock:
+        if _calibrated is None:
+            _calibrated = calibrate(settings.BCRYPT_TARGET_MS)
+        return _calibrated
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost of a stored bcrypt hash, or None when it is not a bcrypt hash"""
+    match = _HASH_COST.match(hashed_password)
+    return int(match.group(1)) if match else None
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash should be replaced on the next successful login"""
+    return hash_rounds(hashed_password) != target_rounds()
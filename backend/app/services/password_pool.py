@@ -0,0 +1,89 @@
+"""
+Bounded pool for password hashing (bcrypt) in login and register.
+
+bcrypt is deliberately slow and runs in the request thread of a sync endpoint, so
+a burst of logins could take every thread of the Starlette pool. Here hashing runs
+on PASSWORD_HASH_WORKERS dedicated threads (bcrypt releases the GIL while it works),
+and at most PASSWORD_HASH_MAX_PENDING calls may be running or waiting for them.
+Past that the call fails at once with HashingPoolFull instead of queueing, so the
+request threads held by auth are bounded and the rest of the API keeps its share.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Muestras recientes para los percentiles de /health/metrics
+_SAMPLES = 1024
+
+
+class HashingPoolFull(RuntimeError):
+    """Too many hashing calls running or waiting"""
+
+
+def _percentile(samples: Deque[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000, 2)
+
+
+class HashingPool:
+    """Runs hashing calls on a fixed set of threads with a cap on pending calls"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=_SAMPLES)
+        self._runs: Deque[float] = deque(maxlen=_SAMPLES)
+        self.completed = 0
+        self.rejected = 0
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        """Run fn(*args) on the pool and wait for it; HashingPoolFull when the pool is saturated"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingPoolFull("Password hashing pool is full")
+        try:
+            submitted = time.perf_counter()
+            return self._executor.submit(self._timed, submitted, fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _timed(self, submitted: float, fn: Callable[..., T], *args) -> T:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._waits.append(started - submitted)
+                self._runs.append(finished - started)
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Counters and latencies (ms) for monitoring endpoints"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_ms_p50": _percentile(self._waits, 0.5),
+                "queue_wait_ms_p95": _percentile(self._waits, 0.95),
+                "hash_ms_p50": _percentile(self._runs, 0.5),
+                "hash_ms_p95": _percentile(self._runs, 0.95),
+                "hash_ms_max": round(max(self._runs) * 1000, 2) if self._runs else None,
+            }
+
+
+hashing_pool = HashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
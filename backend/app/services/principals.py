@@ -0,0 +1,77 @@
+"""
+Per-process cache of authenticated principals for get_current_user.
+
+Every authenticated call needs the user behind the token, but the handlers only
+use its id (and the auth checks is_active). The cache keeps that much, keyed by
+user id, for PRINCIPAL_CACHE_TTL_SECONDS, so a warm call does not open a DB
+connection for the principal.
+
+ORM writes to a user (update, deactivation, delete) drop its entry when the
+transaction commits. Bulk UPDATEs that bypass the ORM must call
+invalidate_principal themselves; other workers see any change after the TTL.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by the handlers"""
+    id: int
+    is_active: bool
+    is_superuser: bool
+
+
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """Cached principal of user_id; None (not cached) when the user does not exist"""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = db.query(User.id, User.is_active, User.is_superuser).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        principal = Principal(id=row.id, is_active=row.is_active, is_superuser=row.is_superuser)
+        principal_cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """Forget one cached principal, or all of them when user_id is None"""
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(user_id)
+
+
+_CHANGED_KEY = "principals_changed"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault(_CHANGED_KEY, set()).update(changed)
+        # Ya en el flush: esta sesión no vuelve a leer el valor viejo de la caché
+        for user_id in changed:
+            principal_cache.pop(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_changed_users(session: Session) -> None:
+    # Otra request pudo volver a cachear la fila vieja entre el flush y el commit
+    for user_id in session.info.pop(_CHANGED_KEY, ()):
+        principal_cache.pop(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
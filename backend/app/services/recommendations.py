@@ -0,0 +1,56 @@
+"""
+Recommendation texts for API responses.
+
+Requests store recommendation codes (see risk_engine.recommendation_code); the text
+is resolved when a response is built, in the locale picked from Accept-Language.
+"""
+from typing import List, Optional, Sequence
+
+from fastapi import Header
+
+from app.services import risk_engine
+
+
+def resolve_locale(accept_language: Optional[str]) -> str:
+    """First supported language of an Accept-Language header, honoring q-values"""
+    if not accept_language:
+        return risk_engine.DEFAULT_LOCALE
+
+    candidates = []
+    for position, part in enumerate(accept_language.split(",")):
+        language, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        # "es-AR" -> "es"
+        candidates.append((-quality, position, language.strip().lower().split("-")[0]))
+
+    for quality, _, language in sorted(candidates):
+        if quality < 0 and language in risk_engine.RECOMMENDATION_TEXTS:
+            return language
+    return risk_engine.DEFAULT_LOCALE
+
+
+def get_locale(accept_language: Optional[str] = Header(None)) -> str:
+    """Dependency: locale for the recommendation texts of this response"""
+    return resolve_locale(accept_language)
+
+
+def recommendation_texts(
+    codes: Optional[Sequence[int]], locale: str, rules_version: Optional[str] = None
+) -> List[str]:
+    """Texts of stored codes, using the catalog of the rules that produced them when still registered"""
+    rules = risk_engine.get_rules(rules_version) if rules_version else None
+    return risk_engine.recommendation_texts(codes or (), locale, rules)
+
+
+def joined_recommendations(
+    codes: Optional[Sequence[int]], locale: str, rules_version: Optional[str] = None
+) -> Optional[str]:
+    """Texts of stored codes joined with "; ", the format of RequestResponse.recommendations"""
+    if codes is None:
+        return None
+    return "; ".join(recommendation_texts(codes, locale, rules_version))
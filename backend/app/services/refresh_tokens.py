@@ -0,0 +1,121 @@
+"""
+Refresh tokens: renew the access token without the password (and without bcrypt).
+
+A refresh token is "<token id>.<secret>", where the token id is a random public
+identifier of the session (not its primary key, so sessions cannot be enumerated).
+The session row (models/refresh_token.py) keeps only the SHA-256 of the current
+secret and of the previous one, so renewing costs one indexed lookup and a
+compare-and-set UPDATE. Every renewal rotates the secret and the previous token
+stops working. Presenting the previous secret again means the token was copied, or
+a client kept a stale one: the whole session is revoked and the user has to log in
+again. Any other secret is just rejected, without touching the session.
+
+Logging in also deletes the user's expired and revoked sessions, so the table holds
+about one row per live session.
+"""
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.services.principals import load_principal
+
+
+class RefreshTokenError(Exception):
+    """The refresh token is malformed, unknown, expired or revoked"""
+
+
+def _digest(secret: str) -> str:
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite devuelve los DateTime sin zona; se guardan en UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _split(token: str) -> Tuple[str, str]:
+    token_id, _, secret = token.partition(".")
+    if not token_id or not secret:
+        raise RefreshTokenError("Invalid refresh token")
+    return token_id, secret
+
+
+def _new_secret() -> Tuple[str, str, datetime]:
+    secret = secrets.token_urlsafe(32)
+    return secret, _digest(secret), datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+def issue_refresh_token(db: Session, user_id: int) -> str:
+    """Open a session for user_id and return its first refresh token; the caller commits"""
+    now = datetime.now(timezone.utc)
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user_id,
+        or_(RefreshToken.expires_at <= now, RefreshToken.revoked_at.is_not(None))
+    ).delete(synchronize_session=False)
+
+    secret, token_hash, expires_at = _new_secret()
+    session = RefreshToken(
+        token_id=secrets.token_urlsafe(16), user_id=user_id, token_hash=token_hash, expires_at=expires_at
+    )
+    db.add(session)
+    db.flush()
+    return f"{session.token_id}.{secret}"
+
+
+def _current_session(db: Session, token: str) -> Tuple[RefreshToken, str]:
+    token_id, secret = _split(token)
+    session = db.query(RefreshToken).filter(RefreshToken.token_id == token_id).first()
+    if session is None or session.revoked_at is not None:
+        raise RefreshTokenError("Invalid refresh token")
+    digest = _digest(secret)
+    if not hmac.compare_digest(session.token_hash, digest):
+        if session.previous_hash is not None and hmac.compare_digest(session.previous_hash, digest):
+            # Token ya rotado presentado de nuevo: alguien tiene una copia, se corta la sesión entera
+            session.revoked_at = datetime.now(timezone.utc)
+            db.commit()
+            raise RefreshTokenError("Refresh token already used; session revoked")
+        # Secreto desconocido: se rechaza sin tocar la sesión
+        raise RefreshTokenError("Invalid refresh token")
+    if _aware(session.expires_at) <= datetime.now(timezone.utc):
+        raise RefreshTokenError("Refresh token expired")
+    return session, session.token_hash
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[int, str]:
+    """Validate token and replace it; returns the user id and the new refresh token"""
+    session, old_hash = _current_session(db, token)
+    principal = load_principal(db, session.user_id)
+    if principal is None or not principal.is_active:
+        raise RefreshTokenError("Inactive user")
+
+    secret, token_hash, expires_at = _new_secret()
+    # Compare-and-set: de dos renovaciones simultáneas con el mismo token, solo una gana
+    updated = db.query(RefreshToken).filter(
+        RefreshToken.id == session.id,
+        RefreshToken.token_hash == old_hash,
+        RefreshToken.revoked_at.is_(None)
+    ).update(
+        {"token_hash": token_hash, "previous_hash": old_hash, "expires_at": expires_at}, synchronize_session=False
+    )
+    db.commit()
+    if not updated:
+        raise RefreshTokenError("Invalid refresh token")
+    return session.user_id, f"{session.token_id}.{secret}"
+
+
+def revoke_refresh_token(db: Session, token: str) -> Optional[int]:
+    """End the session of a current refresh token (logout); returns its user id, None if it was not valid"""
+    try:
+        session, _ = _current_session(db, token)
+    except RefreshTokenError:
+        return None
+    session.revoked_at = datetime.now(timezone.utc)
+    db.commit()
+    return session.user_id
@@ -0,0 +1,94 @@
+"""
+Total counts for the requests list.
+
+GET /requests picks one strategy per call:
+- exact:    COUNT(*) over the filtered query (default, previous behavior)
+- cached:   exact count memoized per (user, filters) until a write of that user
+            or the TTL, whichever comes first
+- estimate: the planner's row estimate on PostgreSQL (exact when it is small);
+            other databases fall back to the cached count
+- none:     no total, only has_more
+
+Invalidation is per process: other workers see a write after at most
+REQUESTS_COUNT_CACHE_TTL_SECONDS.
+"""
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+COUNT_STRATEGIES = ("exact", "cached", "estimate", "none")
+
+
+class RequestCountCache:
+    """
+    Exact counts keyed by user and filters.
+    Each user has a generation number that is part of the key; a write bumps it,
+    so every cached count of that user becomes unreachable at once.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._counts = TTLCache(maxsize, ttl)
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, user_id: int, filters: Hashable) -> Tuple[Hashable, ...]:
+        return user_id, self._generations.get(user_id, 0), filters
+
+    def get_or_count(self, user_id: int, filters: Hashable, count: Callable[[], int]) -> int:
+        key = self._key(user_id, filters)
+        total = self._counts.get(key)
+        if total is None:
+            total = count()
+            self._counts.set(key, total)
+        return total
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Forget the counts of one user, or of everyone when user_id is None"""
+        if user_id is None:
+            self._counts.clear()
+            return
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def stats(self) -> dict:
+        return self._counts.stats()
+
+
+count_cache = RequestCountCache(settings.REQUESTS_COUNT_CACHE_SIZE, settings.REQUESTS_COUNT_CACHE_TTL_SECONDS)
+
+
+def invalidate_request_counts(user_id: Optional[int] = None) -> None:
+    """Call after inserting, updating or deleting requests"""
+    count_cache.invalidate(user_id)
+
+
+def planner_estimate(db: Session, query: Query) -> Optional[int]:
+    """Row estimate of the PostgreSQL planner for query, without running it"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(dialect=bind.dialect)
+    plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_requests(
+    db: Session, query: Query, strategy: str, user_id: int, filters: Hashable
+) -> Tuple[Optional[int], bool]:
+    """Total for the list with the chosen strategy; returns (total, is_estimate)"""
+    if strategy == "none":
+        return None, False
+    if strategy == "exact":
+        return query.count(), False
+
+    if strategy == "estimate":
+        estimate = planner_estimate(db, query)
+        # Con pocas filas el conteo exacto es barato y evita totales raros en la UI
+        if estimate is not None and estimate >= settings.REQUESTS_COUNT_EXACT_BELOW:
+            return estimate, True
+
+    return count_cache.get_or_count(user_id, filters, query.count), False
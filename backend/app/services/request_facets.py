@@ -0,0 +1,62 @@
+"""
+Facet counts for the requests list (GET /requests?facets=status,risk_level,company_id).
+
+All facets come from one statement: a CTE with the rows that match the non-facet
+filters (user, search, amount) and one GROUP BY branch per facet, joined with UNION ALL.
+Each branch applies the facet filters of the other dimensions but not its own, so
+with ?status=approved the status facet still counts every status (the filter chips
+show the alternatives) while risk_level counts only approved requests.
+"""
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import String, cast, func, literal, select, union_all
+from sqlalchemy.orm import Query, Session
+
+from app.models.request import Request
+from app.services.request_stats import status_value
+
+FACET_COLUMNS = {
+    "status": Request.status,
+    "risk_level": Request.risk_level,
+    "company_id": Request.company_id,
+}
+FACETS = tuple(FACET_COLUMNS)
+
+# facet -> [(value, count)], most frequent first
+FacetCounts = Dict[str, List[Tuple[Optional[str], int]]]
+
+
+def facet_filters(columns: Mapping, filters: Mapping[str, object], exclude: Optional[str] = None) -> list:
+    """Equality conditions for the facet filters on columns (Request attributes or CTE columns)"""
+    return [columns[name] == value for name, value in filters.items() if name != exclude]
+
+
+def facet_counts(db: Session, base: Query, facets: Sequence[str], filters: Mapping[str, object]) -> FacetCounts:
+    """
+    Per-value counts of each facet over base (the list query without the facet filters),
+    in one round trip.
+    """
+    rows = base.with_entities(*FACET_COLUMNS.values()).order_by(None).cte("facet_rows")
+    branches = [
+        select(literal(name).label("facet"), cast(rows.c[name], String).label("value"), func.count().label("count"))
+        .select_from(rows)
+        .where(*facet_filters(rows.c, filters, exclude=name))
+        .group_by(rows.c[name])
+        for name in facets
+    ]
+    counts: FacetCounts = {name: [] for name in facets}
+    for facet, value, count in db.execute(union_all(*branches)):
+        if facet == "status" and value is not None:
+            value = status_value(value)
+        counts[facet].append((value, count))
+    for values in counts.values():
+        values.sort(key=lambda item: (-item[1], item[0] is None, item[0] or ""))
+    return counts
+
+
+def total_from_facets(counts: FacetCounts, filters: Mapping[str, object]) -> Optional[int]:
+    """Exact total of the filtered list when a facet without its own filter was counted, else None"""
+    for name, values in counts.items():
+        if name not in filters:
+            return sum(count for _, count in values)
+    return None
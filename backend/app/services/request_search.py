@@ -0,0 +1,77 @@
+"""
+Indexed text search for the requests list (purpose and company name).
+
+Each word of the term is a prefix ("equip" finds "Equipment financing") and all
+of them must appear in the same field. Backends:
+- postgresql: to_tsvector('simple', ...) @@ to_tsquery, served by the GIN
+              expression indexes ix_requests_purpose_tsv / ix_companies_name_tsv,
+              ranked with ts_rank
+- sqlite:     the requests_fts FTS5 table kept in sync by triggers (models/request.py),
+              ranked with bm25; accents are ignored
+- others:     ILIKE '%term%' without ranking (previous behavior)
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, column, func, literal_column, or_, select, table
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.company import Company
+from app.models.request import Request
+
+requests_fts = table("requests_fts", column("rowid", Integer), column("rank", Float))
+
+
+def search_words(term: str) -> List[str]:
+    """Lowercase words of a search term; punctuation and FTS operators are dropped"""
+    return re.findall(r"\w+", term.lower())
+
+
+def _tsvector(expression):
+    # Misma expresión que los índices GIN; con otra forma PostgreSQL no los usa
+    return func.to_tsvector(literal_column("'simple'"), expression)
+
+
+def _postgresql_search(query: Query, words: List[str]) -> Tuple[Query, ColumnElement]:
+    tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{word}:*" for word in words))
+    # Sin correlate(None) la subconsulta tomaría companies del JOIN exterior
+    by_company = select(Company.id).where(_tsvector(Company.name).op("@@")(tsquery)).correlate(None)
+    query = query.join(Company, Request.company_id == Company.id).filter(
+        or_(_tsvector(Request.purpose).op("@@")(tsquery), Request.company_id.in_(by_company))
+    )
+    rank = func.ts_rank(_tsvector(Request.purpose), tsquery) + func.ts_rank(_tsvector(Company.name), tsquery)
+    return query, rank.desc()
+
+
+def _sqlite_search(query: Query, words: List[str]) -> Tuple[Query, ColumnElement]:
+    prefixes = " AND ".join(f'"{word}"*' for word in words)
+    expression = f"purpose : ({prefixes}) OR company_name : ({prefixes})"
+    matches = (
+        select(requests_fts.c.rowid.label("id"), requests_fts.c.rank.label("rank"))
+        .where(literal_column("requests_fts").op("MATCH")(expression))
+        .subquery()
+    )
+    query = query.join(matches, matches.c.id == Request.id)
+    # bm25: más negativo = más relevante
+    return query, matches.c.rank.asc()
+
+
+def apply_search(query: Query, dialect_name: str, term: str) -> Tuple[Query, Optional[ColumnElement]]:
+    """
+    Filter query (over Request) by term with the backend of dialect_name.
+    Returns the filtered query and an ORDER BY clause for relevance, or None when
+    the backend cannot rank. A term without words leaves the query unchanged.
+    """
+    words = search_words(term)
+    if not words:
+        return query, None
+    if dialect_name == "postgresql":
+        return _postgresql_search(query, words)
+    if dialect_name == "sqlite":
+        return _sqlite_search(query, words)
+
+    query = query.join(Company, Request.company_id == Company.id).filter(
+        or_(Request.purpose.ilike(f"%{term}%"), Company.name.ilike(f"%{term}%"))
+    )
+    return query, None
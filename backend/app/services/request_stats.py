@@ -0,0 +1,233 @@
+"""
+Incrementally maintained request statistics (table request_stats).
+
+Every change to the requests of a user moves one unit of count and amount between
+(user_id, company_id, status, risk_level) keys, in the same transaction as the change:
+- ORM writes (create/update/delete of Request, deleting a company) through the
+  Session after_flush listener registered here
+- Core writes call apply_deltas themselves: the batch insert of /risk/assess/batch,
+  the lazy rescore flush and the bulk rescore job (level_change_deltas)
+
+The dashboard summary then reads a few rows per user instead of scanning requests.
+app/jobs/reconcile_request_stats.py rebuilds the table from requests and reports drift.
+"""
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.models.company import Company
+from app.models.request import Request, RequestStatus
+from app.models.request_stats import RequestStats
+
+request_stats = RequestStats.__table__
+
+# (user_id, company_id, status value, risk_level or "")
+StatsKey = Tuple[int, int, str, str]
+
+KEY_FIELDS = ("user_id", "company_id", "status", "risk_level")
+TRACKED_FIELDS = KEY_FIELDS + ("amount",)
+
+
+def status_value(status) -> str:
+    """'approved' for RequestStatus.APPROVED, 'approved' or 'APPROVED'"""
+    if isinstance(status, RequestStatus):
+        return status.value
+    if status is None:
+        return RequestStatus.PENDING.value
+    try:
+        return RequestStatus(status).value
+    except ValueError:
+        return RequestStatus[status].value
+
+
+def stats_key(user_id: int, company_id: int, status, risk_level: Optional[str]) -> StatsKey:
+    return user_id, company_id, status_value(status), risk_level or ""
+
+
+class StatsDeltas:
+    """Pending count and amount changes per key"""
+
+    def __init__(self):
+        self._deltas: Dict[StatsKey, List[float]] = {}
+
+    def add(self, key: StatsKey, amount: Optional[float], sign: int = 1) -> None:
+        delta = self._deltas.setdefault(key, [0, 0.0])
+        delta[0] += sign
+        delta[1] += sign * float(amount or 0)
+
+    def move(self, old_key: StatsKey, old_amount: Optional[float], new_key: StatsKey,
+             new_amount: Optional[float]) -> None:
+        if old_key != new_key or old_amount != new_amount:
+            self.add(old_key, old_amount, -1)
+            self.add(new_key, new_amount)
+
+    def discard_companies(self, company_ids: Iterable[int]) -> None:
+        company_ids = set(company_ids)
+        self._deltas = {key: delta for key, delta in self._deltas.items() if key[1] not in company_ids}
+
+    def rows(self) -> List[dict]:
+        return [
+            dict(zip(KEY_FIELDS, key), request_count=int(count), amount_sum=amount)
+            for key, (count, amount) in self._deltas.items()
+            if count or amount
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.rows())
+
+
+def apply_deltas(conn, deltas: StatsDeltas) -> None:
+    """Add deltas to request_stats with one upsert (conn: Connection or Session, inside the write transaction)"""
+    rows = deltas.rows()
+    if not rows:
+        return
+    dialect = conn.get_bind().dialect.name if isinstance(conn, Session) else conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = (postgresql if dialect == "postgresql" else sqlite).insert(request_stats)
+        conn.execute(
+            insert.on_conflict_do_update(
+                index_elements=list(KEY_FIELDS),
+                set_={
+                    "request_count": request_stats.c.request_count + insert.excluded.request_count,
+                    "amount_sum": request_stats.c.amount_sum + insert.excluded.amount_sum
+                }
+            ),
+            rows
+        )
+        return
+
+    # Sin upsert nativo: UPDATE y INSERT de las claves que no existían
+    for row in rows:
+        where = [request_stats.c[name] == row[name] for name in KEY_FIELDS]
+        updated = conn.execute(
+            request_stats.update().where(*where).values(
+                request_count=request_stats.c.request_count + row["request_count"],
+                amount_sum=request_stats.c.amount_sum + row["amount_sum"]
+            )
+        )
+        if not updated.rowcount:
+            conn.execute(request_stats.insert(), [row])
+
+
+def _old_value(obj, name: str):
+    added, unchanged, deleted = get_history(obj, name)
+    if deleted:
+        return deleted[0]
+    if unchanged:
+        return unchanged[0]
+    # Sin cambios ni valor cargado: el valor actual es el anterior
+    return getattr(obj, name) if not added else None
+
+
+def _flush_deltas(session: Session) -> Tuple[StatsDeltas, List[int]]:
+    deltas = StatsDeltas()
+    for obj in session.new:
+        if isinstance(obj, Request):
+            deltas.add(stats_key(obj.user_id, obj.company_id, obj.status, obj.risk_level), obj.amount)
+    for obj in session.dirty:
+        if isinstance(obj, Request):
+            if not any(get_history(obj, name).has_changes() for name in TRACKED_FIELDS):
+                continue
+            old = {name: _old_value(obj, name) for name in TRACKED_FIELDS}
+            deltas.move(
+                stats_key(*(old[name] for name in KEY_FIELDS)), old["amount"],
+                stats_key(obj.user_id, obj.company_id, obj.status, obj.risk_level), obj.amount
+            )
+    deleted_companies = []
+    for obj in session.deleted:
+        if isinstance(obj, Request):
+            old = {name: _old_value(obj, name) for name in TRACKED_FIELDS}
+            deltas.add(stats_key(*(old[name] for name in KEY_FIELDS)), old["amount"], -1)
+        elif isinstance(obj, Company):
+            deleted_companies.append(obj.id)
+    return deltas, deleted_companies
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_request_stats(session: Session, flush_context) -> None:
+    """Apply the stats changes of the Request rows written by this flush, in its transaction"""
+    deltas, deleted_companies = _flush_deltas(session)
+    conn = session.connection()
+    if deleted_companies:
+        # Sus filas desaparecen; un delta negativo dejaría claves huérfanas
+        deltas.discard_companies(deleted_companies)
+        conn.execute(request_stats.delete().where(request_stats.c.company_id.in_(deleted_companies)))
+    apply_deltas(conn, deltas)
+
+
+def insert_deltas(rows: Iterable[Mapping]) -> StatsDeltas:
+    """Deltas of request rows inserted with Core (dicts with user_id, company_id, status, risk_level, amount)"""
+    deltas = StatsDeltas()
+    for row in rows:
+        deltas.add(stats_key(row["user_id"], row["company_id"], row["status"], row.get("risk_level")), row["amount"])
+    return deltas
+
+
+def level_change_deltas(
+    conn,
+    new_levels: Mapping[int, str],
+    expected_versions: Optional[Mapping[int, Optional[str]]] = None,
+) -> StatsDeltas:
+    """
+    Deltas of setting risk_level to new_levels[id] with a Core UPDATE, run in the same transaction
+    before it. The rows are locked (FOR UPDATE on PostgreSQL) so the current level read here is the
+    one the UPDATE replaces. With expected_versions, rows whose rules_version differs are skipped,
+    matching the compare-and-set of the rescore flush.
+    """
+    deltas = StatsDeltas()
+    if not new_levels:
+        return deltas
+    rows = conn.execute(
+        select(
+            Request.id, Request.user_id, Request.company_id, Request.status, Request.risk_level,
+            Request.amount, Request.rules_version
+        ).where(Request.id.in_(list(new_levels))).with_for_update()
+    )
+    for row in rows:
+        if expected_versions is not None and row.rules_version != expected_versions.get(row.id):
+            continue
+        deltas.move(
+            stats_key(row.user_id, row.company_id, row.status, row.risk_level), row.amount,
+            stats_key(row.user_id, row.company_id, row.status, new_levels[row.id]), row.amount
+        )
+    return deltas
+
+
+def stats_groups(db: Session, user_id: int, company_id: Optional[int] = None):
+    """Summary groups (status, risk_level, count, amount) of a user from request_stats"""
+    query = db.query(
+        RequestStats.status, RequestStats.risk_level,
+        func.sum(RequestStats.request_count), func.sum(RequestStats.amount_sum)
+    ).filter(RequestStats.user_id == user_id)
+    if company_id is not None:
+        query = query.filter(RequestStats.company_id == company_id)
+    return query.group_by(RequestStats.status, RequestStats.risk_level).all()
+
+
+def computed_stats(conn) -> Dict[StatsKey, Tuple[int, float]]:
+    """Stats computed from scratch from the requests table"""
+    rows = conn.execute(
+        select(
+            Request.user_id, Request.company_id, Request.status, Request.risk_level,
+            func.count(Request.id), func.coalesce(func.sum(Request.amount), 0.0)
+        ).group_by(Request.user_id, Request.company_id, Request.status, Request.risk_level)
+    )
+    computed: Dict[StatsKey, Tuple[int, float]] = {}
+    for user_id, company_id, status, risk_level, count, amount in rows:
+        key = stats_key(user_id, company_id, status, risk_level)
+        # NULL y '' caen en la misma clave
+        previous = computed.get(key, (0, 0.0))
+        computed[key] = (previous[0] + count, previous[1] + float(amount))
+    return computed
+
+
+def stored_stats(conn) -> Dict[StatsKey, Tuple[int, float]]:
+    """Non-empty rows of request_stats"""
+    rows = conn.execute(select(request_stats).where(request_stats.c.request_count != 0))
+    return {
+        (row.user_id, row.company_id, row.status, row.risk_level): (row.request_count, row.amount_sum)
+        for row in rows
+    }
@@ -0,0 +1,67 @@
+"""
+Dashboard summary of a user's requests (GET /requests/stats/summary).
+
+One aggregate query grouped by (status, risk_level) returns a handful of rows
+(count and amount sum per group); the totals, the per-status and the per-risk-level
+breakdowns are folded from those rows here. The query is served by the covering
+index ix_requests_user_summary without reading the table.
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.pagination import datetime_literal
+from app.models.request import Request, RequestStatus
+
+UNSCORED = "unscored"
+
+# (status, risk_level, count, amount)
+SummaryGroup = Tuple[object, Optional[str], int, Optional[float]]
+
+
+def summary_groups(
+    db: Session,
+    user_id: int,
+    company_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Iterable[SummaryGroup]:
+    """Count and amount sum of the user's requests per (status, risk_level)"""
+    query = db.query(
+        Request.status, Request.risk_level, func.count(Request.id), func.sum(Request.amount)
+    ).filter(Request.user_id == user_id)
+    if company_id is not None:
+        query = query.filter(Request.company_id == company_id)
+    if created_from is not None:
+        query = query.filter(Request.created_at >= datetime_literal(created_from))
+    if created_to is not None:
+        query = query.filter(Request.created_at < datetime_literal(created_to))
+    return query.group_by(Request.status, Request.risk_level).all()
+
+
+def fold_summary(groups: Iterable[SummaryGroup]) -> dict:
+    """Summary response from per-(status, risk_level) groups"""
+    by_status = {status.value: {"count": 0, "amount": 0.0} for status in RequestStatus}
+    by_risk_level = {}
+    for status, risk_level, count, amount in groups:
+        if not count:
+            continue
+        level = by_risk_level.setdefault(risk_level or UNSCORED, {"count": 0, "amount": 0.0})
+        for bucket in (by_status[RequestStatus(status).value], level):
+            bucket["count"] += count
+            bucket["amount"] += float(amount or 0)
+
+    total_requests = sum(bucket["count"] for bucket in by_status.values())
+    approved_requests = by_status[RequestStatus.APPROVED.value]["count"]
+    return {
+        "total_requests": total_requests,
+        "approved_requests": approved_requests,
+        "rejected_requests": by_status[RequestStatus.REJECTED.value]["count"],
+        "pending_requests": by_status[RequestStatus.PENDING.value]["count"],
+        "total_amount_requested": sum(bucket["amount"] for bucket in by_status.values()),
+        "approval_rate": round((approved_requests / total_requests * 100), 2) if total_requests > 0 else 0,
+        "by_status": by_status,
+        "by_risk_level": by_risk_level
+    }
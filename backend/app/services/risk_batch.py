@@ -0,0 +1,205 @@
+"""
+Vectorized batch scoring for risk assessments.
+
+Scores whole columns of inputs at once with NumPy threshold lookups instead of
+building a RiskRequest/RiskResponse per row. Results match calculate_risk_score
+exactly; see benchmarks/bench_risk_batch.py for throughput numbers.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.schemas.schemas import RiskRequest, RiskResponse
+from app.services import risk_engine
+
+FACTORS = risk_engine.FACTORS
+
+
+class _RuleArrays:
+    """Engine tables of one RuleSet as numpy arrays"""
+
+    def __init__(self, rules: risk_engine.RuleSet):
+        self.rules = rules
+        self.thresholds = [np.array(values) for values in rules.thresholds]
+        self.points = [np.array(values) for values in rules.points]
+        self.level_thresholds = np.array(rules.level_thresholds)
+        self.levels = np.array(rules.levels, dtype=object)
+        self.approvals = np.array(rules.approvals)
+
+
+_arrays: Optional[_RuleArrays] = None
+
+
+def _rule_arrays(rules: risk_engine.RuleSet) -> _RuleArrays:
+    """Arrays for the given rules, rebuilt only when the active rules change"""
+    global _arrays
+    arrays = _arrays
+    if arrays is None or arrays.rules is not rules:
+        arrays = _arrays = _RuleArrays(rules)
+    return arrays
+
+
+@dataclass
+class RiskBatchResult:
+    """Column-oriented scoring output; bands[i, f] is -1 when factor f was not scored"""
+    scores: np.ndarray
+    levels: np.ndarray
+    approved: np.ndarray
+    bands: np.ndarray
+    rules: risk_engine.RuleSet
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def codes(self, index: int) -> List[int]:
+        """Recommendation codes for a single row"""
+        return risk_engine.recommendation_codes_for(self.bands[index], self.rules)
+
+    def recommendations(self, index: int, locale: str = risk_engine.DEFAULT_LOCALE) -> List[str]:
+        """Materialize the recommendation texts for a single row"""
+        return risk_engine.recommendation_texts(self.codes(index), locale, self.rules)
+
+    def to_response(self, index: int, locale: str = risk_engine.DEFAULT_LOCALE) -> RiskResponse:
+        """Build the RiskResponse that calculate_risk_score would return for a row"""
+        codes = self.codes(index)
+        return RiskResponse(
+            risk_score=int(self.scores[index]),
+            risk_level=self.levels[index],
+            approved=bool(self.approved[index]),
+            recommendations=risk_engine.recommendation_texts(codes, locale, self.rules),
+            recommendation_codes=codes
+        )
+
+
+def _column(values: Sequence[Optional[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a column to float64 plus a presence mask.
+    Only None (or a masked entry of a numpy masked array) is missing; NaN is a real value,
+    exactly like in calculate_risk_score.
+    """
+    if isinstance(values, np.ma.MaskedArray):
+        return values.filled(0).astype(np.float64), ~np.ma.getmaskarray(values)
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return values.astype(np.float64), np.ones(values.shape, dtype=bool)
+    present = np.array([value is not None for value in values], dtype=bool)
+    floats = np.array([0.0 if value is None else value for value in values], dtype=np.float64)
+    return floats, present
+
+
+def _truthy(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Mirror Python truthiness of optional numbers (None and 0 are falsy, NaN is truthy)"""
+    return present & (values != 0)
+
+
+def _upper_bands(values: np.ndarray, thresholds: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Band index for 'value <= threshold' chains, -1 where the factor is absent"""
+    bands = np.searchsorted(thresholds, values, side="left")
+    return np.where(mask, bands, -1)
+
+
+def _lower_bands(values: np.ndarray, thresholds: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Band index for 'value >= threshold' chains, -1 where the factor is absent"""
+    # NaN no cumple ningún ">=": cae en la banda 0 y no al final como en searchsorted
+    bands = np.where(np.isnan(values), 0, np.searchsorted(thresholds, values, side="right"))
+    return np.where(mask, bands, -1)
+
+
+def _points(bands: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Look up points per band, 0 for absent factors"""
+    return np.where(bands >= 0, points[np.maximum(bands, 0)], 0)
+
+
+def calculate_risk_scores_batch(
+    amount: Sequence[float],
+    annual_revenue: Sequence[Optional[float]],
+    employee_count: Sequence[Optional[int]],
+    years_in_business: Sequence[Optional[int]],
+    debt_to_equity_ratio: Sequence[Optional[float]],
+    credit_score: Sequence[Optional[int]],
+) -> RiskBatchResult:
+    """
+    Calculate risk scores for many rows at once.
+    Each argument is a column of equal length; None (or a masked entry) means the value is missing.
+    """
+    amount, amount_present = _column(amount)
+    annual_revenue, revenue_present = _column(annual_revenue)
+    employee_count, employees_present = _column(employee_count)
+    years_in_business, years_present = _column(years_in_business)
+    debt_to_equity_ratio, debt_present = _column(debt_to_equity_ratio)
+    credit_score, credit_present = _column(credit_score)
+
+    has_revenue = _truthy(annual_revenue, revenue_present) & _truthy(amount, amount_present)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(has_revenue, amount / np.where(has_revenue, annual_revenue, 1.0), 0.0)
+
+    rules = risk_engine.active_rules
+    tables = _rule_arrays(rules)
+    revenue_t, employees_t, years_t, debt_t, credit_t = tables.thresholds
+
+    # NaN queda al final de searchsorted, igual que la rama "else" de los if-chains "<="
+    bands = np.stack([
+        _upper_bands(ratio, revenue_t, has_revenue),
+        _lower_bands(employee_count, employees_t, _truthy(employee_count, employees_present)),
+        _lower_bands(years_in_business, years_t, _truthy(years_in_business, years_present)),
+        _upper_bands(debt_to_equity_ratio, debt_t, debt_present),
+        _lower_bands(credit_score, credit_t, _truthy(credit_score, credit_present)),
+    ], axis=1).astype(np.int8)
+
+    scores = sum(
+        _points(bands[:, factor], points) for factor, points in enumerate(tables.points)
+    ).astype(np.int64)
+
+    level_bands = np.searchsorted(tables.level_thresholds, scores, side="right")
+
+    return RiskBatchResult(
+        scores=scores,
+        levels=tables.levels[level_bands],
+        approved=tables.approvals[level_bands],
+        bands=bands,
+        rules=rules
+    )
+
+
+def calculate_risk_scores_for_requests(requests: Sequence[RiskRequest]) -> RiskBatchResult:
+    """Score a list of RiskRequest objects in one vectorized pass"""
+    return calculate_risk_scores_batch(
+        amount=[r.amount for r in requests],
+        annual_revenue=[r.annual_revenue for r in requests],
+        employee_count=[r.employee_count for r in requests],
+        years_in_business=[r.years_in_business for r in requests],
+        debt_to_equity_ratio=[r.debt_to_equity_ratio for r in requests],
+        credit_score=[r.credit_score for r in requests],
+    )
+
+
+def calculate_risk_score_grid(
+    amounts: Sequence[float],
+    debt_to_equity_ratios: Sequence[float],
+    annual_revenue: Optional[float],
+    employee_count: Optional[int],
+    years_in_business: Optional[int],
+    credit_score: Optional[int],
+) -> RiskBatchResult:
+    """
+    Score every (amount, debt ratio) combination with the other metrics fixed.
+    Results are flattened row-major: row i follows amounts[i], column j debt_to_equity_ratios[j].
+    """
+    amount_grid, debt_grid = np.meshgrid(
+        np.asarray(amounts, dtype=np.float64),
+        np.asarray(debt_to_equity_ratios, dtype=np.float64),
+        indexing="ij"
+    )
+    size = amount_grid.size
+
+    def constant(value: Optional[float]) -> np.ndarray:
+        return np.ma.masked_all(size) if value is None else np.full(size, value, dtype=np.float64)
+
+    return calculate_risk_scores_batch(
+        amount=amount_grid.ravel(),
+        annual_revenue=constant(annual_revenue),
+        employee_count=constant(employee_count),
+        years_in_business=constant(years_in_business),
+        debt_to_equity_ratio=debt_grid.ravel(),
+        credit_score=constant(credit_score),
+    )
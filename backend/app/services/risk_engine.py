@@ -0,0 +1,562 @@
+"""
+Single scoring engine behind every risk entry point.
+
+All thresholds, points, recommendation texts and category tables are built once
+at import time; the main model can also be swapped at runtime from a rules file
+(see risk_rules.py). The main model is compiled from its tables into a generated
+straight-line function; legacy/profile thresholds are resolved with bisect, and
+levels and recommendation codes come from precomputed lookup tables, and codes
+are turned into text per locale with the catalogs of each RuleSet. Callers get
+plain tuples back so the adapters decide which response object to build:
+
+- risk_calculator.calculate_risk_score        -> active_rules.score_metrics
+- risk_calculator.calculate_risk_score_legacy -> score_legacy
+- models.request.Request.calculate_risk_score -> score_request_profile
+"""
+import hashlib
+import json
+import math
+from bisect import bisect_left, bisect_right
+from itertools import product
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# --- Modelo principal (calculate_risk_score) ---
+
+# Factores en el mismo orden que las recomendaciones
+FACTORS = ("revenue", "employees", "years", "debt", "credit")
+REVENUE, EMPLOYEES, YEARS, DEBT, CREDIT = range(len(FACTORS))
+
+# Umbrales "<=" (ratio préstamo/ingresos, deuda/capital): banda = bisect_left
+REVENUE_RATIO_THRESHOLDS = (0.3, 0.5, 0.7)
+REVENUE_RATIO_POINTS = (30, 25, 15, 5)
+DEBT_THRESHOLDS = (0.5, 1.0)
+DEBT_POINTS = (15, 10, 5)
+
+# Umbrales ">=" (empleados, años, crédito): banda = bisect_right
+EMPLOYEE_THRESHOLDS = (5, 11, 50)
+EMPLOYEE_POINTS = (5, 10, 15, 20)
+YEARS_THRESHOLDS = (2, 5, 10)
+YEARS_POINTS = (5, 10, 15, 20)
+CREDIT_THRESHOLDS = (650, 750)
+CREDIT_POINTS = (5, 10, 15)
+
+FACTOR_POINTS = (REVENUE_RATIO_POINTS, EMPLOYEE_POINTS, YEARS_POINTS, DEBT_POINTS, CREDIT_POINTS)
+
+# Nivel de riesgo y aprobación por banda de puntaje (score >= umbral)
+LEVEL_THRESHOLDS = (50, 70)
+LEVELS = ("Alto", "Medio", "Bajo")
+APPROVALS = (False, True, True)
+
+# Textos de recomendación por factor, indexados por banda
+REVENUE_RECOMMENDATIONS = (
+    "Excelente ratio préstamo/ingresos, procesamiento expedito posible",
+    "Ratio de préstamo aceptable para sus ingresos",
+    "La cantidad solicitada es alta en relación a sus ingresos",
+    "Alto riesgo: cantidad del préstamo muy alta para sus ingresos",
+)
+EMPLOYEE_RECOMMENDATIONS = (
+    "Empresa muy pequeña, perfil de mayor riesgo",
+    "Empresa pequeña, considere mostrar planes de crecimiento",
+    "Empresa mediana muestra buena estabilidad",
+    "Empresa grande muestra excelente estabilidad",
+)
+YEARS_RECOMMENDATIONS = (
+    "Empresa nueva, considere plan de negocio detallado",
+    "Empresa moderadamente establecida",
+    "Empresa establecida con buen historial",
+    "Empresa bien establecida con sólida trayectoria",
+)
+DEBT_RECOMMENDATIONS = (
+    "Excelente salud financiera",
+    "Salud financiera moderada, verificar tendencias",
+    "Alto ratio de deuda, considere reducción de deudas",
+)
+CREDIT_RECOMMENDATIONS = (
+    "Puntuación crediticia regular, trabaje en mejorarla",
+    "Buena puntuación crediticia, tarifas competitivas disponibles",
+    "Excelente puntuación crediticia, tarifas competitivas disponibles",
+)
+
+FACTOR_RECOMMENDATIONS = (
+    REVENUE_RECOMMENDATIONS,
+    EMPLOYEE_RECOMMENDATIONS,
+    YEARS_RECOMMENDATIONS,
+    DEBT_RECOMMENDATIONS,
+    CREDIT_RECOMMENDATIONS,
+)
+
+FACTOR_RECOMMENDATIONS_EN = (
+    (
+        "Excellent loan-to-revenue ratio, expedited processing possible",
+        "Acceptable loan amount for your revenue",
+        "The requested amount is high relative to your revenue",
+        "High risk: loan amount too high for your revenue",
+    ),
+    (
+        "Very small company, higher risk profile",
+        "Small company, consider presenting growth plans",
+        "Mid-sized company shows good stability",
+        "Large company shows excellent stability",
+    ),
+    (
+        "New company, consider a detailed business plan",
+        "Moderately established company",
+        "Established company with a good track record",
+        "Well-established company with a solid track record",
+    ),
+    (
+        "Excellent financial health",
+        "Moderate financial health, check trends",
+        "High debt ratio, consider reducing debt",
+    ),
+    (
+        "Fair credit score, work on improving it",
+        "Good credit score, competitive rates available",
+        "Excellent credit score, competitive rates available",
+    ),
+)
+
+# Textos por idioma; el primero es el idioma por defecto
+DEFAULT_LOCALE = "es"
+RECOMMENDATION_TEXTS = MappingProxyType({
+    "es": FACTOR_RECOMMENDATIONS,
+    "en": FACTOR_RECOMMENDATIONS_EN,
+})
+
+# Código de recomendación = (índice del factor + 1) * 10 + banda: 10-13 ingresos, 20-23 empleados, ...
+# Es estable entre versiones de reglas y cabe en un SMALLINT.
+MAX_FACTOR_BANDS = 10
+
+
+def recommendation_code(factor_index: int, band: int) -> int:
+    return (factor_index + 1) * MAX_FACTOR_BANDS + band
+
+
+# Cómo se lee cada factor: (condición de presencia, valor, dirección de los umbrales)
+ARGUMENTS = (
+    "amount",
+    "annual_revenue",
+    "employee_count",
+    "years_in_business",
+    "debt_to_equity_ratio",
+    "credit_score",
+)
+FACTOR_INPUTS = (
+    ("annual_revenue and amount", "amount / annual_revenue", "<="),
+    ("employee_count", "employee_count", ">="),
+    ("years_in_business", "years_in_business", ">="),
+    ("debt_to_equity_ratio is not None", "debt_to_equity_ratio", "<="),
+    ("credit_score", "credit_score", ">="),
+)
+FACTOR_THRESHOLDS = (
+    REVENUE_RATIO_THRESHOLDS,
+    EMPLOYEE_THRESHOLDS,
+    YEARS_THRESHOLDS,
+    DEBT_THRESHOLDS,
+    CREDIT_THRESHOLDS,
+)
+
+# (score, risk_level, approved, bands); bands[f] es -1 cuando el factor f no puntúa
+EngineScore = Tuple[int, str, bool, Tuple[int, int, int, int, int]]
+
+
+class RuleSet(NamedTuple):
+    """Compiled tables and scorer for one version of the main scoring policy"""
+    # "<etiqueta>+<huella>": la huella sale del contenido, así que editar umbrales cambia la versión
+    version: str
+    label: str
+    thresholds: Tuple[Tuple[float, ...], ...]
+    points: Tuple[Tuple[int, ...], ...]
+    recommendations: Mapping[str, Tuple[Tuple[str, ...], ...]]
+    level_thresholds: Tuple[int, ...]
+    levels: Tuple[str, ...]
+    approvals: Tuple[bool, ...]
+    level_lookup: Tuple[Tuple[str, bool], ...]
+    codes_by_bands: Mapping[Tuple[int, ...], Tuple[int, ...]]
+    catalogs: Mapping[str, Mapping[int, str]]
+    score_metrics: Callable[..., EngineScore]
+
+
+def _band_chain(
+    value: str, direction: str, thresholds: Sequence[float], points: Sequence[float], band_var: str
+) -> List[str]:
+    """
+    Straight-line comparisons equivalent to bisect over the thresholds.
+    Same comparison order as the original if/elif chains, so NaN lands in the same band.
+    """
+    if direction == "<=":
+        # banda i si value <= thresholds[i]; si ninguna, la última
+        checks = [(f"value <= {threshold!r}", band) for band, threshold in enumerate(thresholds)]
+        fallback = len(thresholds)
+    else:
+        # banda i+1 si value >= thresholds[i], evaluando de mayor a menor; si ninguna, la 0
+        checks = [(f"value >= {thresholds[band]!r}", band + 1) for band in reversed(range(len(thresholds)))]
+        fallback = 0
+
+    lines = [f"value = {value}"]
+    for i, (condition, band) in enumerate(checks):
+        lines.append(f"{'if' if i == 0 else 'elif'} {condition}:")
+        lines.append(f"    score += {points[band]!r}; {band_var} = {band}")
+    lines.append("else:")
+    lines.append(f"    score += {points[fallback]!r}; {band_var} = {fallback}")
+    return lines
+
+
+def compile_metrics_scorer(
+    thresholds: Sequence[Sequence[float]],
+    points: Sequence[Sequence[int]],
+    level_lookup: Sequence[Tuple[str, bool]],
+) -> Callable[..., EngineScore]:
+    """
+    Generate and compile the score_metrics function for a set of tables.
+
+    The tables are inlined as constants, so each call is a handful of comparisons
+    with no loops, lookups of module globals or intermediate objects.
+    """
+    body = ["score = 0"]
+    band_vars = []
+    for index, ((presence, value, direction), factor_thresholds, factor_points) in enumerate(
+        zip(FACTOR_INPUTS, thresholds, points)
+    ):
+        band_var = f"band_{index}"
+        band_vars.append(band_var)
+        body.append(f"if {presence}:")
+        body.extend("    " + line for line in _band_chain(
+            value, direction, factor_thresholds, factor_points, band_var
+        ))
+        body.append("else:")
+        body.append(f"    {band_var} = -1")
+    body.append("risk_level, approved = level_lookup[score]")
+    body.append(f"return score, risk_level, approved, ({', '.join(band_vars)})")
+
+    header = [
+        f"def score_metrics({', '.join(ARGUMENTS)}):",
+        '    """Score the business metrics of one assessment (None and 0 mean "not provided")"""',
+    ]
+    source = "\n".join(header + ["    " + line for line in body])
+    namespace = {"level_lookup": level_lookup}
+    exec(compile(source, "<risk_engine.score_metrics>", "exec"), namespace)
+
+    scorer = namespace["score_metrics"]
+    scorer.source = source
+    return scorer
+
+
+def _check_bands(name: str, thresholds: Sequence[float], *tables: Sequence) -> None:
+    # Los umbrales se escriben como literales en el código generado: inf/NaN o texto no compilarían a un número
+    if any(type(value) not in (int, float) or not math.isfinite(value) for value in thresholds):
+        raise ValueError(f"{name}: thresholds must be finite numbers")
+    if list(thresholds) != sorted(set(thresholds)):
+        raise ValueError(f"{name}: thresholds must be strictly increasing")
+    for table in tables:
+        if len(table) != len(thresholds) + 1:
+            raise ValueError(f"{name}: expected {len(thresholds) + 1} bands, got {len(table)}")
+
+
+def _smoke_test(scorer: Callable[..., EngineScore], thresholds: Sequence[Sequence[float]]) -> None:
+    """Call a generated scorer once per band of every factor; ValueError if any call fails"""
+    candidates = [[values[0] - 1, *values, values[-1] + 1] for values in thresholds]
+    for i in range(max(len(values) for values in candidates)):
+        revenue, employees, years, debt, credit = (values[min(i, len(values) - 1)] for values in candidates)
+        try:
+            # annual_revenue = 1: el ratio préstamo/ingresos es el propio amount
+            scorer(revenue, 1.0, employees, years, debt, credit)
+        except Exception as e:
+            raise ValueError(f"The compiled scorer fails: {e!r}") from e
+
+
+# Longitud de Request.rules_version
+MAX_VERSION_LENGTH = 64
+FINGERPRINT_LENGTH = 12
+
+
+def rules_fingerprint(
+    thresholds: Sequence[Sequence[float]],
+    points: Sequence[Sequence[int]],
+    recommendations: Mapping[str, Sequence[Sequence[str]]],
+    level_thresholds: Sequence[int],
+    levels: Sequence[str],
+    approvals: Sequence[bool],
+) -> str:
+    """Short content hash of the tables of a policy (same tables, same fingerprint)"""
+    content = json.dumps(
+        [thresholds, points, sorted(recommendations.items()), level_thresholds, levels, [bool(a) for a in approvals]],
+        separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def compile_rules(
+    version: str,
+    thresholds: Sequence[Sequence[float]],
+    points: Sequence[Sequence[int]],
+    recommendations: Mapping[str, Sequence[Sequence[str]]],
+    level_thresholds: Sequence[int],
+    levels: Sequence[str],
+    approvals: Sequence[bool],
+) -> RuleSet:
+    """
+    Validate the tables of the main model and compile them into a RuleSet.
+    recommendations maps each locale to the texts of every factor, indexed by band.
+    version is only a label: the RuleSet version also carries the fingerprint of the tables.
+    """
+    if len(version) + 1 + FINGERPRINT_LENGTH > MAX_VERSION_LENGTH:
+        raise ValueError(f"version: at most {MAX_VERSION_LENGTH - 1 - FINGERPRINT_LENGTH} characters")
+    if DEFAULT_LOCALE not in recommendations:
+        raise ValueError(f"Recommendations in '{DEFAULT_LOCALE}' are required")
+    if not (len(thresholds) == len(points) == len(FACTORS)) or any(
+        len(texts) != len(FACTORS) for texts in recommendations.values()
+    ):
+        raise ValueError(f"Expected tables for the factors {', '.join(FACTORS)}")
+
+    for index, (name, factor_thresholds, factor_points) in enumerate(zip(FACTORS, thresholds, points)):
+        _check_bands(name, factor_thresholds, factor_points, *(texts[index] for texts in recommendations.values()))
+        # Puntos enteros: el nivel se resuelve indexando LEVEL_LOOKUP por puntaje
+        if any(type(value) is not int or value < 0 for value in factor_points):
+            raise ValueError(f"{name}: points must be non-negative integers")
+        if len(factor_points) > MAX_FACTOR_BANDS:
+            raise ValueError(f"{name}: at most {MAX_FACTOR_BANDS} bands")
+    _check_bands("levels", level_thresholds, levels, approvals)
+
+    thresholds = tuple(tuple(values) for values in thresholds)
+    points = tuple(tuple(values) for values in points)
+    recommendations = MappingProxyType({
+        locale: tuple(tuple(factor_texts) for factor_texts in texts)
+        for locale, texts in recommendations.items()
+    })
+
+    # Nivel y aprobación precalculados para cada puntaje posible
+    max_score = sum(max(values) for values in points)
+    level_lookup = tuple(
+        (levels[band], bool(approvals[band]))
+        for band in (bisect_right(level_thresholds, score) for score in range(max_score + 1))
+    )
+    # Códigos precalculados para cada combinación de bandas (-1 = factor ausente)
+    codes_by_bands = MappingProxyType({
+        bands: tuple(recommendation_code(index, band) for index, band in enumerate(bands) if band >= 0)
+        for bands in product(*(range(-1, len(values)) for values in points))
+    })
+    catalogs = MappingProxyType({
+        locale: MappingProxyType({
+            recommendation_code(index, band): text
+            for index, factor_texts in enumerate(texts)
+            for band, text in enumerate(factor_texts)
+        })
+        for locale, texts in recommendations.items()
+    })
+
+    scorer = compile_metrics_scorer(thresholds, points, level_lookup)
+    # Antes de devolver (y de set_active_rules): unas reglas que no puntúan se rechazan aquí
+    _smoke_test(scorer, thresholds)
+
+    fingerprint = rules_fingerprint(thresholds, points, recommendations, level_thresholds, levels, approvals)
+    return RuleSet(
+        version=f"{version}+{fingerprint}",
+        label=version,
+        thresholds=thresholds,
+        points=points,
+        recommendations=recommendations,
+        level_thresholds=tuple(level_thresholds),
+        levels=tuple(levels),
+        approvals=tuple(bool(value) for value in approvals),
+        level_lookup=level_lookup,
+        codes_by_bands=codes_by_bands,
+        catalogs=catalogs,
+        score_metrics=scorer,
+    )
+
+
+# Reglas incluidas en el código; app/services/risk_rules.py las reemplaza por las del archivo
+BUILTIN_RULES = compile_rules(
+    "builtin",
+    FACTOR_THRESHOLDS,
+    FACTOR_POINTS,
+    RECOMMENDATION_TEXTS,
+    LEVEL_THRESHOLDS,
+    LEVELS,
+    APPROVALS,
+)
+
+# Reglas activas: se reemplazan con una sola asignación, nunca se modifican en sitio
+active_rules = BUILTIN_RULES
+
+# Todas las versiones activadas en este proceso; Request.rules_version apunta a una de ellas
+rules_registry: Dict[str, RuleSet] = {BUILTIN_RULES.version: BUILTIN_RULES}
+
+
+def set_active_rules(rules: RuleSet) -> None:
+    """Atomically swap the rules used by every new evaluation"""
+    global active_rules
+    rules_registry[rules.version] = rules
+    active_rules = rules
+
+
+def get_rules(version: str) -> Optional[RuleSet]:
+    """Rules registered under a version, or None if this process never loaded it"""
+    return rules_registry.get(version)
+
+
+def level_for(score: float, rules: Optional[RuleSet] = None) -> Tuple[str, bool]:
+    """Risk level and approval for a total score"""
+    rules = rules or active_rules
+    if type(score) is int and 0 <= score < len(rules.level_lookup):
+        return rules.level_lookup[score]
+    band = bisect_right(rules.level_thresholds, score)
+    return rules.levels[band], rules.approvals[band]
+
+
+def score_metrics(
+    amount: Optional[float],
+    annual_revenue: Optional[float],
+    employee_count: Optional[int],
+    years_in_business: Optional[int],
+    debt_to_equity_ratio: Optional[float],
+    credit_score: Optional[int],
+) -> EngineScore:
+    """Score the business metrics of one assessment with the active rules"""
+    return active_rules.score_metrics(
+        amount, annual_revenue, employee_count, years_in_business, debt_to_equity_ratio, credit_score
+    )
+
+
+def recommendation_codes_for(bands: Sequence[int], rules: Optional[RuleSet] = None) -> List[int]:
+    """Recommendation codes for the scored factors"""
+    return list((rules or active_rules).codes_by_bands[tuple(bands)])
+
+
+def recommendation_texts(
+    codes: Sequence[int], locale: str = DEFAULT_LOCALE, rules: Optional[RuleSet] = None
+) -> List[str]:
+    """
+    Resolve codes with the catalog of a locale (falling back to the default locale).
+    Codes unknown to these rules, e.g. from a version with more bands, fall back to the builtin texts.
+    """
+    catalogs = (rules or active_rules).catalogs
+    catalog = catalogs.get(locale) or catalogs[DEFAULT_LOCALE]
+    fallback = BUILTIN_RULES.catalogs.get(locale) or BUILTIN_RULES.catalogs[DEFAULT_LOCALE]
+    return [catalog.get(code) or fallback.get(code, str(code)) for code in codes]
+
+
+# --- Modelo legacy (calculate_risk_score_legacy) ---
+
+# Umbrales "amount > umbral": banda = bisect_left
+LEGACY_AMOUNT_THRESHOLDS = (100000, 500000, 1000000)
+LEGACY_AMOUNT_POINTS = (0.0, 1.0, 2.0, 3.0)
+LEGACY_AMOUNT_RECOMMENDATIONS = (
+    "Préstamo de cantidad baja, procesamiento expedito posible",
+    "Proceso de verificación estándar recomendado",
+    "Cantidad moderada, asegurar verificación de ingresos estables",
+    "Cantidad de préstamo grande requiere garantías adicionales",
+)
+
+# Categoría de tamaño -> (puntos, recomendación); cualquier otra se trata como enterprise
+LEGACY_SIZE_CATEGORIES = MappingProxyType({
+    "startup": (2.5, "Startup requiere revisión de plan de negocio"),
+    "small": (1.5, "Empresa pequeña requiere revisión de historial financiero"),
+    "medium": (1.0, "Empresa mediana muestra buena estabilidad"),
+    "large": (0.5, "Empresa grande muestra fuerte estabilidad"),
+})
+LEGACY_SIZE_DEFAULT = (0.0, "Nivel empresarial muestra excelente estabilidad")
+
+# Nivel por "score <= umbral": banda = bisect_left
+LEGACY_LEVEL_THRESHOLDS = (3.0, 6.0, 9.0)
+LEGACY_LEVELS = ("BAJO", "MEDIO", "ALTO", "MUY_ALTO")
+
+
+def _legacy_result(amount_band: int, size_points: float, size_recommendation: str) -> Tuple[str, float, Tuple[str, str]]:
+    score = 0.0 + LEGACY_AMOUNT_POINTS[amount_band] + size_points
+    return (
+        LEGACY_LEVELS[bisect_left(LEGACY_LEVEL_THRESHOLDS, score)],
+        round(score, 2),
+        (LEGACY_AMOUNT_RECOMMENDATIONS[amount_band], size_recommendation)
+    )
+
+
+# Resultado completo por (banda de cantidad, categoría); None = categoría no listada
+LEGACY_RESULTS = MappingProxyType({
+    (amount_band, size_category): _legacy_result(amount_band, *size)
+    for amount_band in range(len(LEGACY_AMOUNT_POINTS))
+    for size_category, size in [*LEGACY_SIZE_CATEGORIES.items(), (None, LEGACY_SIZE_DEFAULT)]
+})
+
+
+def score_legacy(amount: float, size_category: str) -> Tuple[str, float, List[str]]:
+    """Legacy amount/size scoring; returns (risk_level, score, recommendations)"""
+    amount_band = bisect_left(LEGACY_AMOUNT_THRESHOLDS, amount) if amount == amount else 0
+    if size_category not in LEGACY_SIZE_CATEGORIES:
+        size_category = None
+
+    risk_level, score, recommendations = LEGACY_RESULTS[amount_band, size_category]
+    return risk_level, score, list(recommendations)
+
+
+# --- Perfil de solicitud (Request.calculate_risk_score) ---
+
+# Umbrales "amount >= umbral": banda = bisect_right
+PROFILE_AMOUNT_THRESHOLDS = (25_000, 50_000, 100_000)
+PROFILE_AMOUNT_POINTS = (10, 15, 20, 30)
+
+PROFILE_DEFAULT_POINTS = 15
+PROFILE_SIZE_POINTS = MappingProxyType({
+    "startup": 25,
+    "small": 20,
+    "medium": 15,
+    "large": 10,
+    "enterprise": 5
+})
+PROFILE_INDUSTRY_POINTS = MappingProxyType({
+    "technology": 20,
+    "finance": 15,
+    "healthcare": 10,
+    "retail": 15,
+    "manufacturing": 10,
+    "real_estate": 25,
+    "education": 5,
+    "consulting": 15,
+    "other": 20
+})
+PROFILE_PURPOSE_POINTS = MappingProxyType({
+    "loan": 15,
+    "investment": 20,
+    "partnership": 10,
+    "acquisition": 25,
+    "expansion": 15,
+    "other": 20
+})
+
+# Ajustes por flags de risk_inputs (-20 a +20 puntos)
+PROFILE_INPUT_ADJUSTMENTS = (
+    ("good_credit_history", -10),
+    ("stable_revenue", -10),
+    ("experienced_management", -5),
+    ("high_debt_ratio", 15),
+    ("volatile_market", 10),
+    ("regulatory_issues", 20),
+)
+
+
+def score_request_profile(
+    amount: float,
+    company_size: Optional[str],
+    industry: Optional[str],
+    purpose: Optional[str],
+    risk_inputs: Optional[dict],
+) -> float:
+    """Profile score between 0-100 (higher = more risky)"""
+    amount_band = bisect_right(PROFILE_AMOUNT_THRESHOLDS, amount) if amount == amount else 0
+
+    score = (
+        0.0
+        + PROFILE_AMOUNT_POINTS[amount_band]
+        + PROFILE_SIZE_POINTS.get(company_size, PROFILE_DEFAULT_POINTS)
+        + PROFILE_INDUSTRY_POINTS.get(industry, PROFILE_DEFAULT_POINTS)
+        + PROFILE_PURPOSE_POINTS.get(purpose, PROFILE_DEFAULT_POINTS)
+    )
+
+    if risk_inputs:
+        for flag, delta in PROFILE_INPUT_ADJUSTMENTS:
+            if risk_inputs.get(flag):
+                score += delta
+
+    return max(0.0, min(100.0, score))
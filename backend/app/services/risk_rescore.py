@@ -0,0 +1,182 @@
+"""
+Lazy rescoring of stored requests scored with an older version of the rules.
+
+Read endpoints pass the rows they are about to return to rescore_stale(). Only the
+rows whose rules_version differs from the active rules are scored, in one batch,
+and the fresh values are set on the loaded objects without marking them dirty.
+The UPDATEs are queued in pending_rescores and written later by a background task
+in batches, so a rules change costs work proportional to the rows actually read.
+Rows that are never read keep their old values until the next bulk rescore
+(app/jobs/rescore_requests.py).
+"""
+import logging
+import threading
+from typing import Dict, List, Sequence, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, inspect, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.models.company import Company
+from app.models.request import Request
+from app.services import risk_engine
+from app.services.request_counts import invalidate_request_counts
+from app.services.request_stats import apply_deltas, level_change_deltas
+from app.services.risk_batch import calculate_risk_scores_for_requests
+from app.services.risk_calculator import risk_request_from_inputs
+
+logger = logging.getLogger(__name__)
+
+# (id, rules_version leída, score, level, recommendation codes, rules_version nueva)
+Rescore = Tuple[int, str, float, str, List[int], str]
+
+_requests = Request.__table__
+
+# Compare-and-set sobre rules_version: si la fila se volvió a puntuar entre la lectura
+# y el flush (update_request, el job masivo u otro worker), no se pisa.
+# updated_at se conserva: recalcular el score no es una edición de la solicitud.
+_FLUSH_STATEMENT = (
+    update(_requests)
+    .where(_requests.c.id == bindparam("b_id"))
+    .where(_requests.c.rules_version.is_not_distinct_from(bindparam("b_old_version")))
+    .values(
+        risk_score=bindparam("b_score"),
+        risk_level=bindparam("b_level"),
+        recommendation_codes=bindparam("b_codes"),
+        rules_version=bindparam("b_version"),
+        updated_at=_requests.c.updated_at
+    )
+)
+
+
+class PendingRescores:
+    """Rescored values waiting to be written, coalesced by request id"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Rescore] = {}
+
+    def add(self, rescores: Sequence[Rescore]) -> None:
+        with self._lock:
+            for rescore in rescores:
+                self._pending[rescore[0]] = rescore
+
+    def drain(self) -> List[Rescore]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def flush(self, bind: Union[Engine, Connection]) -> int:
+        """Write everything queued so far; returns the number of rows sent"""
+        rescores = self.drain()
+        if not rescores:
+            return 0
+
+        params = [
+            {
+                "b_id": request_id,
+                "b_old_version": old_version,
+                "b_score": score,
+                "b_level": level,
+                "b_codes": codes,
+                "b_version": version
+            }
+            for request_id, old_version, score, level, codes, version in rescores
+        ]
+        batch_size = max(settings.RISK_RESCORE_FLUSH_BATCH, 1)
+        try:
+            with Session(bind=bind) as session, session.begin():
+                for start in range(0, len(params), batch_size):
+                    chunk = params[start:start + batch_size]
+                    # risk_level cambia: mover las filas de request_stats antes del UPDATE
+                    apply_deltas(session, level_change_deltas(
+                        session,
+                        {row["b_id"]: row["b_level"] for row in chunk},
+                        {row["b_id"]: row["b_old_version"] for row in chunk}
+                    ))
+                    session.execute(_FLUSH_STATEMENT, chunk)
+        except SQLAlchemyError:
+            # Las filas siguen desactualizadas y se recalculan en la próxima lectura
+            logger.exception("Could not store %d rescored requests", len(rescores))
+            return 0
+        # Cambian risk_level: los conteos cacheados con ese filtro ya no valen
+        invalidate_request_counts()
+        return len(rescores)
+
+
+pending_rescores = PendingRescores()
+
+
+# Columnas de Request con los inputs del scoring (además de company_id)
+INPUT_COLUMNS = frozenset({"amount", "purpose", "risk_inputs"})
+
+
+def rescore_stale(db: Session, requests: Sequence[Request]) -> int:
+    """
+    Rescore the requests not scored with the active rules and queue their UPDATEs.
+    Returns how many were queued; call pending_rescores.flush afterwards when > 0.
+    """
+    version = risk_engine.active_rules.version
+    stale = [request for request in requests if request.rules_version != version]
+    if not stale:
+        return 0
+
+    # Un solo IN para los datos de empresa que completan los inputs
+    companies = {
+        row.id: row
+        for row in db.query(Company.id, Company.annual_revenue, Company.company_size).filter(
+            Company.id.in_({request.company_id for request in stale})
+        )
+    }
+
+    # Listados con load_only (?fields=) pueden no traer los inputs: otro IN en vez de un lazy load por fila
+    inputs = {}
+    if INPUT_COLUMNS & inspect(stale[0]).unloaded:
+        inputs = {
+            row.id: row
+            for row in db.query(Request.id, *(getattr(Request, name) for name in sorted(INPUT_COLUMNS))).filter(
+                Request.id.in_([request.id for request in stale])
+            )
+        }
+
+    rows, risk_requests = [], []
+    for request in stale:
+        company = companies.get(request.company_id)
+        source = inputs.get(request.id, request)
+        try:
+            risk_requests.append(risk_request_from_inputs(
+                str(request.company_id),
+                source.amount,
+                source.purpose,
+                source.risk_inputs,
+                company.annual_revenue if company else None,
+                company.company_size if company else None
+            ))
+        except ValidationError as e:
+            logger.warning("Request %s not rescored: %s", request.id, e.errors()[0]["msg"])
+            continue
+        rows.append(request)
+
+    if not rows:
+        return 0
+
+    result = calculate_risk_scores_for_requests(risk_requests)
+    rescores = []
+    for i, request in enumerate(rows):
+        score, level, codes = float(result.scores[i]), str(result.levels[i]), result.codes(i)
+        rescores.append((request.id, request.rules_version, score, level, codes, result.rules.version))
+        # Sin marcar el objeto como modificado: la escritura la hace el flush en segundo plano
+        set_committed_value(request, "risk_score", score)
+        set_committed_value(request, "risk_level", level)
+        set_committed_value(request, "recommendation_codes", codes)
+        set_committed_value(request, "rules_version", result.rules.version)
+
+    pending_rescores.add(rescores)
+    return len(rescores)
@@ -0,0 +1,202 @@
+"""
+Declarative scoring rules for calculate_risk_score, loaded from a JSON/YAML file.
+
+The file is compiled by risk_engine.compile_rules into a generated scoring function
+and swapped in atomically. Every worker process runs its own RulesWatcher, which
+polls the file and reloads it when it changes; an invalid file is logged and the
+previous rules stay active. Format (see risk_rules.json):
+
+    {
+      "version": "2025.1",
+      "factors": {"revenue": {"thresholds": [...], "points": [...]}, ...},
+      "levels": [{"min_score": 0, "level": "Alto", "approved": false}, ...]
+    }
+
+The declared version is only a label: compile_rules appends a fingerprint of the
+tables ("2025.1+<hash>"), so edits that forget to bump it still get a new version.
+
+Each factor may also carry its own "recommendations": one text per band, either a
+list (default locale) or {"es": [...], "en": [...]}. Locales not given keep the
+builtin texts.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.services import risk_engine
+
+try:
+    import yaml
+except ImportError:  # PyYAML es opcional: solo hace falta para archivos .yaml/.yml
+    yaml = None
+
+PARSE_ERRORS = (ValueError,) + ((yaml.YAMLError,) if yaml is not None else ())
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("risk_rules.json")
+
+
+class RulesFileError(ValueError):
+    """The rules file cannot be read or does not describe a valid policy"""
+
+
+def rules_path() -> Path:
+    """Rules file configured for this process"""
+    return Path(settings.RISK_RULES_PATH) if settings.RISK_RULES_PATH else DEFAULT_RULES_PATH
+
+
+def _recommendation_texts(specs: List[dict]) -> Dict[str, List[List[str]]]:
+    """
+    Per-locale texts of every factor; a plain list overrides the default locale.
+    A locale without its own texts keeps the builtin ones, or the default-locale
+    texts when the file changed the number of bands.
+    """
+    overrides = []
+    for spec in specs:
+        texts = spec.get("recommendations", {})
+        overrides.append(texts if isinstance(texts, dict) else {risk_engine.DEFAULT_LOCALE: texts})
+
+    builtin = risk_engine.RECOMMENDATION_TEXTS
+    defaults = [
+        factor.get(risk_engine.DEFAULT_LOCALE) or builtin_texts
+        for factor, builtin_texts in zip(overrides, builtin[risk_engine.DEFAULT_LOCALE])
+    ]
+    result = {}
+    for locale in set(builtin).union(*overrides):
+        locale_builtin = builtin.get(locale, defaults)
+        result[locale] = [
+            factor.get(locale) or (builtin_texts if len(builtin_texts) == len(default) else default)
+            for factor, builtin_texts, default in zip(overrides, locale_builtin, defaults)
+        ]
+    return result
+
+
+def parse_rules(data: dict, default_version: str) -> risk_engine.RuleSet:
+    """Compile the parsed contents of a rules file"""
+    try:
+        factors = data["factors"]
+        missing = [name for name in risk_engine.FACTORS if name not in factors]
+        if missing:
+            raise RulesFileError(f"Missing factors: {', '.join(missing)}")
+
+        specs = [factors[name] for name in risk_engine.FACTORS]
+        levels = sorted(data["levels"], key=lambda level: level["min_score"])
+        if not levels or levels[0]["min_score"] != 0:
+            raise RulesFileError("The first level must start at min_score 0")
+
+        return risk_engine.compile_rules(
+            version=str(data.get("version") or default_version),
+            thresholds=[spec["thresholds"] for spec in specs],
+            points=[spec["points"] for spec in specs],
+            recommendations=_recommendation_texts(specs),
+            level_thresholds=[level["min_score"] for level in levels[1:]],
+            levels=[level["level"] for level in levels],
+            approvals=[level["approved"] for level in levels],
+        )
+    except RulesFileError:
+        raise
+    except (KeyError, TypeError, ValueError) as e:
+        raise RulesFileError(f"Invalid rules: {e}") from e
+
+
+def load_rules_file(path: Union[str, Path]) -> risk_engine.RuleSet:
+    """Read and compile a rules file; files without "version" get a content hash"""
+    path = Path(path)
+    try:
+        content = path.read_bytes()
+    except OSError as e:
+        raise RulesFileError(f"Cannot read rules file {path}: {e}") from e
+
+    try:
+        if path.suffix in (".yaml", ".yml"):
+            if yaml is None:
+                raise RulesFileError("PyYAML is required to load YAML rules files")
+            data = yaml.safe_load(content)
+        else:
+            data = json.loads(content)
+    except RulesFileError:
+        raise
+    except PARSE_ERRORS as e:
+        raise RulesFileError(f"Cannot parse rules file {path}: {e}") from e
+
+    if not isinstance(data, dict):
+        raise RulesFileError("The rules file must contain an object")
+    return parse_rules(data, default_version=hashlib.sha256(content).hexdigest()[:12])
+
+
+class RulesWatcher:
+    """Polls a rules file and swaps the active rules when it changes"""
+
+    def __init__(self, path: Union[str, Path], interval: float):
+        self.path = Path(path)
+        self.interval = interval
+        self._signature: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> bool:
+        """Reload the rules if the file changed since the last check; True if they were swapped"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+
+        # Se guarda la firma aunque falle la carga, para no repetir el error en cada ciclo
+        self._signature = signature
+        try:
+            rules = load_rules_file(self.path)
+        except RulesFileError as e:
+            logger.error("Keeping scoring rules %s: %s", risk_engine.active_rules.version, e)
+            return False
+
+        risk_engine.set_active_rules(rules)
+        logger.info("Loaded scoring rules %s from %s", rules.version, self.path)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> None:
+        """Load the file now and keep polling it in a daemon thread"""
+        self.check()
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="risk-rules-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_watcher: Optional[RulesWatcher] = None
+
+
+def start_watcher() -> RulesWatcher:
+    """Load the configured rules file and start hot reload for this worker"""
+    global _watcher
+    if _watcher is None:
+        _watcher = RulesWatcher(rules_path(), settings.RISK_RULES_RELOAD_SECONDS)
+        _watcher.start()
+    return _watcher
+
+
+def stop_watcher() -> None:
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
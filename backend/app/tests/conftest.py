@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import json
 import sys
 import os
 from typing import Generator
@@ -20,6 +21,11 @@ from app.core.security import create_access_token, get_password_hash
 from app.models.user import User
 from app.models.company import Company
 from app.models.request import Request
+from app.services import risk_engine
+from app.services.principals import invalidate_principal
+from app.services.request_counts import invalidate_request_counts
+from app.services.risk_rescore import pending_rescores
+from app.services.risk_rules import DEFAULT_RULES_PATH
 
 
 # Test database URL (SQLite in memory for tests)
@@ -62,6 +68,9 @@ def db_session():
         db.close()
         # Drop all tables after test
         Base.metadata.drop_all(bind=engine)
+        # Los ids se repiten entre tests: los conteos cacheados no deben sobrevivir a la base
+        invalidate_request_counts()
+        invalidate_principal()
 
 
 @pytest.fixture(scope="function")
@@ -142,3 +151,28 @@ def test_request_data():
             "credit_score": 750
         }
     }
+
+
+@pytest.fixture
+def rules_data():
+    """Parsed contents of the shipped scoring rules file"""
+    with open(DEFAULT_RULES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def new_rules(monkeypatch):
+    """Activate a stricter copy of the current rules; the previous ones are restored afterwards"""
+    monkeypatch.setattr(risk_engine, "active_rules", risk_engine.active_rules)
+    current = risk_engine.active_rules
+    rules = risk_engine.compile_rules(
+        "test-v2",
+        current.thresholds,
+        tuple(tuple(points // 2 for points in factor) for factor in current.points),
+        current.recommendations,
+        current.level_thresholds,
+        current.levels,
+        current.approvals,
+    )
+    yield rules
+    pending_rescores.drain()
@@ -1,6 +1,24 @@
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import bcrypt
+import jwt
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.services import auth
+from app.services.auth import decode_access_token, token_cache
+from app.jobs import calibrate_bcrypt
+from app.services import password_cost
+from app.services.password_cost import calibrate, hash_rounds, needs_rehash
+from app.services.password_pool import HashingPool, HashingPoolFull
+from app.services.principals import principal_cache
 
 
 class TestAuth:
@@ -139,3 +157,303 @@ class TestAuth:
     #     assert response.status_code == 200
     #     user_data = response.json()
     #     assert user_data["email"] == test_user_data["email"]
+
+
+class TestPrincipalCache:
+    """Test the per-process cache of authenticated users"""
+
+    def user_queries(self, client: TestClient, db_session, auth_headers, calls: int):
+        """Statements reading users during calls authenticated requests"""
+        engine, statements = db_session.get_bind(), []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            for _ in range(calls):
+                assert client.get("/api/v1/companies/", headers=auth_headers).status_code == 200
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        return [statement for statement in statements if "FROM users" in statement]
+
+    def test_warm_calls_skip_the_database(self, client: TestClient, db_session, auth_headers):
+        """Test that only the first call loads the principal"""
+        hits = principal_cache.hits
+
+        assert len(self.user_queries(client, db_session, auth_headers, 3)) == 1
+        assert principal_cache.hits - hits == 2
+        assert client.get("/health/metrics").json()["principal_cache"]["size"] == 1
+
+    def test_deactivation_invalidates(self, client: TestClient, db_session, test_user_db, auth_headers):
+        """Test that an ORM update of the user is seen by the next call"""
+        self.user_queries(client, db_session, auth_headers, 1)
+
+        test_user_db.is_active = False
+        db_session.commit()
+        response = client.get("/api/v1/companies/", headers=auth_headers)
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Inactive user"
+
+    def test_deleted_user_is_rejected(self, client: TestClient, db_session, test_user_db, auth_headers):
+        """Test that a deleted user is forgotten"""
+        self.user_queries(client, db_session, auth_headers, 1)
+
+        db_session.delete(test_user_db)
+        db_session.commit()
+
+        assert client.get("/api/v1/companies/", headers=auth_headers).status_code == 401
+
+
+class TestTokenCache:
+    """Test the cache of verified access tokens"""
+
+    def token(self, sub: str, exp: float) -> str:
+        return jwt.encode({"sub": sub, "exp": int(exp)}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    def test_signature_checked_once(self, monkeypatch):
+        """Test that a repeated token is verified only the first time"""
+        calls = []
+        decode = jwt.decode
+        monkeypatch.setattr(auth.jwt, "decode", lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+        token = self.token("cached", time.time() + 60)
+
+        claims = [decode_access_token(token) for _ in range(3)]
+
+        assert len(calls) == 1
+        assert claims[0]["sub"] == claims[2]["sub"] == "cached"
+
+    def test_expired_entry_is_not_served(self):
+        """Test that an entry past the token exp is rejected even if the cache still holds it"""
+        token = self.token("expired", time.time() - 5)
+        token_cache.set(hashlib.sha256(token.encode("utf-8")).digest(), {"sub": "expired", "exp": time.time() - 5},
+                        ttl=60)
+
+        with pytest.raises(jwt.ExpiredSignatureError):
+            decode_access_token(token)
+
+    def test_bad_tokens_are_not_cached(self):
+        """Test that failed verifications leave nothing behind"""
+        size = len(token_cache)
+        forged = jwt.encode({"sub": "1", "exp": int(time.time()) + 60}, "other-secret", algorithm=settings.ALGORITHM)
+
+        with pytest.raises(jwt.InvalidSignatureError):
+            decode_access_token(forged)
+        assert len(token_cache) == size
+
+    def test_size_is_bounded(self, monkeypatch):
+        """Test that the least recently used tokens are evicted past TOKEN_CACHE_SIZE"""
+        monkeypatch.setattr(token_cache, "maxsize", 2)
+        token_cache.clear()
+        tokens = [self.token(str(i), time.time() + 60) for i in range(3)]
+
+        for token in tokens:
+            decode_access_token(token)
+
+        assert len(token_cache) == 2
+        assert token_cache.get(hashlib.sha256(tokens[0].encode("utf-8")).digest()) is None
+
+
+class TestPasswordHashingPool:
+    """Test the bounded pool that runs bcrypt"""
+
+    def test_rejects_past_max_pending(self):
+        """Test that a saturated pool fails at once instead of queueing"""
+        pool = HashingPool(workers=1, max_pending=1)
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        caller = threading.Thread(target=pool.run, args=(slow,))
+        caller.start()
+        started.wait(5)
+        try:
+            with pytest.raises(HashingPoolFull):
+                pool.run(lambda: "rejected")
+        finally:
+            release.set()
+            caller.join(5)
+
+        assert pool.run(lambda: "after") == "after"
+        stats = pool.stats()
+        assert (stats["completed"], stats["rejected"]) == (2, 1)
+        assert stats["hash_ms_max"] >= stats["hash_ms_p50"] >= 0
+
+    def test_login_returns_503_when_full(self, client: TestClient, test_user_db, test_user_data, monkeypatch):
+        """Test that login answers 503 with Retry-After, not 401, when hashing is saturated"""
+        def full(fn, *args):
+            raise HashingPoolFull()
+
+        monkeypatch.setattr(auth.hashing_pool, "run", full)
+        response = client.post("/api/v1/auth/login", json={
+            "email": test_user_data["email"], "password": test_user_data["password"]
+        })
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+
+    def test_metrics(self, client: TestClient, test_user_db, test_user_data):
+        """Test that logins are counted in /health/metrics"""
+        client.post("/api/v1/auth/login", json={"email": test_user_data["email"], "password": "wrong-password"})
+
+        stats = client.get("/health/metrics").json()["password_hashing"]
+        assert stats["completed"] >= 1 and stats["hash_ms_p95"] is not None
+
+
+class TestPasswordCost:
+    """Test bcrypt cost calibration and rehash on login"""
+
+    def test_calibrate(self, monkeypatch):
+        """Test that calibration picks the highest cost under the target, never below the minimum"""
+        # 1 ms a 8 rondas; cada ronda duplica
+        monkeypatch.setattr(password_cost, "measure_ms", lambda rounds, repeats=3: 2.0 ** (rounds - 8))
+
+        assert calibrate(250) == 15
+        assert calibrate(256) == 16
+        assert calibrate(1) == password_cost.MIN_ROUNDS
+
+    def test_calibration_cli(self, monkeypatch, capsys):
+        """Test that the CLI prints the cost to configure"""
+        monkeypatch.setattr(calibrate_bcrypt, "measure_ms", lambda rounds, repeats=3: 2.0 ** (rounds - 8))
+        monkeypatch.setattr(password_cost, "measure_ms", lambda rounds, repeats=3: 2.0 ** (rounds - 8))
+
+        assert calibrate_bcrypt.main(["--target-ms", "100"]) == 0
+        assert capsys.readouterr().out.strip().endswith("BCRYPT_ROUNDS=14")
+
+    def test_needs_rehash(self, monkeypatch):
+        """Test that any cost other than the target needs a rehash"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 12)
+        hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+
+        assert hash_rounds(hashed) == 4
+        assert needs_rehash(hashed)
+        assert not needs_rehash(hashed.replace("$04$", "$12$", 1))
+        assert needs_rehash("not-a-bcrypt-hash")
+
+    def test_login_rehashes(self, client: TestClient, db_session, test_user_db, test_user_data, monkeypatch):
+        """Test that a successful login moves the stored hash to the target cost"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        test_user_db.hashed_password = bcrypt.hashpw(
+            test_user_data["password"].encode(), bcrypt.gensalt(rounds=4)
+        ).decode()
+        db_session.commit()
+        login = {"email": test_user_data["email"], "password": test_user_data["password"]}
+
+        assert client.post("/api/v1/auth/login", json=login).status_code == 200
+        db_session.refresh(test_user_db)
+        rehashed = test_user_db.hashed_password
+        assert hash_rounds(rehashed) == 5
+
+        assert client.post("/api/v1/auth/login", json=login).status_code == 200
+        db_session.refresh(test_user_db)
+        assert test_user_db.hashed_password == rehashed
+
+    def test_failed_login_keeps_hash(self, client: TestClient, db_session, test_user_db, test_user_data,
+                                     monkeypatch):
+        """Test that a wrong password never rewrites the hash"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        before = test_user_db.hashed_password
+
+        response = client.post("/api/v1/auth/login", json={"email": test_user_data["email"], "password": "wrong"})
+
+        assert response.status_code == 401
+        db_session.refresh(test_user_db)
+        assert test_user_db.hashed_password == before
+
+
+class TestRefreshTokens:
+    """Test refresh token rotation and revocation"""
+
+    def login(self, client: TestClient, test_user_data) -> dict:
+        response = client.post("/api/v1/auth/login", json={
+            "email": test_user_data["email"], "password": test_user_data["password"]
+        })
+        assert response.status_code == 200
+        return response.json()
+
+    def refresh(self, client: TestClient, refresh_token: str):
+        return client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+    def test_rotation(self, client: TestClient, test_user_db, test_user_data, monkeypatch):
+        """Test that a refresh returns a working access token and a new refresh token, without bcrypt"""
+        first = self.login(client, test_user_data)["refresh_token"]
+
+        def no_bcrypt(fn, *args):
+            raise AssertionError("refresh must not hash passwords")
+
+        monkeypatch.setattr(auth.hashing_pool, "run", no_bcrypt)
+        response = self.refresh(client, first)
+
+        assert response.status_code == 200
+        tokens = response.json()
+        assert tokens["refresh_token"] != first
+        me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+        assert me.json()["email"] == test_user_data["email"]
+        assert self.refresh(client, tokens["refresh_token"]).status_code == 200
+
+    def test_reuse_revokes_the_session(self, client: TestClient, test_user_db, test_user_data):
+        """Test that presenting a rotated token ends the session for both tokens"""
+        first = self.login(client, test_user_data)["refresh_token"]
+        second = self.refresh(client, first).json()["refresh_token"]
+
+        reused = self.refresh(client, first)
+
+        assert reused.status_code == 401
+        assert "revoked" in reused.json()["detail"]
+        assert self.refresh(client, second).status_code == 401
+
+    def test_unknown_secret_leaves_the_session(self, client: TestClient, test_user_db, test_user_data):
+        """Test that a wrong secret for a real token id is rejected without revoking anything"""
+        token = self.login(client, test_user_data)["refresh_token"]
+        token_id = token.split(".")[0]
+
+        assert not token_id.isdigit()
+        assert self.refresh(client, f"{token_id}.wrong-secret").status_code == 401
+        assert client.post("/api/v1/auth/logout", json={"refresh_token": f"{token_id}.wrong-secret"}).status_code == 200
+        assert self.refresh(client, token).status_code == 200
+
+    def test_logout(self, client: TestClient, test_user_db, test_user_data):
+        """Test that a logged out refresh token cannot be used"""
+        token = self.login(client, test_user_data)["refresh_token"]
+
+        assert client.post("/api/v1/auth/logout", json={"refresh_token": token}).status_code == 200
+        assert self.refresh(client, token).status_code == 401
+
+    @pytest.mark.parametrize("token", ["", "garbage", "1.", "999.secret", "1.secret-for-a-primary-key"])
+    def test_invalid_tokens(self, client: TestClient, test_user_db, token):
+        """Test that malformed and unknown tokens are rejected"""
+        assert self.refresh(client, token).status_code == 401
+
+    def test_expired(self, client: TestClient, db_session, test_user_db, test_user_data):
+        """Test that an expired refresh token is rejected"""
+        token = self.login(client, test_user_data)["refresh_token"]
+        db_session.query(RefreshToken).update({"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+        db_session.commit()
+
+        response = self.refresh(client, token)
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Refresh token expired"
+
+    def test_inactive_user(self, client: TestClient, db_session, test_user_db, test_user_data):
+        """Test that a deactivated user cannot renew"""
+        token = self.login(client, test_user_data)["refresh_token"]
+        test_user_db.is_active = False
+        db_session.commit()
+
+        assert self.refresh(client, token).status_code == 401
+
+    def test_login_purges_dead_sessions(self, client: TestClient, db_session, test_user_db, test_user_data):
+        """Test that logging in deletes the user's revoked and expired sessions"""
+        for _ in range(3):
+            token = self.login(client, test_user_data)["refresh_token"]
+            client.post("/api/v1/auth/logout", json={"refresh_token": token})
+
+        self.login(client, test_user_data)
+
+        sessions = db_session.query(RefreshToken).all()
+        assert [session.revoked_at for session in sessions] == [None]
@@ -0,0 +1,159 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.core.cache import TTLCache
+from app.services.request_counts import RequestCountCache
+from app.schemas.schemas import RiskRequest
+from app.services import risk_calculator
+from app.services.risk_calculator import calculate_risk_score, score_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def risk_request(**overrides) -> RiskRequest:
+    data = {
+        "company_id": "1",
+        "amount": 100000.0,
+        "purpose": "loan",
+        "annual_revenue": 1000000.0,
+        "employee_count": 50,
+        "debt_to_equity_ratio": 0.3
+    }
+    data.update(overrides)
+    return RiskRequest(**data)
+
+
+class TestTTLCache:
+    """Test the bounded LRU/TTL cache"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "a" pasa a ser el más reciente
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Test that entries expire after ttl seconds"""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_entry_ttl(self):
+        """Test that a per-entry ttl shortens, but never extends, the cache ttl"""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set("short", 1, ttl=2)
+        cache.set("long", 2, ttl=60)
+        cache.set("expired", 3, ttl=-1)
+
+        clock.now = 2.0
+        assert (cache.get("short"), cache.get("long"), cache.get("expired")) == (None, 2, None)
+        clock.now = 5.0
+        assert cache.get("long") is None
+
+    def test_disabled_cache(self):
+        """Test that maxsize=0 never stores anything"""
+        cache = TTLCache(maxsize=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert cache.stats()["hit_rate"] == 0.0
+
+    def test_concurrent_access(self):
+        """Test that counters stay consistent when shared across threads"""
+        cache = TTLCache(maxsize=50)
+
+        def worker(offset: int):
+            for i in range(2000):
+                key = (offset + i) % 100
+                if cache.get(key) is None:
+                    cache.set(key, i)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        assert stats["hits"] + stats["misses"] == 8 * 2000
+        assert len(cache) <= 50
+
+
+class TestRiskScoreCache:
+    """Test the cache in front of calculate_risk_score"""
+
+    def test_repeated_inputs_hit_the_cache(self, monkeypatch):
+        """Test that identical metrics are scored once, whatever the company or purpose"""
+        monkeypatch.setattr(risk_calculator, "score_cache", TTLCache(maxsize=10))
+
+        first = calculate_risk_score(risk_request())
+        second = calculate_risk_score(risk_request(company_id="2", purpose="expansion"))
+        other = calculate_risk_score(risk_request(credit_score=700))
+
+        assert second is first
+        assert other is not first
+        stats = risk_calculator.score_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+
+    def test_key_normalization(self):
+        """Test that NaN inputs share a key and None stays distinct from 0"""
+        nan = float("nan")
+        assert score_cache_key("v1", risk_request(amount=nan)) == score_cache_key("v1", risk_request(amount=nan))
+        assert score_cache_key("v1", risk_request(debt_to_equity_ratio=None)) != \
+            score_cache_key("v1", risk_request(debt_to_equity_ratio=0.0))
+        assert score_cache_key("v1", risk_request()) != score_cache_key("v2", risk_request())
+
+    def test_metrics_endpoint(self, client: TestClient):
+        """Test that the cache counters are exposed"""
+        response = client.get("/health/metrics")
+
+        assert response.status_code == 200
+        stats = response.json()["risk_score_cache"]
+        assert {"hits", "misses", "evictions", "size", "hit_rate"} <= set(stats)
+
+
+class TestRequestCountCache:
+    """Test the per-user count cache of the requests list"""
+
+    def test_invalidation_is_per_user(self):
+        """Test that a write only drops the counts of its user"""
+        cache = RequestCountCache(maxsize=10, ttl=0)
+        calls = []
+
+        def counter(value):
+            def count():
+                calls.append(value)
+                return value
+            return count
+
+        assert cache.get_or_count(1, ("a",), counter(5)) == 5
+        assert cache.get_or_count(2, ("a",), counter(7)) == 7
+        assert cache.get_or_count(1, ("a",), counter(99)) == 5
+
+        cache.invalidate(1)
+        assert cache.get_or_count(1, ("a",), counter(6)) == 6
+        assert cache.get_or_count(2, ("a",), counter(99)) == 7
+        assert calls == [5, 7, 6]
@@ -0,0 +1,75 @@
+import csv
+import gzip
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.services.exports import accepts_gzip, encode_rows, gzip_chunks
+
+
+class TestExports:
+    """Test the streaming CSV/NDJSON exports"""
+
+    def create_requests(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        for amount, purpose in ((10000, 'Equipo, "nuevo"'), (50000, "Capital de trabajo"), (90000, "Expansión")):
+            client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id, amount=amount,
+                                                       purpose=purpose), headers=auth_headers)
+        return company_id
+
+    def test_csv_with_list_filters(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        """Test that the CSV export has a header, escapes values and applies the list filters"""
+        company_id = self.create_requests(client, auth_headers, test_company_data, test_request_data)
+
+        response = client.get("/api/v1/requests/export?max_amount=60000&fields=amount,purpose,status",
+                              headers=dict(auth_headers, **{"Accept-Encoding": "identity"}))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="requests.csv"' in response.headers["content-disposition"]
+        assert "content-encoding" not in response.headers
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["purpose"] for row in rows] == ['Equipo, "nuevo"', "Capital de trabajo"]
+        assert rows[0] == {"id": rows[0]["id"], "amount": "10000.0", "purpose": 'Equipo, "nuevo"', "status": "pending"}
+
+        empty = client.get(f"/api/v1/requests/export?company_id={int(company_id) + 1}", headers=auth_headers)
+        assert empty.text.splitlines()[0].startswith("id,company_id,amount")
+        assert len(empty.text.splitlines()) == 1
+
+    def test_ndjson_gzip(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        """Test that NDJSON is gzip-compressed when the client accepts it"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data)
+
+        response = client.get("/api/v1/requests/export?format=ndjson&search=capital",
+                              headers=dict(auth_headers, **{"Accept-Encoding": "gzip"}))
+
+        assert response.headers["content-encoding"] == "gzip"
+        (record,) = [json.loads(line) for line in response.text.splitlines()]
+        assert record["purpose"] == "Capital de trabajo"
+        assert isinstance(record["id"], str) and isinstance(record["risk_inputs"], dict)
+
+    def test_companies(self, client: TestClient, auth_headers, test_company_data):
+        """Test the companies export"""
+        client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers)
+
+        response = client.get("/api/v1/companies/export?format=ndjson", headers=auth_headers)
+
+        (record,) = [json.loads(line) for line in response.text.splitlines()]
+        assert record["name"] == test_company_data["name"]
+        assert set(record) == {"id", "name", "email", "phone", "industry", "annual_revenue", "company_size",
+                               "created_at"}
+
+    def test_requires_auth_and_valid_format(self, client: TestClient, auth_headers):
+        """Test that exports need a token and a known format"""
+        assert client.get("/api/v1/requests/export").status_code in (401, 403)
+        assert client.get("/api/v1/requests/export?format=xml", headers=auth_headers).status_code == 422
+
+    def test_encoding_is_incremental(self):
+        """Test that each batch becomes its own chunk and gzip output decompresses to the same bytes"""
+        batches = ([(1, "a")], [(2, "b")], [(3, None)])
+        chunks = list(encode_rows(iter(batches), ["id", "name"], "csv"))
+
+        assert chunks == [b"id,name\n1,a\n", b"2,b\n", b"3,\n"]
+        assert gzip.decompress(b"".join(gzip_chunks(iter(chunks)))) == b"".join(chunks)
+        assert accepts_gzip("br, gzip;q=0.5") and not accepts_gzip("gzip;q=0") and not accepts_gzip(None)
@@ -0,0 +1,96 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.request import Request
+from app.services import risk_engine
+from app.services.recommendations import joined_recommendations, resolve_locale
+from app.services.risk_rules import parse_rules
+
+
+ASSESSMENT = {
+    "amount": 100000.0,
+    "purpose": "loan",
+    "annual_revenue": 1000000.0,
+    "employee_count": 60,
+    "years_in_business": 7,
+    "debt_to_equity_ratio": 0.3,
+    "credit_score": 700
+}
+
+
+class TestRecommendationCodes:
+    """Test recommendation codes and their per-locale catalogs"""
+
+    def test_codes_cover_every_band(self):
+        """Test that every factor band has a distinct code with text in every locale"""
+        rules = risk_engine.BUILTIN_RULES
+        codes = [
+            risk_engine.recommendation_code(index, band)
+            for index, texts in enumerate(risk_engine.FACTOR_RECOMMENDATIONS)
+            for band in range(len(texts))
+        ]
+
+        assert len(set(codes)) == len(codes)
+        for catalog in rules.catalogs.values():
+            assert set(catalog) == set(codes)
+        assert rules.codes_by_bands[(0, -1, -1, 2, -1)] == (10, 42)
+
+    @pytest.mark.parametrize("header,locale", [
+        (None, "es"),
+        ("en", "en"),
+        ("en-US,en;q=0.9", "en"),
+        ("fr-FR, es;q=0.5, en;q=0.8", "en"),
+        ("fr, de", "es"),
+        ("en;q=0", "es"),
+    ])
+    def test_resolve_locale(self, header, locale):
+        """Test Accept-Language parsing"""
+        assert resolve_locale(header) == locale
+
+    def test_unknown_locale_and_codes_fall_back(self):
+        """Test that unknown locales use the default texts and unknown codes are kept visible"""
+        assert joined_recommendations([40, 99], "fr") == "Excelente salud financiera; 99"
+        assert joined_recommendations([], "en") == ""
+        assert joined_recommendations(None, "en") is None
+
+    def test_rules_file_texts(self, rules_data):
+        """Test that a rules file can override texts per locale or only for the default locale"""
+        rules_data["factors"]["debt"]["recommendations"] = {"en": ["Low debt", "Some debt", "Lots of debt"]}
+        rules_data["factors"]["credit"]["recommendations"] = ["Regular", "Buena", "Excelente"]
+        rules = parse_rules(rules_data, "test")
+
+        assert risk_engine.recommendation_texts([40, 50], "en", rules) == [
+            "Low debt", risk_engine.FACTOR_RECOMMENDATIONS_EN[4][0]
+        ]
+        assert risk_engine.recommendation_texts([40, 50], "es", rules) == [
+            risk_engine.FACTOR_RECOMMENDATIONS[3][0], "Regular"
+        ]
+
+    def test_assess_stores_codes_and_serializes_per_locale(
+        self, client: TestClient, auth_headers, test_company_data, db_session
+    ):
+        """Test that assessments store codes and responses resolve them in the requested language"""
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+
+        response = client.post(
+            "/api/v1/risk/assess",
+            json=dict(ASSESSMENT, company_id=company_id),
+            headers=dict(auth_headers, **{"Accept-Language": "en"})
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        codes = data["recommendation_codes"]
+        assert data["recommendations"] == risk_engine.recommendation_texts(codes, "en")
+        assert data["recommendations"][0] == risk_engine.FACTOR_RECOMMENDATIONS_EN[0][0]
+
+        stored = db_session.query(Request).one()
+        assert stored.recommendation_codes == codes
+
+        for language, texts in risk_engine.RECOMMENDATION_TEXTS.items():
+            detail = client.get(
+                f"/api/v1/requests/{stored.id}",
+                headers=dict(auth_headers, **{"Accept-Language": language})
+            ).json()
+            assert detail["recommendation_codes"] == codes
+            assert detail["recommendations"].split("; ")[0] == texts[0][0]
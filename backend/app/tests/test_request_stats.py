@@ -0,0 +1,108 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.jobs.reconcile_request_stats import reconcile_request_stats
+from app.jobs.rescore_requests import rescore_requests
+from app.services import risk_engine
+from app.services.request_stats import computed_stats, stored_stats
+from app.services.risk_rescore import pending_rescores
+
+
+ASSESSMENT = {
+    "amount": 100000.0,
+    "purpose": "loan",
+    "annual_revenue": 1000000.0,
+    "employee_count": 60,
+    "years_in_business": 7,
+    "debt_to_equity_ratio": 0.3,
+    "credit_score": 700
+}
+
+
+def assert_in_sync(db_session):
+    """request_stats equals a full recount of requests"""
+    with db_session.get_bind().connect() as conn:
+        stored, computed = stored_stats(conn), computed_stats(conn)
+    assert stored.keys() == computed.keys()
+    for key, (count, amount) in computed.items():
+        assert stored[key][0] == count
+        assert abs(stored[key][1] - amount) < 1e-6
+
+
+class TestRequestStats:
+    """Test the incrementally maintained request_stats table"""
+
+    def test_follows_every_write(self, client: TestClient, auth_headers, test_company_data,
+                                 test_request_data, db_session):
+        """Test that request, assessment and company writes keep the table equal to a recount"""
+        companies = [
+            client.post("/api/v1/companies/", json=dict(test_company_data, name=name),
+                        headers=auth_headers).json()["id"]
+            for name in ("First", "Second")
+        ]
+        ids = [
+            client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id),
+                        headers=auth_headers).json()["id"]
+            for company_id in companies
+        ]
+        assert_in_sync(db_session)
+
+        client.put(f"/api/v1/requests/{ids[0]}", json={"status": "approved", "amount": 5000}, headers=auth_headers)
+        client.put(f"/api/v1/requests/{ids[1]}", json={"notes": "only notes"}, headers=auth_headers)
+        assert_in_sync(db_session)
+
+        client.post("/api/v1/risk/assess", json=dict(ASSESSMENT, company_id=companies[0]), headers=auth_headers)
+        client.post("/api/v1/risk/assess/batch", json={"items": [
+            dict(ASSESSMENT, company_id=companies[1]), dict(ASSESSMENT, company_id=companies[1], credit_score=500)
+        ]}, headers=auth_headers)
+        assert_in_sync(db_session)
+
+        client.delete(f"/api/v1/requests/{ids[0]}", headers=auth_headers)
+        assert_in_sync(db_session)
+
+        client.delete(f"/api/v1/companies/{companies[1]}", headers=auth_headers)
+        assert_in_sync(db_session)
+        summary = client.get("/api/v1/requests/stats/summary", headers=auth_headers).json()
+        assert summary["total_requests"] == 1
+
+    def test_follows_rescores(self, client: TestClient, auth_headers, test_company_data,
+                              test_request_data, db_session, new_rules):
+        """Test that lazy and bulk rescores move the requests to their new risk level"""
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        for credit_score in (500, 650, 800):
+            client.post("/api/v1/risk/assess", json=dict(ASSESSMENT, company_id=company_id, credit_score=credit_score),
+                        headers=auth_headers)
+        # Niveles viejos que el rescore tiene que corregir
+        db_session.execute(text("UPDATE requests SET risk_level = 'STALE'"))
+        db_session.commit()
+        reconcile_request_stats(db_session.get_bind())
+
+        risk_engine.set_active_rules(new_rules)
+        client.get("/api/v1/requests/?size=1", headers=auth_headers)
+        assert len(pending_rescores) == 0
+        assert_in_sync(db_session)
+
+        rescore_requests(db_session.get_bind(), workers=0)
+        assert_in_sync(db_session)
+        summary = client.get("/api/v1/requests/stats/summary", headers=auth_headers).json()
+        assert "STALE" not in summary["by_risk_level"]
+
+    def test_reconcile_reports_and_fixes_drift(self, client: TestClient, auth_headers, test_company_data,
+                                               test_request_data, db_session):
+        """Test that the reconciliation job finds rows changed behind the application and rebuilds the table"""
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id), headers=auth_headers)
+        db_session.execute(text("UPDATE requests SET amount = amount * 2"))
+        db_session.commit()
+
+        engine = db_session.get_bind()
+        report = reconcile_request_stats(engine, dry_run=True)
+        assert (report.groups, len(report.drift)) == (1, 1)
+        (key, stored, computed), = report.drift
+        assert computed == (1, stored[1] * 2)
+        # dry_run no escribe
+        assert len(reconcile_request_stats(engine, dry_run=True).drift) == 1
+
+        assert len(reconcile_request_stats(engine).drift) == 1
+        assert reconcile_request_stats(engine, dry_run=True).drift == []
+        assert_in_sync(db_session)
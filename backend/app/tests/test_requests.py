@@ -1,6 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from sqlalchemy import event, text
+
+from app.jobs.reconcile_request_stats import reconcile_request_stats
+from app.schemas.schemas import RequestListResponse
+from app.services.request_counts import count_cache
 
 
 class TestRequests:
@@ -508,3 +513,475 @@ class TestRequests:
         assert len(data["items"]) == 1
         assert data["total"] == 4  # All requests are pending by default
         assert data["pages"] == 4  # 4 pages with size 1
+
+
+class TestRequestsCursorPagination:
+    """Test keyset pagination of the requests list"""
+
+    def create_requests(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Create 7 requests; several share a created_at so the id tiebreak matters"""
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        ids = []
+        for i in range(7):
+            data = dict(test_request_data, company_id=company_id, amount=10000.0 * (i + 1))
+            ids.append(int(client.post("/api/v1/requests/", json=data, headers=auth_headers).json()["id"]))
+
+        # Formato de CURRENT_TIMESTAMP en SQLite (sin fracción de segundo)
+        timestamps = ["2026-01-02 10:00:00", "2026-01-01 09:00:00", "2026-01-02 10:00:00",
+                      "2026-01-03 08:00:00", "2026-01-02 10:00:00", "2026-01-01 09:00:00", "2026-01-04 00:00:00"]
+        for request_id, created_at in zip(ids, timestamps):
+            db_session.execute(text("UPDATE requests SET created_at = :created_at WHERE id = :id"),
+                               {"created_at": created_at, "id": request_id})
+        db_session.commit()
+        # Orden esperado: created_at DESC, id DESC
+        return [request_id for _, request_id in sorted(zip(timestamps, ids), reverse=True)]
+
+    def test_walk_forward_and_back(self, client: TestClient, auth_headers, test_company_data,
+                                   test_request_data, db_session):
+        """Test that next/prev cursors visit every row exactly once in both directions"""
+        expected = self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+
+        pages, url = [], "/api/v1/requests/?pagination=cursor&size=3"
+        while url:
+            data = client.get(url, headers=auth_headers).json()
+            assert data["page"] is None and data["total"] == 7
+            pages.append(data)
+            url = f"/api/v1/requests/?size=3&cursor={data['next_cursor']}" if data["next_cursor"] else None
+
+        assert [[int(item["id"]) for item in page["items"]] for page in pages] == \
+            [expected[0:3], expected[3:6], expected[6:7]]
+        assert pages[0]["prev_cursor"] is None
+
+        back = client.get(f"/api/v1/requests/?size=3&cursor={pages[2]['prev_cursor']}", headers=auth_headers).json()
+        assert [int(item["id"]) for item in back["items"]] == expected[3:6]
+        first = client.get(f"/api/v1/requests/?size=3&cursor={back['prev_cursor']}", headers=auth_headers).json()
+        assert [int(item["id"]) for item in first["items"]] == expected[0:3]
+        assert first["prev_cursor"] is None
+        assert first["next_cursor"] is not None
+
+    def test_offset_mode_unchanged(self, client: TestClient, auth_headers, test_company_data,
+                                   test_request_data, db_session):
+        """Test that page/size pagination keeps working without cursors"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+
+        data = client.get("/api/v1/requests/?page=3&size=3", headers=auth_headers).json()
+        assert (data["page"], data["pages"], len(data["items"])) == (3, 3, 1)
+        assert data["next_cursor"] is None and data["prev_cursor"] is None
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJzIjoiYW1vdW50IiwiZCI6Im5leHQiLCJ2IjpbMV19"])
+    def test_invalid_cursor(self, client: TestClient, auth_headers, cursor):
+        """Test that malformed cursors and cursors of another sort are rejected"""
+        response = client.get(f"/api/v1/requests/?cursor={cursor}", headers=auth_headers)
+        assert response.status_code == 400
+
+
+class TestRequestsCountStrategies:
+    """Test the count parameter of the requests list"""
+
+    def create_requests(self, client: TestClient, auth_headers, test_company_data, test_request_data, n: int):
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        for _ in range(n):
+            client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id), headers=auth_headers)
+        return company_id
+
+    def test_count_none_reports_has_more(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        """Test that count=none skips the total and still tells if another page exists"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, 3)
+
+        first = client.get("/api/v1/requests/?count=none&size=2", headers=auth_headers).json()
+        last = client.get("/api/v1/requests/?count=none&size=2&page=2", headers=auth_headers).json()
+
+        assert (first["total"], first["pages"], first["has_more"], len(first["items"])) == (None, None, True, 2)
+        assert (last["has_more"], len(last["items"])) == (False, 1)
+
+    def test_count_cached_invalidated_on_write(self, client: TestClient, auth_headers,
+                                               test_company_data, test_request_data):
+        """Test that cached totals are reused until the user writes a request"""
+        company_id = self.create_requests(client, auth_headers, test_company_data, test_request_data, 2)
+        hits = count_cache.stats()["hits"]
+
+        assert client.get("/api/v1/requests/?count=cached", headers=auth_headers).json()["total"] == 2
+        assert client.get("/api/v1/requests/?count=cached", headers=auth_headers).json()["total"] == 2
+        assert count_cache.stats()["hits"] == hits + 1
+        # Otros filtros, otra entrada
+        assert client.get("/api/v1/requests/?count=cached&status=approved", headers=auth_headers).json()["total"] == 0
+
+        client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id), headers=auth_headers)
+        assert client.get("/api/v1/requests/?count=cached", headers=auth_headers).json()["total"] == 3
+
+    def test_count_cached_invalidated_on_company_write(self, client: TestClient, auth_headers,
+                                                       test_company_data, test_request_data):
+        """Test that renaming or deleting a company drops the cached totals"""
+        company_id = self.create_requests(client, auth_headers, test_company_data, test_request_data, 2)
+        search = test_company_data["name"].split()[0]
+
+        assert client.get(f"/api/v1/requests/?count=cached&search={search}", headers=auth_headers).json()["total"] == 2
+        client.put(f"/api/v1/companies/{company_id}", json={"name": "Renamed Ltd"}, headers=auth_headers)
+        assert client.get(f"/api/v1/requests/?count=cached&search={search}", headers=auth_headers).json()["total"] == 0
+
+        assert client.get("/api/v1/requests/?count=cached", headers=auth_headers).json()["total"] == 2
+        client.delete(f"/api/v1/companies/{company_id}", headers=auth_headers)
+        assert client.get("/api/v1/requests/?count=cached", headers=auth_headers).json()["total"] == 0
+
+    def test_count_estimate_falls_back_without_planner(self, client: TestClient, auth_headers,
+                                                       test_company_data, test_request_data):
+        """Test that estimate gives an exact total on databases without planner estimates"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, 2)
+
+        data = client.get("/api/v1/requests/?count=estimate", headers=auth_headers).json()
+        assert (data["total"], data["pages"], data["total_is_estimate"]) == (2, 1, False)
+
+    def test_invalid_count_strategy(self, client: TestClient, auth_headers):
+        """Test that unknown strategies are rejected"""
+        assert client.get("/api/v1/requests/?count=maybe", headers=auth_headers).status_code == 422
+
+
+class TestRequestsTextSearch:
+    """Test the indexed search of the requests list (FTS5 on SQLite)"""
+
+    def create_requests(self, client: TestClient, auth_headers, test_company_data, test_request_data, purposes):
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        ids = [
+            client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id, purpose=purpose),
+                        headers=auth_headers).json()["id"]
+            for purpose in purposes
+        ]
+        return company_id, ids
+
+    def search(self, client: TestClient, auth_headers, term: str):
+        response = client.get("/api/v1/requests/", params={"search": term}, headers=auth_headers)
+        assert response.status_code == 200
+        return [item["purpose"] for item in response.json()["items"]]
+
+    def test_prefix_and_accents(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        """Test that every word is a prefix, all words must match and accents are ignored"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data,
+                             ["Equipment financing", "Financiación de maquinaria", "Working capital"])
+
+        assert self.search(client, auth_headers, "equip") == ["Equipment financing"]
+        assert self.search(client, auth_headers, "FINANCIACION maq") == ["Financiación de maquinaria"]
+        assert self.search(client, auth_headers, "equip capital") == []
+        # Sin palabras la búsqueda no filtra; los operadores de FTS5 no rompen la consulta
+        assert len(self.search(client, auth_headers, "  *\" ")) == 3
+
+    def test_company_name_and_ranking(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        """Test matches on the company name and that the most relevant request comes first"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data,
+                             ["Loan for new office furniture and other items", "Loan", "Working capital"])
+
+        assert len(self.search(client, auth_headers, "test comp")) == 3
+        assert self.search(client, auth_headers, "loan") == ["Loan", "Loan for new office furniture and other items"]
+
+    def test_index_follows_writes(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        """Test that triggers keep the index in sync with request and company changes"""
+        company_id, ids = self.create_requests(client, auth_headers, test_company_data, test_request_data,
+                                               ["Equipment financing", "Working capital"])
+
+        client.put(f"/api/v1/requests/{ids[0]}", json={"purpose": "Inventory"}, headers=auth_headers)
+        client.delete(f"/api/v1/requests/{ids[1]}", headers=auth_headers)
+        client.put(f"/api/v1/companies/{company_id}", json={"name": "Acme"}, headers=auth_headers)
+
+        assert self.search(client, auth_headers, "equipment") == []
+        assert self.search(client, auth_headers, "inventory") == ["Inventory"]
+        assert self.search(client, auth_headers, "capital") == []
+        assert self.search(client, auth_headers, "acme") == ["Inventory"]
+        assert self.search(client, auth_headers, "test company") == []
+
+
+class TestRequestsFieldProjection:
+    """Test that list endpoints load only the columns they return"""
+
+    def test_sparse_fields(self, client: TestClient, auth_headers, test_company_data, test_request_data):
+        """Test that ?fields= returns only the requested item fields plus id"""
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id), headers=auth_headers)
+
+        data = client.get("/api/v1/requests/?fields=amount, status", headers=auth_headers).json()
+        full = client.get("/api/v1/requests/", headers=auth_headers).json()
+
+        assert set(data["items"][0]) == {"id", "amount", "status"}
+        assert data["total"] == 1 and data["has_more"] is False
+        assert set(full["items"][0]) == set(RequestListResponse.model_fields)
+
+    def test_unknown_field(self, client: TestClient, auth_headers):
+        """Test that unknown fields are rejected"""
+        response = client.get("/api/v1/requests/?fields=amount,notes", headers=auth_headers)
+
+        assert response.status_code == 400
+        assert "notes" in response.json()["detail"]
+
+    def test_list_queries_select_only_needed_columns(self, client: TestClient, auth_headers, db_session,
+                                                     test_company_data, test_request_data):
+        """Test that the list SQL does not read risk_inputs, notes or company descriptions"""
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        client.post("/api/v1/requests/", json=dict(test_request_data, company_id=company_id), headers=auth_headers)
+
+        engine, statements = db_session.get_bind(), []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            client.get("/api/v1/requests/?fields=id,amount", headers=auth_headers)
+            client.get("/api/v1/companies/", headers=auth_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        requests_select = next(s for s in statements if s.startswith("SELECT") and "FROM requests" in s
+                               and "count(" not in s)
+        companies_select = next(s for s in statements if s.startswith("SELECT") and "FROM companies" in s)
+        assert "risk_inputs" not in requests_select and "notes" not in requests_select
+        assert "companies.description" not in companies_select
+
+
+class TestRequestsSummary:
+    """Test the single-query dashboard summary"""
+
+    def create_requests(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Two companies; requests with different statuses, levels and creation dates"""
+        companies = [
+            client.post("/api/v1/companies/", json=dict(test_company_data, name=name),
+                        headers=auth_headers).json()["id"]
+            for name in ("First", "Second")
+        ]
+        rows = [  # (company, amount, status, risk_level, created_at)
+            (0, 10000, "approved", "LOW", "2026-01-01 10:00:00"),
+            (0, 20000, "approved", "HIGH", "2026-02-01 10:00:00"),
+            (0, 30000, "rejected", "HIGH", "2026-03-01 10:00:00"),
+            (1, 40000, "pending", None, "2026-03-01 12:00:00"),
+        ]
+        for company, amount, status, risk_level, created_at in rows:
+            data = dict(test_request_data, company_id=companies[company], amount=amount)
+            request_id = client.post("/api/v1/requests/", json=data, headers=auth_headers).json()["id"]
+            client.put(f"/api/v1/requests/{request_id}", json={"status": status}, headers=auth_headers)
+            db_session.execute(
+                text("UPDATE requests SET risk_level = :level, created_at = :created_at WHERE id = :id"),
+                {"level": risk_level, "created_at": created_at, "id": request_id}
+            )
+        db_session.commit()
+        # El UPDATE directo no pasa por la aplicación: reconstruir request_stats
+        reconcile_request_stats(db_session.get_bind())
+        return companies
+
+    def summary(self, client: TestClient, auth_headers, **params):
+        response = client.get("/api/v1/requests/stats/summary", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_breakdowns(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Test the per-status and per-risk-level counts and amounts"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+
+        data = self.summary(client, auth_headers)
+
+        assert (data["total_requests"], data["total_amount_requested"], data["approval_rate"]) == (4, 100000, 50.0)
+        assert data["by_status"]["approved"] == {"count": 2, "amount": 30000}
+        assert data["by_status"]["cancelled"] == {"count": 0, "amount": 0}
+        assert data["by_risk_level"] == {
+            "LOW": {"count": 1, "amount": 10000},
+            "HIGH": {"count": 2, "amount": 50000},
+            "unscored": {"count": 1, "amount": 40000}
+        }
+
+    def test_filters(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Test the company and creation date filters"""
+        companies = self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+
+        by_company = self.summary(client, auth_headers, company_id=companies[1])
+        in_range = self.summary(client, auth_headers, created_from="2026-02-01T10:00:00",
+                                created_to="2026-03-01T12:00:00Z")
+
+        assert (by_company["total_requests"], by_company["pending_requests"]) == (1, 1)
+        assert (in_range["total_requests"], in_range["total_amount_requested"]) == (2, 50000)
+        assert in_range["by_status"]["rejected"]["count"] == 1
+
+    def test_single_query(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Test that the summary reads request_stats once, and requests once with a date range"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+        engine, statements = db_session.get_bind(), []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            self.summary(client, auth_headers)
+            stats_statements = [s for s in statements if "FROM request" in s]
+            statements.clear()
+            self.summary(client, auth_headers, created_from="2026-01-01T00:00:00")
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert len(stats_statements) == 1 and "FROM request_stats" in stats_statements[0]
+        assert len([s for s in statements if "FROM requests" in s]) == 1
+
+
+class TestRequestsFacets:
+    """Test facet counts of the requests list"""
+
+    def create_requests(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        companies = [
+            client.post("/api/v1/companies/", json=dict(test_company_data, name=name),
+                        headers=auth_headers).json()["id"]
+            for name in ("First", "Second")
+        ]
+        rows = [  # (company, status, risk_level)
+            (0, "approved", "LOW"), (0, "approved", "HIGH"), (0, "rejected", "HIGH"),
+            (1, "approved", "LOW"), (1, "pending", None),
+        ]
+        for company, status, risk_level in rows:
+            request_id = client.post("/api/v1/requests/", json=dict(test_request_data, company_id=companies[company]),
+                                     headers=auth_headers).json()["id"]
+            client.put(f"/api/v1/requests/{request_id}", json={"status": status}, headers=auth_headers)
+            db_session.execute(text("UPDATE requests SET risk_level = :level WHERE id = :id"),
+                               {"level": risk_level, "id": request_id})
+        db_session.commit()
+        return companies
+
+    def facets(self, data) -> dict:
+        return {name: {item["value"]: item["count"] for item in values} for name, values in data["facets"].items()}
+
+    def test_counts(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Test per-value counts for every facet, most frequent first"""
+        companies = self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+
+        data = client.get("/api/v1/requests/?facets=status,risk_level,company_id&size=2", headers=auth_headers).json()
+
+        assert self.facets(data) == {
+            "status": {"approved": 3, "rejected": 1, "pending": 1},
+            "risk_level": {"LOW": 2, "HIGH": 2, None: 1},
+            "company_id": {companies[0]: 3, companies[1]: 2}
+        }
+        assert data["facets"]["status"][0] == {"value": "approved", "count": 3}
+        assert (data["total"], len(data["items"])) == (5, 2)
+        assert "facets" not in client.get("/api/v1/requests/", headers=auth_headers).json()
+
+    def test_own_filter_is_ignored(self, client: TestClient, auth_headers, test_company_data,
+                                   test_request_data, db_session):
+        """Test that a facet keeps counting the other values of its own filter"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+
+        data = client.get("/api/v1/requests/?facets=status,risk_level&risk_level=HIGH", headers=auth_headers).json()
+
+        assert self.facets(data) == {
+            "status": {"approved": 1, "rejected": 1},
+            "risk_level": {"LOW": 2, "HIGH": 2, None: 1}
+        }
+        assert data["total"] == 2
+
+    def test_replaces_the_count_query(self, client: TestClient, auth_headers, test_company_data,
+                                      test_request_data, db_session):
+        """Test that the facets and the total come from one statement besides the page"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+        engine, statements = db_session.get_bind(), []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            data = client.get("/api/v1/requests/?facets=status", headers=auth_headers).json()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert data["total"] == 5
+        assert len([s for s in statements if "FROM requests" in s and "users" not in s]) == 2
+
+    def test_unknown_facet(self, client: TestClient, auth_headers):
+        """Test that unknown facets are rejected"""
+        assert client.get("/api/v1/requests/?facets=status,amount", headers=auth_headers).status_code == 400
+
+
+class TestRequestsSort:
+    """Test the sort orders, the created_at range and the riskiest open requests"""
+
+    def create_requests(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Requests with known amounts, scores, statuses and creation dates; returns their ids"""
+        company_id = client.post("/api/v1/companies/", json=test_company_data, headers=auth_headers).json()["id"]
+        rows = [  # (amount, risk_score, status, created_at)
+            (30000, 35.0, "pending", "2026-01-01 10:00:00"),
+            (10000, 80.0, "pending", "2026-02-01 10:00:00"),
+            (50000, 20.0, "approved", "2026-03-01 10:00:00"),
+            (30000, 55.0, "under_review", "2026-04-01 10:00:00"),
+            (20000, None, "pending", "2026-05-01 10:00:00"),
+        ]
+        ids = []
+        for amount, risk_score, status, created_at in rows:
+            data = dict(test_request_data, company_id=company_id, amount=amount)
+            request_id = client.post("/api/v1/requests/", json=data, headers=auth_headers).json()["id"]
+            client.put(f"/api/v1/requests/{request_id}", json={"status": status}, headers=auth_headers)
+            db_session.execute(
+                text("UPDATE requests SET risk_score = :score, created_at = :created_at WHERE id = :id"),
+                {"score": risk_score, "created_at": created_at, "id": request_id}
+            )
+            ids.append(request_id)
+        db_session.commit()
+        return ids
+
+    def listed(self, client: TestClient, auth_headers, **params):
+        response = client.get("/api/v1/requests/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    @pytest.mark.parametrize("sort,order", [
+        (None, [4, 3, 2, 1, 0]),
+        ("created_at", [0, 1, 2, 3, 4]),
+        ("-amount", [2, 3, 0, 4, 1]),
+        ("amount", [1, 4, 0, 3, 2]),
+        ("-risk_score", [1, 3, 0, 2]),
+        ("risk_score", [2, 0, 3, 1]),
+    ])
+    def test_offset_and_cursor_orders(self, client: TestClient, auth_headers, test_company_data,
+                                      test_request_data, db_session, sort, order):
+        """Test that pages and cursors follow the sort, ties broken by id and unscored rows left out"""
+        ids = self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+        expected = [ids[i] for i in order]
+        params = {"sort": sort} if sort else {}
+
+        pages = [self.listed(client, auth_headers, page=page, size=2, **params) for page in (1, 2, 3)]
+        assert [item["id"] for page in pages for item in page["items"]] == expected
+        assert pages[0]["total"] == len(expected)
+
+        walked, cursor = [], None
+        while True:
+            data = self.listed(client, auth_headers, pagination="cursor", size=2, **params,
+                               **({"cursor": cursor} if cursor else {}))
+            walked += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        assert walked == expected
+
+    def test_cursor_keeps_its_sort(self, client: TestClient, auth_headers, test_company_data,
+                                   test_request_data, db_session):
+        """Test that a cursor is rejected with a different sort"""
+        self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+        cursor = self.listed(client, auth_headers, pagination="cursor", size=2, sort="-amount")["next_cursor"]
+
+        response = client.get("/api/v1/requests/", params={"cursor": cursor, "sort": "amount"}, headers=auth_headers)
+
+        assert response.status_code == 400
+        assert client.get("/api/v1/requests/?sort=notes", headers=auth_headers).status_code == 422
+
+    def test_created_range(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Test created_from (inclusive) and created_to (exclusive) in the list and the export"""
+        ids = self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+        params = {"created_from": "2026-02-01T10:00:00", "created_to": "2026-04-01T10:00:00Z"}
+
+        data = self.listed(client, auth_headers, **params)
+        exported = client.get("/api/v1/requests/export", params=dict(params, format="ndjson", fields="id"),
+                              headers=auth_headers)
+
+        assert [item["id"] for item in data["items"]] == [ids[2], ids[1]]
+        assert data["total"] == 2
+        assert exported.text.splitlines() == [f'{{"id":"{ids[1]}"}}', f'{{"id":"{ids[2]}"}}']
+
+    def test_riskiest_open(self, client: TestClient, auth_headers, test_company_data, test_request_data, db_session):
+        """Test that the riskiest open requests are the open ones with the lowest score"""
+        ids = self.create_requests(client, auth_headers, test_company_data, test_request_data, db_session)
+
+        response = client.get("/api/v1/requests/riskiest?limit=2", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert [(item["id"], item["risk_score"]) for item in response.json()] == [(ids[0], 35.0), (ids[3], 55.0)]
@@ -0,0 +1,118 @@
+import pytest
+
+from app.jobs.rescore_requests import CheckpointMismatch, read_checkpoint, rescore_requests
+from app.models.company import Company
+from app.models.request import Request
+from app.services import risk_engine
+from app.services.risk_calculator import calculate_risk_score, risk_request_from_inputs
+
+
+def create_requests(db_session, user_id: int):
+    """Create a company with stale, current and invalid stored requests"""
+    company = Company(
+        name="Acme", email="acme@test.com", phone="123", industry="technology",
+        annual_revenue=1000000.0, company_size=60, user_id=user_id
+    )
+    db_session.add(company)
+    db_session.flush()
+
+    inputs = [
+        {"years_in_business": 12, "credit_score": 780},
+        {"annual_revenue": 200000.0, "debt_to_equity_ratio": 1.5},
+        {"employee_count": 3},
+        {"credit_score": "not a number"},
+        {},
+    ]
+    requests = [
+        Request(
+            company_id=company.id, user_id=user_id, amount=50000.0 * (i + 1),
+            purpose="loan", risk_inputs=risk_inputs, risk_score=0.0, risk_level="stale"
+        )
+        for i, risk_inputs in enumerate(inputs)
+    ]
+    db_session.add_all(requests)
+    db_session.commit()
+
+    # La última ya tiene el puntaje actual: no debe aparecer como cambio
+    current = expected_score(requests[-1], company)
+    requests[-1].risk_score, requests[-1].risk_level = current.risk_score, current.risk_level
+    db_session.commit()
+    return company, requests
+
+
+def expected_score(request: Request, company: Company):
+    return calculate_risk_score(risk_request_from_inputs(
+        str(request.id), request.amount, request.purpose, request.risk_inputs,
+        company.annual_revenue, company.company_size
+    ))
+
+
+def stored_scores(db_session):
+    db_session.expire_all()
+    return {r.id: (r.risk_score, r.risk_level) for r in db_session.query(Request).order_by(Request.id)}
+
+
+class TestRescoreRequests:
+    """Test the bulk rescoring job"""
+
+    def test_dry_run_reports_without_writing(self, db_session, test_user_db, tmp_path):
+        """Test that a dry run lists the changes and leaves the table untouched"""
+        _, requests = create_requests(db_session, test_user_db.id)
+        before = stored_scores(db_session)
+        checkpoint = tmp_path / "checkpoint.json"
+        seen = []
+
+        report = rescore_requests(
+            db_session.get_bind(), batch_size=2, dry_run=True, checkpoint=checkpoint,
+            on_batch=lambda report, batch: seen.extend(batch.changes)
+        )
+
+        assert (report.scanned, report.changed) == (5, 3)
+        assert [change[0] for change in seen] == [r.id for r in requests[:3]]
+        assert report.errors[0][0] == requests[3].id
+        assert stored_scores(db_session) == before
+        assert not checkpoint.exists()
+
+    def test_rescore_and_resume(self, db_session, test_user_db, tmp_path):
+        """Test that changed rows are written back and the checkpoint allows resuming"""
+        company, requests = create_requests(db_session, test_user_db.id)
+        checkpoint = tmp_path / "checkpoint.json"
+
+        report = rescore_requests(db_session.get_bind(), batch_size=2, checkpoint=checkpoint)
+
+        assert (report.scanned, report.changed, report.restamped, len(report.errors)) == (5, 3, 1, 1)
+        scores = stored_scores(db_session)
+        for request in requests[:3]:
+            expected = expected_score(request, company)
+            assert scores[request.id] == (expected.risk_score, expected.risk_level)
+        assert scores[requests[3].id] == (0.0, "stale")
+        # Todas las filas puntuadas quedan marcadas con la versión, también las que no cambiaron
+        versions = {r.id: r.rules_version for r in db_session.query(Request)}
+        active = risk_engine.active_rules.version
+        assert [versions[r.id] for r in requests] == [active, active, active, None, active]
+        assert read_checkpoint(checkpoint) == requests[-1].id
+
+        resumed = rescore_requests(db_session.get_bind(), after_id=read_checkpoint(checkpoint, active))
+        assert resumed.scanned == 0
+
+    def test_resume_refuses_other_rules(self, db_session, test_user_db, tmp_path, new_rules):
+        """Test that a checkpoint written with other rules cannot be resumed"""
+        create_requests(db_session, test_user_db.id)
+        checkpoint = tmp_path / "checkpoint.json"
+        rescore_requests(db_session.get_bind(), batch_size=2, checkpoint=checkpoint)
+
+        risk_engine.set_active_rules(new_rules)
+
+        with pytest.raises(CheckpointMismatch, match="run without --resume"):
+            read_checkpoint(checkpoint, risk_engine.active_rules.version)
+
+    def test_process_pool(self, db_session, test_user_db):
+        """Test that scoring on worker processes gives the same updates"""
+        company, requests = create_requests(db_session, test_user_db.id)
+
+        report = rescore_requests(db_session.get_bind(), batch_size=1, workers=2)
+
+        assert (report.scanned, report.changed, report.last_id) == (5, 3, requests[-1].id)
+        scores = stored_scores(db_session)
+        expected = expected_score(requests[0], company)
+        assert scores[requests[0].id] == (expected.risk_score, expected.risk_level)
@@ -0,0 +1,262 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models.request import Request
+from app.schemas.schemas import RiskRequest
+from app.services.risk_calculator import calculate_risk_score
+
+
+class TestRiskAssessment:
+    """Test risk assessment endpoints"""
+
+    def setup_company(self, client: TestClient, auth_headers, test_company_data):
+        """Helper method to create a company for testing"""
+        response = client.post(
+            "/api/v1/companies/",
+            json=test_company_data,
+            headers=auth_headers
+        )
+        return response.json()["id"]
+
+    def risk_payload(self, company_id: str, **overrides):
+        """Helper method to build a risk assessment payload"""
+        payload = {
+            "company_id": company_id,
+            "amount": 100000.0,
+            "purpose": "loan",
+            "annual_revenue": 1000000.0,
+            "employee_count": 50,
+            "years_in_business": 12,
+            "debt_to_equity_ratio": 0.3,
+            "credit_score": 780
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_assess_risk(self, client: TestClient, auth_headers, test_company_data):
+        """Test single risk assessment"""
+        company_id = self.setup_company(client, auth_headers, test_company_data)
+
+        response = client.post(
+            "/api/v1/risk/assess",
+            json=self.risk_payload(company_id),
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["risk_score"] == 100
+        assert data["risk_level"] == "Bajo"
+        assert data["approved"] is True
+
+    def test_assess_risk_batch(self, client: TestClient, auth_headers, test_company_data, db_session):
+        """Test batch assessment with per-item errors"""
+        company_id = self.setup_company(client, auth_headers, test_company_data)
+
+        single = client.post(
+            "/api/v1/risk/assess",
+            json=self.risk_payload(company_id, credit_score=600),
+            headers=auth_headers
+        ).json()
+
+        response = client.post(
+            "/api/v1/risk/assess/batch",
+            json={"items": [
+                self.risk_payload(company_id),
+                self.risk_payload("not-a-number"),
+                self.risk_payload("999"),
+                self.risk_payload(company_id, credit_score=600),
+            ]},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["processed"] == 2
+        assert data["failed"] == 2
+
+        results = data["results"]
+        assert [r["index"] for r in results] == [0, 1, 2, 3]
+        assert results[0]["result"]["risk_score"] == 100
+        assert results[0]["request_id"] is not None
+        assert results[1]["error"] == "Invalid company ID format"
+        assert results[2]["error"] == "Company not found"
+        assert results[2]["request_id"] is None
+        # Batch scoring must match the single-item endpoint
+        assert results[3]["result"] == single
+
+        stored = db_session.query(Request).order_by(Request.id).all()
+        assert len(stored) == 3
+        assert str(stored[-1].id) == results[3]["request_id"]
+        assert stored[-1].status == "approved"
+        assert stored[-1].risk_inputs["credit_score"] == 600
+
+    def test_assess_risk_batch_other_users_company(self, client: TestClient, auth_headers, test_company_data):
+        """Test that companies owned by another user are rejected per item"""
+        other_user = {"email": "other@example.com", "password": "password123", "full_name": "Other"}
+        client.post("/api/v1/auth/register", json=other_user)
+        token = client.post("/api/v1/auth/login", json={
+            "email": other_user["email"],
+            "password": other_user["password"]
+        }).json()["access_token"]
+        other_company_id = self.setup_company(
+            client, {"Authorization": f"Bearer {token}"}, test_company_data
+        )
+
+        response = client.post(
+            "/api/v1/risk/assess/batch",
+            json={"items": [self.risk_payload(other_company_id)]},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["results"][0]["error"] == "Company not found"
+
+    @pytest.mark.parametrize("items", [[], None])
+    def test_assess_risk_batch_size_limits(self, client: TestClient, auth_headers, items):
+        """Test that empty and oversized batches are rejected"""
+        if items is None:
+            items = [self.risk_payload("1")] * (settings.RISK_BATCH_MAX_ITEMS + 1)
+        response = client.post(
+            "/api/v1/risk/assess/batch",
+            json={"items": items},
+            headers=auth_headers
+        )
+        assert response.status_code == 422
+
+    def test_assess_risk_stream(self, client: TestClient, auth_headers, db_session):
+        """Test NDJSON streaming without persistence"""
+        lines = [
+            json.dumps(self.risk_payload("1")),
+            "",
+            "{not json",
+            json.dumps(self.risk_payload("1", credit_score=600, years_in_business=1)),
+        ]
+        response = client.post(
+            "/api/v1/risk/assess/stream",
+            content="\n".join(lines) + "\n",
+            headers={**auth_headers, "Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        output = [json.loads(line) for line in response.text.splitlines()]
+        assert len(output) == 3
+        assert output[0]["risk_score"] == 100
+        assert output[1]["line"] == 3
+        assert "error" in output[1]
+        assert output[2]["risk_score"] == 75
+        assert db_session.query(Request).count() == 0
+
+    def test_assess_risk_stream_persist(
+        self, client: TestClient, auth_headers, test_company_data, db_session, monkeypatch
+    ):
+        """Test NDJSON streaming with chunked persistence"""
+        monkeypatch.setattr(settings, "RISK_STREAM_CHUNK_SIZE", 2)
+        company_id = self.setup_company(client, auth_headers, test_company_data)
+
+        lines = [json.dumps(self.risk_payload(company_id, amount=1000.0 * (i + 1))) for i in range(5)]
+        lines.insert(2, json.dumps(self.risk_payload("999")))
+        response = client.post(
+            "/api/v1/risk/assess/stream?persist=true",
+            content="\n".join(lines),
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        output = [json.loads(line) for line in response.text.splitlines()]
+        assert len(output) == 6
+        assert output[2] == {"line": 3, "error": "Company not found"}
+        assert all(item["risk_score"] == 100 for i, item in enumerate(output) if i != 2)
+
+        stored = db_session.query(Request).order_by(Request.id).all()
+        assert [r.amount for r in stored] == [1000.0, 2000.0, 3000.0, 4000.0, 5000.0]
+
+    def test_assess_risk_stream_line_too_long(self, client: TestClient, auth_headers, monkeypatch):
+        """Test that an oversized line ends the stream with an error"""
+        monkeypatch.setattr(settings, "RISK_STREAM_MAX_LINE_BYTES", 100)
+
+        response = client.post(
+            "/api/v1/risk/assess/stream",
+            content=json.dumps(self.risk_payload("1", purpose="x" * 500)),
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert json.loads(response.text.splitlines()[-1])["line"] == 1
+
+    def test_assess_risk_stream_line_too_long_flushes_pending(
+        self, client: TestClient, auth_headers, test_company_data, db_session, monkeypatch
+    ):
+        """Test that validated lines before an oversized complete line are still persisted"""
+        monkeypatch.setattr(settings, "RISK_STREAM_MAX_LINE_BYTES", 300)
+        company_id = self.setup_company(client, auth_headers, test_company_data)
+
+        lines = [
+            json.dumps(self.risk_payload(company_id)),
+            json.dumps(self.risk_payload(company_id, amount=5000.0)),
+            json.dumps(self.risk_payload(company_id, purpose="x" * 500)),
+            json.dumps(self.risk_payload(company_id, amount=9000.0)),
+        ]
+        response = client.post(
+            "/api/v1/risk/assess/stream?persist=true",
+            content="\n".join(lines) + "\n",
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        output = [json.loads(line) for line in response.text.splitlines()]
+        assert len(output) == 3
+        assert output[0]["risk_score"] == 100
+        assert output[1]["risk_score"] == 100
+        assert output[2]["line"] == 3
+        assert "exceeds" in output[2]["error"]
+        assert [r.amount for r in db_session.query(Request).order_by(Request.id)] == [100000.0, 5000.0]
+
+    def test_risk_sensitivity_grid(self, client: TestClient, auth_headers, test_company_data, db_session):
+        """Test the what-if grid matches single assessments and stores nothing"""
+        company_id = self.setup_company(client, auth_headers, test_company_data)
+        params = {
+            "company_id": company_id,
+            "amount": {"start": 10000.0, "stop": 1000000.0, "steps": 100},
+            "debt_to_equity_ratio": {"start": 0.0, "stop": 2.0, "steps": 100},
+            "years_in_business": 6,
+            "credit_score": 700
+        }
+
+        response = client.post("/api/v1/risk/sensitivity", json=params, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+
+        assert len(data["amounts"]) == len(data["scores"]) == 100
+        assert all(len(row) == 100 for row in data["scores"])
+        for i, j in [(0, 0), (37, 62), (99, 99)]:
+            expected = calculate_risk_score(RiskRequest(
+                company_id=company_id,
+                amount=data["amounts"][i],
+                purpose="loan",
+                annual_revenue=test_company_data["annual_revenue"],
+                employee_count=test_company_data["company_size"],
+                years_in_business=6,
+                debt_to_equity_ratio=data["debt_to_equity_ratios"][j],
+                credit_score=700
+            ))
+            assert data["scores"][i][j] == expected.risk_score
+            assert data["risk_levels"][i][j] == expected.risk_level
+            assert data["approved"][i][j] == expected.approved
+        assert db_session.query(Request).count() == 0
+
+    def test_risk_sensitivity_validation(self, client: TestClient, auth_headers, test_company_data):
+        """Test step limits and company ownership"""
+        company_id = self.setup_company(client, auth_headers, test_company_data)
+        params = {
+            "company_id": company_id,
+            "amount": {"start": 1000.0, "stop": 2000.0, "steps": settings.RISK_SENSITIVITY_MAX_STEPS + 1},
+            "debt_to_equity_ratio": {"start": 0.0, "stop": 1.0, "steps": 2}
+        }
+        response = client.post("/api/v1/risk/sensitivity", json=params, headers=auth_headers)
+        assert response.status_code == 422
+
+        params["amount"]["steps"] = 2
+        params["company_id"] = "99999"
+        response = client.post("/api/v1/risk/sensitivity", json=params, headers=auth_headers)
+        assert response.status_code == 404
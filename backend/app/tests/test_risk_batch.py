@@ -0,0 +1,118 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.schemas.schemas import RiskRequest
+from app.services.risk_batch import (
+    calculate_risk_scores_batch,
+    calculate_risk_scores_for_requests
+)
+from app.services.risk_calculator import calculate_risk_score
+
+
+def random_risk_request(rng: random.Random) -> RiskRequest:
+    """Build a RiskRequest hitting every threshold band, including missing values"""
+    def maybe(value):
+        return None if rng.random() < 0.15 else value
+
+    nan = float("nan")
+    return RiskRequest(
+        company_id="1",
+        amount=rng.choice([0.0, nan, 1000.0, 30000.0, 50000.0, 70000.0, rng.uniform(1, 2_000_000)]),
+        purpose="loan",
+        annual_revenue=maybe(rng.choice([0.0, nan, 100000.0, rng.uniform(1, 5_000_000)])),
+        employee_count=maybe(rng.choice([0, 4, 5, 10, 11, 49, 50, rng.randint(1, 500)])),
+        years_in_business=maybe(rng.choice([0, 1, 2, 4, 5, 9, 10, rng.randint(1, 40)])),
+        debt_to_equity_ratio=maybe(rng.choice([0.0, nan, 0.5, 0.51, 1.0, 1.01, rng.uniform(0, 3)])),
+        credit_score=maybe(rng.choice([0, 649, 650, 749, 750, rng.randint(300, 850)]))
+    )
+
+
+class TestRiskBatch:
+    """Test vectorized batch scoring"""
+
+    def test_matches_scalar_calculation(self):
+        """Test that batch results match calculate_risk_score row by row"""
+        rng = random.Random(1234)
+        requests = [random_risk_request(rng) for _ in range(2000)]
+
+        result = calculate_risk_scores_for_requests(requests)
+
+        assert len(result) == len(requests)
+        for i, request in enumerate(requests):
+            expected = calculate_risk_score(request)
+            assert result.scores[i] == expected.risk_score
+            assert result.levels[i] == expected.risk_level
+            assert bool(result.approved[i]) == expected.approved
+            assert result.recommendations(i) == expected.recommendations
+            assert result.to_response(i) == expected
+
+    @pytest.mark.parametrize("ratio_amount,expected_points", [
+        (30000.0, 30),   # ratio exactly 0.3
+        (30001.0, 25),
+        (50000.0, 25),   # ratio exactly 0.5
+        (70000.0, 15),   # ratio exactly 0.7
+        (70001.0, 5),
+    ])
+    def test_revenue_ratio_boundaries(self, ratio_amount, expected_points):
+        """Test that ratio thresholds are inclusive like the scalar if-chain"""
+        result = calculate_risk_scores_batch(
+            amount=[ratio_amount],
+            annual_revenue=[100000.0],
+            employee_count=[None],
+            years_in_business=[None],
+            debt_to_equity_ratio=[None],
+            credit_score=[None]
+        )
+        assert result.scores[0] == expected_points
+
+    def test_missing_values_score_zero(self):
+        """Test that missing or zero optional inputs contribute no points"""
+        result = calculate_risk_scores_batch(
+            amount=[10000.0, 10000.0],
+            annual_revenue=[None, 0.0],
+            employee_count=[None, 0],
+            years_in_business=[None, 0],
+            debt_to_equity_ratio=[None, 0.0],
+            credit_score=[None, 0]
+        )
+        # A zero debt ratio still counts as "excellent" (is not None)
+        assert result.scores.tolist() == [0, 15]
+        assert result.levels.tolist() == ["Alto", "Alto"]
+        assert result.approved.tolist() == [False, False]
+        assert result.recommendations(0) == []
+
+    def test_empty_batch(self):
+        """Test scoring an empty batch"""
+        result = calculate_risk_scores_batch([], [], [], [], [], [])
+        assert len(result) == 0
+        assert result.bands.shape == (0, 5)
+
+    def test_nan_is_a_value_not_missing(self):
+        """Test that NaN inputs score like the scalar if-chains (falling to the worst band)"""
+        request = RiskRequest(
+            company_id="1",
+            amount=1000.0,
+            purpose="loan",
+            annual_revenue=float("nan"),
+            debt_to_equity_ratio=float("nan")
+        )
+        expected = calculate_risk_score(request)
+        result = calculate_risk_scores_for_requests([request])
+
+        assert expected.risk_score == 10
+        assert result.to_response(0) == expected
+
+    def test_accepts_numpy_columns(self):
+        """Test that masked entries in numpy columns are treated as missing"""
+        result = calculate_risk_scores_batch(
+            amount=np.array([100000.0]),
+            annual_revenue=np.array([1000000.0]),
+            employee_count=np.ma.masked_array([0.0], mask=[True]),
+            years_in_business=np.array([12.0]),
+            debt_to_equity_ratio=np.array([0.2]),
+            credit_score=np.array([800.0])
+        )
+        assert result.scores.tolist() == [80]
+        assert result.levels.tolist() == ["Bajo"]
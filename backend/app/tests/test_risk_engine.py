@@ -0,0 +1,109 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.risk_calculator import calculate_risk_score, calculate_risk_score_legacy
+from app.services.risk_engine import score_metrics, score_request_profile
+from app.models.request import Request
+from app.tests.test_risk_batch import random_risk_request
+from benchmarks.reference_scoring import (
+    reference_calculate_risk_score,
+    reference_calculate_risk_score_legacy,
+    reference_request_profile_score
+)
+
+SIZES = ["startup", "small", "medium", "large", "enterprise", "unknown", None]
+INDUSTRIES = [
+    "technology", "finance", "healthcare", "retail", "manufacturing",
+    "real_estate", "education", "consulting", "other", "unknown", None
+]
+PURPOSES = ["loan", "investment", "partnership", "acquisition", "expansion", "other", "unknown"]
+RISK_FLAGS = [
+    "good_credit_history", "stable_revenue", "experienced_management",
+    "high_debt_ratio", "volatile_market", "regulatory_issues"
+]
+
+
+def random_profile_request(rng: random.Random) -> SimpleNamespace:
+    """Build a request-like object covering every profile table entry"""
+    return SimpleNamespace(
+        amount=rng.choice([0.0, 24_999.0, 25_000.0, 49_999.0, 50_000.0, 100_000.0,
+                           float("nan"), rng.uniform(1, 500_000)]),
+        purpose=rng.choice(PURPOSES),
+        company=SimpleNamespace(size=rng.choice(SIZES), industry=rng.choice(INDUSTRIES)),
+        risk_inputs=rng.choice([None, {}, {flag: rng.random() < 0.5 for flag in RISK_FLAGS}])
+    )
+
+
+def without_codes(response) -> dict:
+    """The reference implementation predates recommendation codes"""
+    return response.model_dump(exclude={"recommendation_codes"})
+
+
+class TestRiskEngine:
+    """Test that the compiled engine matches the original implementations"""
+
+    def test_calculate_risk_score_parity(self):
+        """Test calculate_risk_score against the if/elif reference"""
+        rng = random.Random(4321)
+        for _ in range(3000):
+            request = random_risk_request(rng)
+            expected = reference_calculate_risk_score(request)
+            assert without_codes(calculate_risk_score(request)) == without_codes(expected)
+
+    @pytest.mark.parametrize("employees,years,credit", [
+        (4, 1, 649), (5, 2, 650), (10, 4, 749), (11, 5, 750),
+        (49, 9, 850), (50, 10, 10_000), (10_000, 100, 900), (4.5, 1.5, 649.5),
+    ])
+    def test_lower_band_boundaries(self, employees, years, credit):
+        """Test integer lookup tables and float fallbacks at every '>=' boundary"""
+        request = random_risk_request(random.Random(0)).model_copy(update={
+            "employee_count": employees,
+            "years_in_business": years,
+            "credit_score": credit
+        })
+        assert without_codes(calculate_risk_score(request)) == without_codes(reference_calculate_risk_score(request))
+
+    def test_score_metrics_bands(self):
+        """Test that unscored factors are reported with band -1"""
+        score, risk_level, approved, bands = score_metrics(1000.0, None, None, 12, 0.0, None)
+        assert bands == (-1, -1, 3, 0, -1)
+        assert score == 35
+        assert (risk_level, approved) == ("Alto", False)
+
+    @pytest.mark.parametrize("amount", [
+        None, 0, 50_000, 100_000, 100_001, 500_000, 500_001, 1_000_000, 1_000_001, float("nan")
+    ])
+    @pytest.mark.parametrize("size", ["startup", "small", "medium", "large", "enterprise", "other"])
+    def test_legacy_parity(self, amount, size):
+        """Test calculate_risk_score_legacy against the if/elif reference"""
+        risk_data = {"amount": amount, "size_category": size}
+        assert calculate_risk_score_legacy(risk_data) == reference_calculate_risk_score_legacy(risk_data)
+
+    def test_legacy_default_size(self):
+        """Test that a missing size category is scored as medium"""
+        assert calculate_risk_score_legacy({"amount": 200_000}) == ("BAJO", 2.0, [
+            "Proceso de verificación estándar recomendado",
+            "Empresa mediana muestra buena estabilidad"
+        ])
+
+    def test_request_profile_parity(self):
+        """Test Request.calculate_risk_score against the original model method"""
+        rng = random.Random(99)
+        for _ in range(3000):
+            request = random_profile_request(rng)
+            expected = reference_request_profile_score(request)
+            assert Request.calculate_risk_score(request) == expected
+            assert score_request_profile(
+                request.amount,
+                request.company.size,
+                request.company.industry,
+                request.purpose,
+                request.risk_inputs
+            ) == expected
+
+    def test_request_profile_without_company(self):
+        """Test the default score when the company is not loaded"""
+        request = SimpleNamespace(amount=10_000.0, purpose="loan", company=None, risk_inputs={})
+        assert Request.calculate_risk_score(request) == 50.0
@@ -0,0 +1,128 @@
+from fastapi.testclient import TestClient
+
+from app.models.request import Request
+from app.services import risk_engine
+from app.services.risk_calculator import risk_request_from_inputs
+from app.services.risk_batch import calculate_risk_scores_for_requests
+from app.services.risk_rescore import pending_rescores, rescore_stale
+
+
+def create_requests(client: TestClient, auth_headers, company_data, request_data, count: int):
+    company_id = client.post("/api/v1/companies/", json=company_data, headers=auth_headers).json()["id"]
+    ids = []
+    for i in range(count):
+        data = dict(request_data, company_id=company_id, amount=request_data["amount"] * (i + 1))
+        ids.append(int(client.post("/api/v1/requests/", json=data, headers=auth_headers).json()["id"]))
+    return company_id, ids
+
+
+def expected(request: Request, company_data):
+    risk_request = risk_request_from_inputs(
+        str(request.company_id), request.amount, request.purpose, request.risk_inputs,
+        company_data["annual_revenue"], company_data["company_size"]
+    )
+    result = calculate_risk_scores_for_requests([risk_request])
+    return float(result.scores[0]), str(result.levels[0])
+
+
+def stored(db_session, request_id: int) -> Request:
+    db_session.expire_all()
+    return db_session.get(Request, request_id)
+
+
+class TestRescoreOnRead:
+    """Test lazy rescoring of requests scored with older rules"""
+
+    def test_writes_stamp_the_active_version(self, client: TestClient, auth_headers, db_session,
+                                             test_company_data, test_request_data):
+        """Test that new requests store the version of the rules that scored them"""
+        _, ids = create_requests(client, auth_headers, test_company_data, test_request_data, 1)
+
+        assert stored(db_session, ids[0]).rules_version == risk_engine.active_rules.version
+        assert risk_engine.get_rules(risk_engine.active_rules.version) is risk_engine.active_rules
+
+    def test_list_rescores_only_the_page(self, client: TestClient, auth_headers, db_session, new_rules,
+                                         test_company_data, test_request_data):
+        """Test that a rules change rescores the rows read and writes them back in the background"""
+        _, ids = create_requests(client, auth_headers, test_company_data, test_request_data, 3)
+        old_version = risk_engine.active_rules.version
+        # La más reciente: primera fila de la página (orden created_at, id descendente)
+        before = stored(db_session, ids[-1])
+        old_score, updated_at = before.risk_score, before.updated_at
+
+        risk_engine.set_active_rules(new_rules)
+        response = client.get("/api/v1/requests/?page=1&size=2", headers=auth_headers)
+
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["rules_version"] for item in items] == [new_rules.version] * 2
+
+        read_ids = {int(item["id"]) for item in items}
+        for request_id in read_ids:
+            request = stored(db_session, request_id)
+            assert request.rules_version == new_rules.version
+            assert (request.risk_score, request.risk_level) == expected(request, test_company_data)
+        # La fila que no se leyó queda como estaba
+        (unread,) = set(ids) - read_ids
+        assert stored(db_session, unread).rules_version == old_version
+        assert len(pending_rescores) == 0
+
+        first = stored(db_session, ids[-1])
+        assert first.risk_score != old_score
+        assert first.updated_at == updated_at
+
+    def test_get_request_rescores_rows_without_version(self, client: TestClient, auth_headers, db_session,
+                                                       test_company_data, test_request_data):
+        """Test that rows stored before versioning (NULL) are rescored when read"""
+        _, ids = create_requests(client, auth_headers, test_company_data, test_request_data, 1)
+        request = stored(db_session, ids[0])
+        request.risk_score, request.risk_level, request.rules_version = 0.0, "stale", None
+        db_session.commit()
+
+        response = client.get(f"/api/v1/requests/{ids[0]}", headers=auth_headers)
+
+        data = response.json()
+        request = stored(db_session, ids[0])
+        assert (data["risk_score"], data["risk_level"]) == expected(request, test_company_data)
+        assert (request.risk_score, request.risk_level) == expected(request, test_company_data)
+        assert request.rules_version == data["rules_version"] == risk_engine.active_rules.version
+
+    def test_current_rows_are_not_queued(self, client: TestClient, auth_headers, db_session,
+                                         test_company_data, test_request_data):
+        """Test that reading up-to-date rows scores nothing"""
+        _, ids = create_requests(client, auth_headers, test_company_data, test_request_data, 2)
+
+        assert rescore_stale(db_session, db_session.query(Request).all()) == 0
+        assert len(pending_rescores) == 0
+
+    def test_flush_does_not_overwrite_newer_scores(self, client: TestClient, auth_headers, db_session, new_rules,
+                                                   test_company_data, test_request_data):
+        """Test that a row rescored by someone else between the read and the flush is left alone"""
+        _, ids = create_requests(client, auth_headers, test_company_data, test_request_data, 1)
+        risk_engine.set_active_rules(new_rules)
+
+        assert rescore_stale(db_session, [db_session.get(Request, ids[0])]) == 1
+        db_session.rollback()
+        db_session.query(Request).filter(Request.id == ids[0]).update(
+            {"risk_score": 1.0, "risk_level": "manual", "rules_version": "test-v3"}
+        )
+        db_session.commit()
+
+        pending_rescores.flush(db_session.get_bind())
+
+        request = stored(db_session, ids[0])
+        assert (request.risk_score, request.risk_level, request.rules_version) == (1.0, "manual", "test-v3")
+
+    def test_projected_list_still_rescores(self, client: TestClient, auth_headers, db_session, new_rules,
+                                           test_company_data, test_request_data):
+        """Test that rows listed without their inputs (?fields=) are rescored with the stored inputs"""
+        _, ids = create_requests(client, auth_headers, test_company_data, test_request_data, 2)
+
+        risk_engine.set_active_rules(new_rules)
+        response = client.get("/api/v1/requests/?fields=id,risk_score", headers=auth_headers)
+
+        assert response.status_code == 200
+        for item in response.json()["items"]:
+            request = stored(db_session, int(item["id"]))
+            assert request.rules_version == new_rules.version
+            assert item["risk_score"] == request.risk_score == expected(request, test_company_data)[0]
@@ -0,0 +1,179 @@
+import json
+import os
+
+import pytest
+
+from app.schemas.schemas import RiskRequest
+from app.services import risk_engine
+from app.services.risk_batch import calculate_risk_scores_for_requests
+from app.services.risk_calculator import calculate_risk_score
+from app.services.risk_rules import (
+    DEFAULT_RULES_PATH,
+    RulesFileError,
+    RulesWatcher,
+    load_rules_file
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_rules():
+    """Put the built-in rules back after each test"""
+    yield
+    risk_engine.set_active_rules(risk_engine.BUILTIN_RULES)
+
+
+def write_rules(path, data) -> None:
+    """Write the file and move its mtime forward so the watcher sees the change"""
+    path.write_text(json.dumps(data), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+REQUEST = RiskRequest(
+    company_id="1",
+    amount=20000.0,
+    purpose="loan",
+    annual_revenue=100000.0,
+    employee_count=60,
+    years_in_business=3,
+    debt_to_equity_ratio=0.4,
+    credit_score=700
+)
+
+
+class TestRiskRules:
+    """Test rules file loading and hot reload"""
+
+    def test_shipped_file_matches_builtin_rules(self):
+        """Test that the shipped rules file describes the built-in policy"""
+        rules = load_rules_file(DEFAULT_RULES_PATH)
+        builtin = risk_engine.BUILTIN_RULES
+
+        assert rules.label == "2025.1"
+        assert rules.version == f"2025.1+{builtin.version.split('+')[1]}"
+        assert rules.thresholds == builtin.thresholds
+        assert rules.points == builtin.points
+        assert rules.recommendations == builtin.recommendations
+        assert rules.level_lookup == builtin.level_lookup
+
+    def test_watcher_hot_reload(self, tmp_path, rules_data):
+        """Test that changing the file swaps the rules used by every scoring path"""
+        path = tmp_path / "rules.json"
+        write_rules(path, rules_data)
+        watcher = RulesWatcher(path, interval=0)
+        watcher.start()
+
+        assert risk_engine.active_rules.label == "2025.1"
+        assert calculate_risk_score(REQUEST).risk_score == 30 + 20 + 10 + 15 + 10
+        assert watcher.check() is False  # Sin cambios no se recarga
+
+        rules_data["version"] = "2025.2"
+        rules_data["factors"]["credit"]["points"] = [0, 0, 0]
+        rules_data["levels"][1]["min_score"] = 80
+        rules_data["levels"][2]["min_score"] = 90
+        write_rules(path, rules_data)
+
+        assert watcher.check() is True
+        assert risk_engine.active_rules.label == "2025.2"
+        result = calculate_risk_score(REQUEST)
+        assert (result.risk_score, result.risk_level, result.approved) == (75, "Alto", False)
+        assert calculate_risk_scores_for_requests([REQUEST]).to_response(0) == result
+
+    def test_invalid_file_keeps_previous_rules(self, tmp_path, rules_data):
+        """Test that a broken file is rejected without touching the active rules"""
+        path = tmp_path / "rules.json"
+        write_rules(path, rules_data)
+        watcher = RulesWatcher(path, interval=0)
+        watcher.start()
+        active = risk_engine.active_rules
+
+        rules_data["factors"]["debt"]["points"] = [15, 10]
+        write_rules(path, rules_data)
+        assert watcher.check() is False
+        assert risk_engine.active_rules is active
+
+        path.write_text("{not json", encoding="utf-8")
+        assert watcher.check() is False
+        assert risk_engine.active_rules is active
+
+        # json.loads acepta Infinity: el archivo parsea pero no debe activarse
+        rules_data["factors"]["debt"]["points"] = [15, 10, 5]
+        rules_data["factors"]["revenue"]["thresholds"] = [0.3, 0.5, float("inf")]
+        write_rules(path, rules_data)
+        assert watcher.check() is False
+        assert risk_engine.active_rules is active
+        assert calculate_risk_score(REQUEST).risk_score == 30 + 20 + 10 + 15 + 10
+
+    def test_scorer_is_smoke_tested(self, monkeypatch):
+        """Test that rules whose generated scorer fails are rejected at compile time"""
+        def broken(*args):
+            raise NameError("name 'inf' is not defined")
+
+        monkeypatch.setattr(risk_engine, "compile_metrics_scorer", lambda *args: broken)
+        builtin = risk_engine.BUILTIN_RULES
+
+        with pytest.raises(ValueError, match="compiled scorer fails"):
+            risk_engine.compile_rules(
+                "broken", builtin.thresholds, builtin.points, builtin.recommendations,
+                builtin.level_thresholds, builtin.levels, builtin.approvals
+            )
+
+    @pytest.mark.parametrize("change,message", [
+        (lambda d: d["factors"].pop("years"), "Missing factors"),
+        (lambda d: d["factors"]["revenue"].update(thresholds=[0.5, 0.3, 0.7]), "strictly increasing"),
+        (lambda d: d["factors"]["employees"].update(points=[5, 10, 15, 2.5]), "non-negative integers"),
+        (lambda d: d["levels"].pop(0), "min_score 0"),
+        (lambda d: d["factors"]["revenue"].update(thresholds=[0.3, 0.5, float("inf")]), "finite numbers"),
+        (lambda d: d["factors"]["credit"].update(thresholds=[float("nan"), 750]), "finite numbers"),
+        (lambda d: d["factors"]["years"].update(thresholds=["2", "5", "10"]), "finite numbers"),
+        (lambda d: d["factors"]["debt"].update(thresholds=[False, True]), "finite numbers"),
+        (lambda d: d["levels"][2].update(min_score=float("inf")), "finite numbers"),
+    ])
+    def test_validation_errors(self, tmp_path, rules_data, change, message):
+        """Test that invalid policies are reported with a clear message"""
+        change(rules_data)
+        path = tmp_path / "rules.json"
+        write_rules(path, rules_data)
+
+        with pytest.raises(RulesFileError, match=message):
+            load_rules_file(path)
+
+    def test_version_defaults_to_content_hash(self, tmp_path, rules_data):
+        """Test that files without a version get a stable content hash"""
+        del rules_data["version"]
+        path = tmp_path / "rules.json"
+        write_rules(path, rules_data)
+
+        rules = load_rules_file(path)
+        assert len(rules.label) == 12
+        assert load_rules_file(path).version == rules.version
+
+    def test_version_follows_the_tables(self, tmp_path, rules_data):
+        """Test that editing the tables without bumping the declared version changes the version"""
+        path = tmp_path / "rules.json"
+        write_rules(path, rules_data)
+        before = load_rules_file(path).version
+
+        rules_data["factors"]["credit"]["points"] = [0, 0, 0]
+        write_rules(path, rules_data)
+        after = load_rules_file(path).version
+
+        assert before.startswith("2025.1+") and after.startswith("2025.1+")
+        assert after != before
+
+    def test_version_label_fits_the_column(self, tmp_path, rules_data):
+        """Test that a declared version too long for requests.rules_version is rejected"""
+        rules_data["version"] = "v" * 60
+        path = tmp_path / "rules.json"
+        write_rules(path, rules_data)
+
+        with pytest.raises(RulesFileError, match="version: at most"):
+            load_rules_file(path)
+
+    def test_yaml_rules_file(self, tmp_path, rules_data):
+        """Test loading the same policy from YAML"""
+        yaml = pytest.importorskip("yaml")
+        path = tmp_path / "rules.yaml"
+        path.write_text(yaml.safe_dump(rules_data, allow_unicode=True), encoding="utf-8")
+
+        assert load_rules_file(path).points == risk_engine.BUILTIN_RULES.points
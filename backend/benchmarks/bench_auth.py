@@ -0,0 +1,62 @@
+"""
+Authentication overhead benchmark: get_current_user with and without its caches.
+
+Times get_current_user against a throwaway SQLite database for one bearer token
+reused on every call, as a client does during the token's life:
+- no caches:  jwt.decode (HMAC check) + SELECT of the user on every call
+- tokens:     verified-token cache only (the user is still read)
+- both:       token cache + principal cache (no database access)
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --calls 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.user import User
+from app.services.auth import create_access_token, get_current_user, token_cache
+from app.services.principals import principal_cache
+
+
+def per_call(session: Session, credentials: HTTPAuthorizationCredentials, calls: int) -> float:
+    get_current_user(credentials, session)  # Calentar las cachés habilitadas
+    started = time.perf_counter()
+    for _ in range(calls):
+        get_current_user(credentials, session)
+    return (time.perf_counter() - started) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session, session.begin():
+            session.execute(insert(User), [{"email": "bench@test.com", "hashed_password": "x",
+                                            "is_active": True, "is_superuser": False}])
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": "1"}))
+        sizes = token_cache.maxsize, principal_cache.maxsize
+
+        print(f"{'variant':>10} {'us/call':>10}")
+        for name, token_size, principal_size in (("no caches", 0, 0), ("tokens", sizes[0], 0), ("both", *sizes)):
+            token_cache.clear()
+            principal_cache.clear()
+            token_cache.maxsize, principal_cache.maxsize = token_size, principal_size
+            with Session(engine) as session:
+                print(f"{name:>10} {per_call(session, credentials, args.calls) * 1e6:>10.1f}")
+        token_cache.maxsize, principal_cache.maxsize = sizes
+
+
+if __name__ == "__main__":
+    main()
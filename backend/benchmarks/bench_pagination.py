@@ -0,0 +1,97 @@
+"""
+Deep paging benchmark: OFFSET vs keyset (cursor) pagination of the requests list.
+
+Builds a throwaway SQLite database with one user owning ROWS requests and times
+a 50-row page at increasing depths with the same queries as GET /requests.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pagination
+    python -m benchmarks.bench_pagination --rows 2000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+from app.core.pagination import NEXT, encode_cursor, keyset_page
+from app.models.base import Base
+from app.models.company import Company
+from app.models.request import Request
+from app.models.user import User
+
+PAGE_SIZE = 50
+REPEATS = 5
+
+
+def build_database(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2020, 1, 1)
+    with Session(engine) as session, session.begin():
+        session.execute(insert(User), [{"email": "bench@test.com", "hashed_password": "x",
+                                        "is_active": True, "is_superuser": False}])
+        session.execute(insert(Company), [{"name": "Bench", "email": "b@test.com", "phone": "1",
+                                           "industry": "technology", "annual_revenue": 1e6,
+                                           "company_size": 50, "user_id": 1}])
+        for offset in range(0, rows, 50_000):
+            session.execute(insert(Request), [
+                {
+                    "company_id": 1, "user_id": 1, "amount": float(i % 1000) * 1000, "purpose": "loan",
+                    "risk_inputs": {}, "status": "PENDING",
+                    # Varias filas por segundo: el desempate por id entra en juego
+                    "created_at": start + timedelta(seconds=i // 3),
+                    "updated_at": start
+                }
+                for i in range(offset, min(offset + 50_000, rows))
+            ])
+    # Formato de CURRENT_TIMESTAMP, igual que las filas creadas por la API
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE requests SET created_at = substr(created_at, 1, 19)"))
+        conn.execute(text("ANALYZE"))
+    return engine
+
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.rows:,} requests...")
+        engine = build_database(os.path.join(tmp, "bench.db"), args.rows)
+        depths = [d for d in (0, 1_000, 10_000, 100_000, 1_000_000, args.rows - PAGE_SIZE) if d < args.rows]
+
+        print(f"{'depth':>10} {'offset ms':>10} {'cursor ms':>10}")
+        with Session(engine) as session:
+            base = session.query(Request).filter(Request.user_id == 1)
+            ordered = base.order_by(Request.created_at.desc(), Request.id.desc())
+            for depth in depths:
+                # Cursor de la fila anterior a la página, calculado fuera de la medición
+                cursor = None
+                if depth:
+                    row = ordered.offset(depth - 1).first()
+                    cursor = encode_cursor("created_at", [row.created_at, row.id], NEXT)
+
+                offset_page = best_of(lambda: ordered.offset(depth).limit(PAGE_SIZE).all())
+                cursor_page = best_of(lambda: keyset_page(
+                    base, (Request.created_at, Request.id), "created_at", PAGE_SIZE, cursor
+                ))
+                session.expunge_all()
+                print(f"{depth:>10,} {offset_page * 1000:>10.2f} {cursor_page * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
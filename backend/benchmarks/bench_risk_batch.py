@@ -0,0 +1,80 @@
+"""
+Throughput benchmark: scalar calculate_risk_score vs vectorized batch scoring.
+
+Usage (from backend/):
+    python -m benchmarks.bench_risk_batch
+"""
+import time
+
+import numpy as np
+
+from app.schemas.schemas import RiskRequest
+from app.services.risk_batch import calculate_risk_scores_batch
+from app.services.risk_calculator import calculate_risk_score
+
+SIZES = (10_000, 100_000, 1_000_000)
+SCALAR_MAX_ROWS = 100_000  # El camino escalar es demasiado lento para 1M filas
+
+
+def make_columns(n: int, seed: int = 42) -> dict:
+    """Generate random columnar inputs with ~10% missing values per optional column"""
+    rng = np.random.default_rng(seed)
+
+    def with_missing(values: np.ndarray) -> np.ma.MaskedArray:
+        return np.ma.masked_array(values.astype(np.float64), mask=rng.random(n) < 0.1)
+
+    return {
+        "amount": rng.uniform(1_000, 2_000_000, n),
+        "annual_revenue": with_missing(rng.uniform(10_000, 10_000_000, n)),
+        "employee_count": with_missing(rng.integers(1, 500, n)),
+        "years_in_business": with_missing(rng.integers(0, 40, n)),
+        "debt_to_equity_ratio": with_missing(rng.uniform(0, 3, n)),
+        "credit_score": with_missing(rng.integers(300, 850, n)),
+    }
+
+
+def to_requests(columns: dict) -> list:
+    """Materialize the columns as RiskRequest objects for the scalar path"""
+    def opt(value, cast):
+        return None if value is np.ma.masked else cast(value)
+
+    return [
+        RiskRequest(
+            company_id="1",
+            amount=float(amount),
+            purpose="loan",
+            annual_revenue=opt(revenue, float),
+            employee_count=opt(employees, int),
+            years_in_business=opt(years, int),
+            debt_to_equity_ratio=opt(debt, float),
+            credit_score=opt(credit, int)
+        )
+        for amount, revenue, employees, years, debt, credit in zip(*columns.values())
+    ]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'rows':>10} {'scalar rows/s':>15} {'batch rows/s':>15} {'speedup':>9}")
+    for n in SIZES:
+        columns = make_columns(n)
+        batch_seconds = timed(lambda: calculate_risk_scores_batch(**columns))
+
+        if n <= SCALAR_MAX_ROWS:
+            requests = to_requests(columns)
+            scalar_seconds = timed(lambda: [calculate_risk_score(r) for r in requests])
+            scalar_rate = f"{n / scalar_seconds:,.0f}"
+            speedup = f"{scalar_seconds / batch_seconds:,.1f}x"
+        else:
+            scalar_rate, speedup = "-", "-"
+
+        print(f"{n:>10,} {scalar_rate:>15} {n / batch_seconds:>15,.0f} {speedup:>9}")
+
+
+if __name__ == "__main__":
+    main()
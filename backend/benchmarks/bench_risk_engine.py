@@ -0,0 +1,97 @@
+"""
+Per-call micro-benchmark: original if/elif scoring vs the compiled risk_engine.
+
+Usage (from backend/):
+    python -m benchmarks.bench_risk_engine
+"""
+import random
+import timeit
+from types import SimpleNamespace
+
+from app.models.request import Request
+from app.services import risk_calculator
+from app.services.risk_calculator import calculate_risk_score, calculate_risk_score_legacy
+from benchmarks import reference_scoring
+from benchmarks.reference_scoring import (
+    reference_calculate_risk_score,
+    reference_calculate_risk_score_legacy,
+    reference_request_profile_score
+)
+from app.schemas.schemas import RiskRequest
+
+CALLS = 20_000
+ROUNDS = 7
+
+
+def make_inputs(n: int, seed: int = 42) -> dict:
+    """Generate random inputs for each entry point"""
+    rng = random.Random(seed)
+    metrics = [
+        RiskRequest(
+            company_id="1",
+            amount=rng.uniform(1_000, 2_000_000),
+            purpose="loan",
+            annual_revenue=rng.uniform(10_000, 10_000_000),
+            employee_count=rng.randint(1, 500),
+            years_in_business=rng.randint(0, 40),
+            debt_to_equity_ratio=rng.uniform(0, 3),
+            credit_score=rng.randint(300, 850)
+        )
+        for _ in range(n)
+    ]
+    legacy = [
+        {"amount": rng.uniform(0, 2_000_000), "size_category": rng.choice(["startup", "small", "medium", "large"])}
+        for _ in range(n)
+    ]
+    profiles = [
+        SimpleNamespace(
+            amount=rng.uniform(1_000, 200_000),
+            purpose=rng.choice(["loan", "investment", "acquisition"]),
+            company=SimpleNamespace(size=rng.choice(["small", "large"]), industry=rng.choice(["technology", "retail"])),
+            risk_inputs={"stable_revenue": True, "volatile_market": rng.random() < 0.5}
+        )
+        for _ in range(n)
+    ]
+    return {"metrics": metrics, "legacy": legacy, "profiles": profiles}
+
+
+def per_call_ns(reference, engine, items) -> tuple:
+    """Best-of-ROUNDS nanoseconds per call, alternating both sides to share machine noise"""
+    best = [float("inf"), float("inf")]
+    for _ in range(ROUNDS):
+        for side, fn in enumerate((reference, engine)):
+            seconds = timeit.timeit(lambda: [fn(item) for item in items], number=1)
+            best[side] = min(best[side], seconds)
+    return tuple(seconds / len(items) * 1e9 for seconds in best)
+
+
+def main() -> None:
+    inputs = make_inputs(CALLS)
+    cases = [
+        ("calculate_risk_score", reference_calculate_risk_score, calculate_risk_score, inputs["metrics"]),
+        ("calculate_risk_score_legacy", reference_calculate_risk_score_legacy,
+         calculate_risk_score_legacy, inputs["legacy"]),
+        ("Request.calculate_risk_score", reference_request_profile_score,
+         Request.calculate_risk_score, inputs["profiles"]),
+    ]
+
+    print(f"{'entry point':<30} {'reference ns':>13} {'engine ns':>11} {'speedup':>9}")
+    for name, reference, engine, items in cases:
+        reference_ns, engine_ns = per_call_ns(reference, engine, items)
+        print(f"{name:<30} {reference_ns:>13,.0f} {engine_ns:>11,.0f} {reference_ns / engine_ns:>8.2f}x")
+
+    # Sin la construcción del RiskResponse (igual en ambos lados) queda solo el scoring
+    response_model = risk_calculator.RiskResponse
+    reference_scoring.RiskResponse = risk_calculator.RiskResponse = dict
+    try:
+        reference_ns, engine_ns = per_call_ns(
+            reference_calculate_risk_score, calculate_risk_score, inputs["metrics"]
+        )
+    finally:
+        reference_scoring.RiskResponse = risk_calculator.RiskResponse = response_model
+    name = "  scoring only (no pydantic)"
+    print(f"{name:<30} {reference_ns:>13,.0f} {engine_ns:>11,.0f} {reference_ns / engine_ns:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Text search benchmark: ILIKE '%term%' vs the FTS5 index of the requests list.
+
+Builds a throwaway SQLite database with one user owning ROWS requests and times
+a 50-row search page at increasing table sizes with the same queries as GET /requests.
+The FTS query ranks every match, so its cost follows the number of matches, not
+the table size; ILIKE scans the whole table.
+
+Usage (from backend/):
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --rows 2000000
+"""
+import argparse
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, or_
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.company import Company
+from app.models.request import Request
+from app.models.user import User
+from app.services.request_search import apply_search
+from benchmarks.bench_pagination import PAGE_SIZE, best_of
+
+WORDS = ["equipment", "financing", "working", "capital", "expansion", "loan", "office", "fleet", "inventory",
+         "machinery", "software", "warehouse", "refinancing", "acquisition", "solar", "panels"]
+TERM = "solar pan"
+
+
+def add_requests(engine, first: int, last: int) -> None:
+    with Session(engine) as session, session.begin():
+        session.execute(insert(Request), [
+            {
+                "company_id": 1, "user_id": 1, "amount": 1000.0, "risk_inputs": {}, "status": "PENDING",
+                "purpose": " ".join(WORDS[(i * k) % len(WORDS)] for k in (1, 3, 7)),
+                "created_at": datetime(2020, 1, 1), "updated_at": datetime(2020, 1, 1)
+            }
+            for i in range(first, last)
+        ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session, session.begin():
+            session.execute(insert(User), [{"email": "bench@test.com", "hashed_password": "x",
+                                            "is_active": True, "is_superuser": False}])
+            session.execute(insert(Company), [{"name": "Bench", "email": "b@test.com", "phone": "1",
+                                               "industry": "technology", "annual_revenue": 1e6,
+                                               "company_size": 50, "user_id": 1}])
+
+        print(f"{'rows':>10} {'ilike ms':>10} {'fts ms':>10}")
+        built = 0
+        for rows in sorted({r for r in (10_000, 100_000, 1_000_000, args.rows) if r <= args.rows}):
+            add_requests(engine, built, rows)
+            built = rows
+            with Session(engine) as session:
+                base = session.query(Request).filter(Request.user_id == 1)
+                ilike = base.join(Company, Request.company_id == Company.id).filter(
+                    or_(Request.purpose.ilike(f"%{TERM}%"), Company.name.ilike(f"%{TERM}%"))
+                )
+                fts, rank = apply_search(base, "sqlite", TERM)
+                ilike_page = best_of(lambda: ilike.limit(PAGE_SIZE).all())
+                fts_page = best_of(lambda: fts.order_by(rank).limit(PAGE_SIZE).all())
+                print(f"{rows:>10,} {ilike_page * 1000:>10.2f} {fts_page * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -63,6 +63,19 @@ async def startup_event():
     except Exception as e:
         print(f"Error creating tables: {e}")
 
+    # BCRYPT_ROUNDS=0: calibrar el costo de bcrypt ahora y no en el primer login
+    from app.services.password_cost import target_rounds
+    target_rounds()
+
+    # Reglas de scoring desde archivo, con recarga en caliente en cada worker
+    from app.services import risk_rules
+    risk_rules.start_watcher()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.services import risk_rules
+    risk_rules.stop_watcher()
+
 # Health checks primero
 @app.get("/health")
 def health_check():
@@ -80,6 +93,36 @@ def health_check_db():
     except Exception as e:
         return {"status": "unhealthy", "database": "disconnected", "error": str(e), "timestamp": datetime.now(timezone.utc)}
 
+@app.get("/health/rules")
+def health_check_rules():
+    """Active scoring rules version"""
+    from app.services import risk_engine, risk_rules
+    return {
+        "status": "healthy",
+        "rules_version": risk_engine.active_rules.version,
+        "known_versions": list(risk_engine.rules_registry),
+        "rules_path": str(risk_rules.rules_path()),
+        "timestamp": datetime.now(timezone.utc)
+    }
+
+@app.get("/health/metrics")
+def health_check_metrics():
+    """In-process cache counters"""
+    from app.services.risk_calculator import score_cache
+    from app.services.request_counts import count_cache
+    from app.services.principals import principal_cache
+    from app.services.auth import token_cache
+    from app.services.password_pool import hashing_pool
+    return {
+        "status": "healthy",
+        "risk_score_cache": score_cache.stats(),
+        "request_count_cache": count_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "password_hashing": hashing_pool.stats(),
+        "timestamp": datetime.now(timezone.utc)
+    }
+
 @app.get("/health/tables")
 def health_check_tables():
     """Check if database tables exist"""
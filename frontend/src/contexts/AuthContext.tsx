@@ -48,9 +48,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       const { access_token } = loginResponse;
       
       setToken(access_token);
-      localStorage.setItem(AUTH_CONFIG.TOKEN_KEY, access_token);
-
-      AuthService.setAuthToken(access_token);
+      AuthService.storeTokens(loginResponse);
       const userData = await AuthService.getCurrentUser();
       setUser(userData);
     } catch (error: any) {
@@ -76,9 +74,15 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem(AUTH_CONFIG.REFRESH_TOKEN_KEY);
+    if (refreshToken) {
+      // Revocar la sesión en el servidor; si falla, el token vence solo
+      AuthService.logout(refreshToken).catch(() => undefined);
+    }
     setToken(null);
     setUser(null);
     localStorage.removeItem(AUTH_CONFIG.TOKEN_KEY);
+    localStorage.removeItem(AUTH_CONFIG.REFRESH_TOKEN_KEY);
     AuthService.setAuthToken(null);
   };
 
@@ -1,6 +1,6 @@
 import axios from 'axios';
 import { LoginCredentials, RegisterData, LoginResponse, User } from '../types/auth';
-import { API_CONFIG } from '../constants/config';
+import { API_CONFIG, AUTH_CONFIG } from '../constants/config';
 
 const api = axios.create({
   baseURL: API_CONFIG.BASE_URL,
@@ -33,6 +33,69 @@ export class AuthService {
     const response = await api.get<User>('/auth/me');
     return response.data;
   }
+
+  // Renueva la sesión sin contraseña; el refresh token anterior deja de valer
+  static async refresh(refreshToken: string): Promise<LoginResponse> {
+    const response = await api.post<LoginResponse>('/auth/refresh', { refresh_token: refreshToken });
+    return response.data;
+  }
+
+  static async logout(refreshToken: string): Promise<void> {
+    await api.post('/auth/logout', { refresh_token: refreshToken });
+  }
+
+  static storeTokens(tokens: LoginResponse) {
+    localStorage.setItem(AUTH_CONFIG.TOKEN_KEY, tokens.access_token);
+    if (tokens.refresh_token) {
+      localStorage.setItem(AUTH_CONFIG.REFRESH_TOKEN_KEY, tokens.refresh_token);
+    }
+    AuthService.setAuthToken(tokens.access_token);
+  }
 }
 
+// Una sola renovación en curso aunque fallen varias requests a la vez
+let refreshing: Promise<string> | null = null;
+
+const refreshAccessToken = (): Promise<string> => {
+  const refreshToken = localStorage.getItem(AUTH_CONFIG.REFRESH_TOKEN_KEY);
+  if (!refreshToken) {
+    return Promise.reject(new Error('No refresh token'));
+  }
+  if (!refreshing) {
+    refreshing = AuthService.refresh(refreshToken)
+      .then((tokens) => {
+        AuthService.storeTokens(tokens);
+        return tokens.access_token;
+      })
+      .catch((error) => {
+        localStorage.removeItem(AUTH_CONFIG.REFRESH_TOKEN_KEY);
+        throw error;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
+// Access token vencido (401): renovar con el refresh token y reintentar una vez, sin volver a /auth/login
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    const isAuthCall = original?.url?.startsWith('/auth/login') || original?.url?.startsWith('/auth/refresh');
+    if (error.response?.status !== 401 || !original || original._retried || isAuthCall) {
+      return Promise.reject(error);
+    }
+    original._retried = true;
+    try {
+      const accessToken = await refreshAccessToken();
+      original.headers = { ...original.headers, Authorization: `Bearer ${accessToken}` };
+      return api(original);
+    } catch {
+      return Promise.reject(error);
+    }
+  }
+);
+
 export { api };
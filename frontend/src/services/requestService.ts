@@ -12,6 +12,9 @@ export class RequestService {
     risk_level?: string;
     min_amount?: number;
     max_amount?: number;
+    created_from?: string;
+    created_to?: string;
+    sort?: 'created_at' | '-created_at' | 'amount' | '-amount' | 'risk_score' | '-risk_score';
   }): Promise<{
     items: RiskRequest[];
     page: number;
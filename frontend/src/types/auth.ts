@@ -20,6 +20,7 @@ export interface RegisterData {
 export interface LoginResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
 }
 
 export interface AuthContextType {
@@ -18,6 +18,7 @@ export interface RiskRequest {
   status: 'pending' | 'approved' | 'rejected';
   risk_level: string;
   recommendations?: string;
+  recommendation_codes?: number[];
   approved?: boolean;
   created_at: string;
   updated_at?: string;
@@ -37,6 +38,13 @@ export interface RequestStatistics {
   pending_requests: number;
   total_amount_requested: number;
   approval_rate: number;
+  by_status?: Record<string, SummaryBucket>;
+  by_risk_level?: Record<string, SummaryBucket>;
+}
+
+export interface SummaryBucket {
+  count: number;
+  amount: number;
 }
 
 export interface RequestFormData {
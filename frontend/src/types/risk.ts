@@ -13,6 +13,7 @@ export interface RiskAssessmentResponse {
   risk_level: string;
   risk_score: number;
   recommendations: string[];
+  recommendation_codes?: number[];
   approved: boolean;
 }
 